@@ -0,0 +1,93 @@
+"""Arquivamento de consultas e cirurgias encerradas: `python main.py --arquivar`.
+
+Move para consulta_arquivo / cirurgia_arquivo as linhas com status
+'realizada' ou 'cancelada' e data anterior ao corte. Cada lote é um
+único comando (DELETE ... RETURNING alimentando o INSERT) com no máximo
+ARQUIVO_CONFIG["lote"] linhas, executado por lotes.py. Pode ser
+interrompido e rodado de novo a qualquer momento.
+"""
+import datetime
+from typing import Dict, NamedTuple, Optional
+
+from config import ARQUIVO_CONFIG
+from lotes import executar_em_lotes
+
+STATUS_ENCERRADOS = ("realizada", "cancelada")
+
+
+class Arquivavel(NamedTuple):
+    tabela: str
+    chave: str
+    colunas: str
+
+
+ARQUIVAVEIS = (
+    Arquivavel(
+        "consulta",
+        "id_consulta",
+        "id_consulta, data, horario, motivo, diagnostico, status, "
+        "prioridade, id_animal, id_vet, criado_em, duracao_minutos",
+    ),
+    Arquivavel(
+        "cirurgia",
+        "id_cirurgia",
+        "id_cirurgia, data, tipo_cirurgia, observacoes, status, id_animal, criado_em",
+    ),
+)
+
+
+def _sql_lote(t: Arquivavel) -> str:
+    # data no filtro e no USING: só as partições anteriores ao corte são lidas
+    # (migração 0007)
+    return f"""
+        WITH lote AS (
+            SELECT {t.chave}, data FROM {t.tabela}
+            WHERE data < %s AND status IN %s
+            LIMIT %s
+            FOR UPDATE SKIP LOCKED
+        ), movidas AS (
+            DELETE FROM {t.tabela} x
+            USING lote l
+            WHERE x.{t.chave} = l.{t.chave} AND x.data = l.data
+            RETURNING {", ".join("x." + col for col in t.colunas.split(", "))}
+        )
+        INSERT INTO {t.tabela}_arquivo ({t.colunas})
+        SELECT {t.colunas} FROM movidas
+    """
+
+
+def data_de_corte(meses: Optional[int] = None) -> datetime.date:
+    """Primeiro dia do mês, `meses` meses atrás."""
+    meses = ARQUIVO_CONFIG["meses"] if meses is None else meses
+    hoje = datetime.date.today()
+    total = hoje.year * 12 + hoje.month - 1 - meses
+    return datetime.date(total // 12, total % 12 + 1, 1)
+
+
+def arquivar_tabela(
+    t: Arquivavel,
+    corte: datetime.date,
+    lote: Optional[int] = None,
+    pausa: Optional[float] = None,
+) -> int:
+    """Move as linhas encerradas de `t` anteriores a `corte`; devolve quantas."""
+    return executar_em_lotes(
+        _sql_lote(t),
+        (corte, STATUS_ENCERRADOS),
+        lote or ARQUIVO_CONFIG["lote"],
+        ARQUIVO_CONFIG["pausa"] if pausa is None else pausa,
+    )
+
+
+def arquivar(corte: Optional[datetime.date] = None) -> Dict[str, int]:
+    corte = corte or data_de_corte()
+    print(f"\n=== Arquivando consultas e cirurgias encerradas antes de {corte} ===")
+    movidas: Dict[str, int] = {}
+    for t in ARQUIVAVEIS:
+        try:
+            movidas[t.tabela] = arquivar_tabela(t, corte)
+        except Exception as e:
+            print(f"Erro ao arquivar {t.tabela}:", e)
+            break
+        print(f"{t.tabela}: {movidas[t.tabela]} linha(s) arquivada(s).")
+    return movidas
@@ -0,0 +1,13 @@
+"""Benchmark reprodutível das consultas do PetVida.
+
+Uso (a partir da pasta petvida/):
+
+    python -m benchmark --escala 1 --saida resultados.json
+    python -m benchmark --escala 1 --comparar resultados_anteriores.json
+    python -m benchmark.custo_senha --alvo-ms 250
+
+Ganho dos comandos preparados (mesmos dados, com e sem PREPARE):
+
+    python -m benchmark --escala 1 --sem-preparar --manter --saida sem.json
+    python -m benchmark --sem-carga --comparar sem.json
+"""
@@ -0,0 +1,155 @@
+import argparse
+import copy
+import datetime
+import json
+import platform
+import re
+import sys
+from pathlib import Path
+from typing import Optional
+
+from psycopg2 import sql
+
+from config import DB_CONFIG, POOL_CONFIG
+from pool import conexao, fechar_pool, iniciar_pool
+
+from .cenarios import cenarios, medir
+from .gerador import Escala, gerar
+
+
+def _argumentos() -> argparse.Namespace:
+    p = argparse.ArgumentParser(
+        prog="python -m benchmark",
+        description="Gera dados sintéticos num schema descartável e mede as consultas.",
+    )
+    p.add_argument("--escala", type=float, default=1.0, help="fator de escala (1 = 1.000 tutores)")
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument(
+        "--esquema",
+        default="petvida_bench",
+        help="schema descartável usado no teste (nome terminado em _bench; é apagado)",
+    )
+    p.add_argument("--repeticoes", type=int, default=50)
+    p.add_argument("--aquecimento", type=int, default=5)
+    p.add_argument("--cenario", action="append", help="roda só os cenários indicados")
+    p.add_argument("--saida", type=Path, default=Path("resultados_benchmark.json"))
+    p.add_argument("--comparar", type=Path, help="JSON de uma execução anterior")
+    p.add_argument("--manter", action="store_true", help="não apaga o schema ao final")
+    p.add_argument("--sem-carga", action="store_true", help="reaproveita dados já gerados")
+    p.add_argument(
+        "--sem-preparar",
+        action="store_true",
+        help="desliga PREPARE/EXECUTE (para comparar o ganho dos comandos preparados)",
+    )
+    args = p.parse_args()
+    motivo = _esquema_protegido(args.esquema)
+    if motivo:
+        p.error(f"--esquema {args.esquema}: {motivo}")
+    return args
+
+
+def _esquema_protegido(esquema: str) -> Optional[str]:
+    """Motivo para não apagar `esquema` com DROP SCHEMA ... CASCADE, ou None."""
+    caminho = re.search(r"search_path=(\S+)", DB_CONFIG.get("options", ""))
+    em_uso = caminho.group(1).split(",") if caminho else []
+    if esquema in em_uso or esquema == "public" or esquema.startswith("pg_"):
+        return "é um schema da aplicação ou do PostgreSQL"
+    if not esquema.endswith("_bench"):
+        return "o nome precisa terminar em _bench"
+    return None
+
+
+def _recriar_esquema(esquema: str) -> None:
+    with conexao() as conn:
+        with conn.cursor() as c:
+            c.execute(
+                sql.SQL("DROP SCHEMA IF EXISTS {e} CASCADE; CREATE SCHEMA {e};").format(
+                    e=sql.Identifier(esquema)
+                )
+            )
+        conn.commit()
+
+
+def _apagar_esquema(esquema: str) -> None:
+    with conexao() as conn:
+        with conn.cursor() as c:
+            c.execute(sql.SQL("DROP SCHEMA IF EXISTS {} CASCADE").format(sql.Identifier(esquema)))
+        conn.commit()
+
+
+def _comparar(atual: dict, anterior: dict) -> None:
+    print(f"\n{'cenário':<34}{'p50 antes':>11}{'p50 agora':>11}{'Δ p50':>9}{'Δ p95':>9}")
+    for nome, r in atual["cenarios"].items():
+        a = anterior.get("cenarios", {}).get(nome)
+        if not a:
+            continue
+        d50 = (r["p50_ms"] / a["p50_ms"] - 1) * 100 if a["p50_ms"] else 0.0
+        d95 = (r["p95_ms"] / a["p95_ms"] - 1) * 100 if a["p95_ms"] else 0.0
+        print(f"{nome:<34}{a['p50_ms']:>11.3f}{r['p50_ms']:>11.3f}{d50:>+8.1f}%{d95:>+8.1f}%")
+
+
+def main() -> int:
+    args = _argumentos()
+    escala = Escala.fator(args.escala)
+
+    POOL_CONFIG["preparar_consultas"] = not args.sem_preparar
+    db_config = copy.deepcopy(DB_CONFIG)
+    # public fica no search_path: é onde estão pg_trgm e btree_gist (0006, 0009)
+    db_config["options"] = f"-c search_path={args.esquema},public"
+    if not iniciar_pool(db_config):
+        return 1
+
+    try:
+        if not args.sem_carga:
+            from migracoes import aplicar_migracoes
+
+            print(f"Recriando schema {args.esquema} e aplicando migrações...")
+            _recriar_esquema(args.esquema)
+            if not aplicar_migracoes(args.esquema):
+                return 1
+            print(f"Gerando dados: {escala._asdict()} (seed {args.seed})...")
+            gerar(escala, args.seed)
+
+        with conexao() as conn, conn.cursor() as c:
+            c.execute("SHOW server_version")
+            versao_pg = c.fetchone()[0]
+
+        resultados = {}
+        for cen in cenarios(escala.tutores, escala.veterinarios):
+            if args.cenario and cen.nome not in args.cenario:
+                continue
+            # o streaming percorre a tabela inteira: menos repetições
+            reps = max(1, args.repeticoes // 10) if cen.nome.endswith("_stream") else args.repeticoes
+            r = medir(cen, reps, args.aquecimento if reps > 1 else 0, args.seed)
+            resultados[cen.nome] = r
+            print(f"{cen.nome:<34} p50 {r['p50_ms']:>9.3f} ms   p95 {r['p95_ms']:>9.3f} ms"
+                  f"   p99 {r['p99_ms']:>9.3f} ms")
+
+        saida = {
+            "meta": {
+                "quando": datetime.datetime.now().isoformat(timespec="seconds"),
+                "escala": args.escala,
+                "dados": escala._asdict(),
+                "seed": args.seed,
+                "repeticoes": args.repeticoes,
+                "preparadas": not args.sem_preparar,
+                "postgres": versao_pg,
+                "python": platform.python_version(),
+            },
+            "cenarios": resultados,
+        }
+        args.saida.write_text(json.dumps(saida, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"\nResultados gravados em {args.saida}")
+
+        if args.comparar:
+            _comparar(saida, json.loads(args.comparar.read_text(encoding="utf-8")))
+
+        if not args.manter:
+            _apagar_esquema(args.esquema)
+    finally:
+        fechar_pool()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+import datetime
+import math
+import random
+import time
+from typing import Callable, Dict, List, NamedTuple
+
+import repositorios as repo
+
+from .gerador import NOMES, SOBRENOMES
+
+
+class Cenario(NamedTuple):
+    nome: str
+    descricao: str
+    preparar: Callable[[random.Random], Callable[[], object]]
+
+
+def _login(rnd: random.Random, tutores: int) -> Callable[[], object]:
+    username = f"tutor{rnd.randrange(1, tutores + 1)}"
+    return lambda: repo.usuarios.buscar_por_username(username)
+
+
+def _cpf(rnd: random.Random, tutores: int) -> Callable[[], object]:
+    cpf = f"{rnd.randrange(1, tutores + 1):011d}"
+
+    def executar() -> object:
+        dono = repo.donos.buscar_por_cpf(cpf)
+        return dono and repo.donos.animais(dono.id_dono)
+
+    return executar
+
+
+def _consultas_cliente(rnd: random.Random, tutores: int, pagina: int) -> Callable[[], object]:
+    id_usuario = rnd.randrange(1, tutores + 1)
+
+    def executar() -> object:
+        id_dono = repo.usuarios.id_dono(id_usuario)
+        return repo.consultas.listagem_do_tutor(id_dono).pagina(pagina)
+
+    return executar
+
+
+def _consultas_vet(
+    rnd: random.Random, primeiro_vet: int, veterinarios: int, pagina: int
+) -> Callable[[], object]:
+    vet = primeiro_vet + rnd.randrange(veterinarios)
+    return lambda: repo.consultas.listagem(vet).pagina(pagina)
+
+
+def _periodo(rnd: random.Random, pagina: int) -> Callable[[], object]:
+    fim = datetime.date(2025, 1, 1) - datetime.timedelta(days=rnd.randrange(700))
+    inicio = fim - datetime.timedelta(days=30)
+    return lambda: repo.consultas.listagem(None, str(inicio), str(fim)).pagina(pagina)
+
+
+def _busca(rnd: random.Random) -> Callable[[], object]:
+    termo = f"{rnd.choice(NOMES)} {rnd.choice(SOBRENOMES)}"[: rnd.randrange(4, 10)]
+    return lambda: repo.animais.buscar(termo, 10)
+
+
+def _stream(listagem: repo.Listagem) -> int:
+    return sum(1 for _ in listagem.iterar())
+
+
+def cenarios(tutores: int, veterinarios: int, pagina: int = 50) -> List[Cenario]:
+    """Cenários usados pelas telas; cada `preparar` sorteia os parâmetros da execução."""
+    primeiro_vet = tutores + 1
+    return [
+        Cenario("login", "usuario WHERE username = %s", lambda r: _login(r, tutores)),
+        Cenario(
+            "join_consultas",
+            "primeira página de todas as consultas",
+            lambda r: lambda: repo.consultas.listagem().pagina(pagina),
+        ),
+        Cenario(
+            "join_consultas_vet",
+            "primeira página das consultas de um veterinário",
+            lambda r: _consultas_vet(r, primeiro_vet, veterinarios, pagina),
+        ),
+        Cenario(
+            "join_consultas_stream",
+            "todas as consultas via cursor no servidor",
+            lambda r: lambda: _stream(repo.consultas.listagem()),
+        ),
+        Cenario(
+            "listar_consultas_por_periodo",
+            "primeira página de uma janela de 30 dias",
+            lambda r: _periodo(r, pagina),
+        ),
+        Cenario("buscar_dono_por_cpf", "tutor pelo CPF + seus animais", lambda r: _cpf(r, tutores)),
+        Cenario(
+            "mostrar_consultas_cliente",
+            "id_dono do usuário + primeira página das consultas",
+            lambda r: _consultas_cliente(r, tutores, pagina),
+        ),
+        Cenario(
+            "buscar_animal",
+            "seletor: trecho do nome do tutor (trigramas)",
+            lambda r: _busca(r),
+        ),
+        Cenario(
+            "relatorio_qtd_animais_por_tutor",
+            "todos os tutores pelo contador total_animais",
+            lambda r: lambda: repo.donos.qtd_animais_por_tutor(),
+        ),
+    ]
+
+
+def percentil(amostras: List[float], p: float) -> float:
+    """Percentil pelo método nearest-rank (amostras já ordenadas)."""
+    if not amostras:
+        return 0.0
+    k = max(1, math.ceil(p / 100 * len(amostras)))
+    return amostras[k - 1]
+
+
+def medir(cenario: Cenario, repeticoes: int, aquecimento: int, seed: int) -> Dict[str, float]:
+    rnd = random.Random(f"{seed}:{cenario.nome}")
+    for _ in range(aquecimento):
+        cenario.preparar(rnd)()
+
+    tempos = []
+    for _ in range(repeticoes):
+        executar = cenario.preparar(rnd)
+        inicio = time.perf_counter()
+        executar()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+
+    tempos.sort()
+    return {
+        "n": len(tempos),
+        "min_ms": round(tempos[0], 3),
+        "p50_ms": round(percentil(tempos, 50), 3),
+        "p95_ms": round(percentil(tempos, 95), 3),
+        "p99_ms": round(percentil(tempos, 99), 3),
+        "max_ms": round(tempos[-1], 3),
+        "media_ms": round(sum(tempos) / len(tempos), 3),
+    }
@@ -0,0 +1,74 @@
+"""Escolhe o custo do bcrypt para uma latência-alvo por hash nesta máquina.
+
+Uso (a partir da pasta petvida/, não precisa de banco):
+
+    python -m benchmark.custo_senha --alvo-ms 250
+
+Mede a mediana de alguns hashes em cada custo, do mínimo até passar do
+alvo, e recomenda o maior custo que ainda fica dentro dele. O valor vai
+em SENHA_CONFIG["custo_bcrypt"] (ou PETVIDA_BCRYPT_CUSTO).
+"""
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from config import SENHA_CONFIG
+from senhas import gerar_hash_senha
+
+from .cenarios import percentil
+
+CUSTO_MINIMO = 4
+CUSTO_MAXIMO = 18
+
+
+def _argumentos() -> argparse.Namespace:
+    p = argparse.ArgumentParser(
+        prog="python -m benchmark.custo_senha",
+        description="Mede o bcrypt em cada custo e recomenda um para a latência-alvo.",
+    )
+    p.add_argument("--alvo-ms", type=float, default=250.0, help="tempo desejado por hash")
+    p.add_argument("--amostras", type=int, default=5, help="hashes medidos por custo")
+    return p.parse_args()
+
+
+def medir_custo(custo: int, amostras: int) -> float:
+    """Mediana, em ms, de `amostras` hashes no `custo` indicado."""
+    tempos = []
+    for _ in range(amostras):
+        inicio = time.perf_counter()
+        gerar_hash_senha("benchmark-petvida-1", custo)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return percentil(sorted(tempos), 50)
+
+
+def _vazao(custo: int, threads: int, total: int) -> float:
+    """Hashes por segundo com `threads` em paralelo (pool do senhas.py)."""
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as ex:
+        list(ex.map(lambda _: gerar_hash_senha("benchmark-petvida-1", custo), range(total)))
+    return total / (time.perf_counter() - inicio)
+
+
+def main() -> int:
+    args = _argumentos()
+    escolhido = CUSTO_MINIMO
+
+    print(f"{'custo':>5}{'mediana (ms)':>15}")
+    for custo in range(CUSTO_MINIMO, CUSTO_MAXIMO + 1):
+        ms = medir_custo(custo, args.amostras)
+        print(f"{custo:>5}{ms:>15.1f}")
+        if ms > args.alvo_ms:
+            break
+        escolhido = custo
+
+    threads = SENHA_CONFIG["threads"]
+    vazao = _vazao(escolhido, threads, threads * 2)
+    print(f"\nCusto recomendado para ~{args.alvo_ms:.0f} ms: {escolhido}")
+    print(f"Vazão com {threads} threads: {vazao:.1f} logins/s")
+    print(f"Atual em SENHA_CONFIG: {SENHA_CONFIG['custo_bcrypt']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+import datetime
+import random
+from typing import Iterator, NamedTuple
+
+from importacao import FluxoCopy
+from pool import conexao
+from senhas import gerar_hash_senha
+
+ESPECIES = {
+    "Cachorro": ["Vira lata", "Labrador", "Poodle", "Pinscher", "Shih tzu", "Golden"],
+    "Gato": ["Siames", "Persa", "Sem raca definida", "Maine coon"],
+    "Passaro": ["Calopsita", "Periquito", "Canario"],
+    "Coelho": ["Mini lop", "Angora"],
+}
+NOMES = ["Ana", "Bruno", "Carla", "Diego", "Elisa", "Fabio", "Gabriela", "Heitor",
+         "Iris", "Joao", "Karina", "Lucas", "Marina", "Nelson", "Olivia", "Paulo"]
+SOBRENOMES = ["Silva", "Souza", "Barros", "Cirilo", "Lima", "Costa", "Alves", "Rocha"]
+PETS = ["Rex", "Mel", "Thor", "Luna", "Bob", "Nina", "Fred", "Lola", "Toby", "Amora"]
+MOTIVOS = ["Vacinação", "Retorno", "Check-up", "Vômito", "Coceira", "Claudicação"]
+CIRURGIAS = ["Castração", "Retirada de tumor", "Ortopédica", "Limpeza dentária"]
+STATUS = ["agendada", "realizada", "realizada", "realizada", "cancelada"]
+
+# Senha de todos os usuários gerados (o hash é calculado uma vez só).
+SENHA_BENCH = "bench1234"
+
+
+class Escala(NamedTuple):
+    tutores: int
+    animais_por_tutor: int
+    consultas_por_animal: int
+    veterinarios: int
+    cirurgias_por_100_animais: int
+    dias_historico: int
+
+    @classmethod
+    def fator(cls, sf: float) -> "Escala":
+        """Escala 1 = 1.000 tutores, ~2.000 animais, ~10.000 consultas."""
+        return cls(
+            tutores=max(1, int(1000 * sf)),
+            animais_por_tutor=2,
+            consultas_por_animal=5,
+            veterinarios=max(1, int(10 * sf ** 0.5)),
+            cirurgias_por_100_animais=20,
+            dias_historico=730,
+        )
+
+
+def _copiar(c, tabela: str, colunas: str, linhas: Iterator[tuple]) -> None:
+    c.copy_expert(f"COPY {tabela} ({colunas}) FROM STDIN WITH (FORMAT csv)", FluxoCopy(linhas))
+
+
+def gerar(escala: Escala, seed: int = 42) -> None:
+    """Popula o schema do search_path atual (já migrado e vazio).
+
+    Tudo deriva de random.Random(seed): a mesma escala e seed geram
+    exatamente os mesmos dados. IDs são explícitos e as sequences
+    ajustadas no final.
+    """
+    rnd = random.Random(seed)
+    hoje = datetime.date(2025, 1, 1)
+    senha_hash = gerar_hash_senha(SENHA_BENCH, custo=4)
+
+    n_animais = escala.tutores * escala.animais_por_tutor
+    id_primeiro_vet = escala.tutores + 1
+
+    def donos() -> Iterator[tuple]:
+        for i in range(1, escala.tutores + 1):
+            nome = f"{rnd.choice(NOMES)} {rnd.choice(SOBRENOMES)}"
+            yield (i, nome, f"{i:011d}", f"tutor{i}@exemplo.com", "Rua Exemplo, 1",
+                   f"82{rnd.randrange(10**8):08d}")
+
+    def usuarios() -> Iterator[tuple]:
+        for i in range(1, escala.tutores + 1):
+            yield (i, f"tutor{i}", senha_hash, "cliente", i)
+        for v in range(escala.veterinarios):
+            yield (id_primeiro_vet + v, f"vet{v + 1}", senha_hash, "veterinario", None)
+        yield (id_primeiro_vet + escala.veterinarios, "admin", senha_hash, "admin", None)
+
+    def animais() -> Iterator[tuple]:
+        for i in range(1, n_animais + 1):
+            especie = rnd.choice(list(ESPECIES))
+            yield (i, rnd.choice(PETS), especie, rnd.choice(ESPECIES[especie]),
+                   rnd.randrange(0, 20), (i - 1) // escala.animais_por_tutor + 1)
+
+    def consultas() -> Iterator[tuple]:
+        id_consulta = 0
+        # a agenda de cada vet não pode ter dois horários iguais (migração 0009)
+        ocupados = set()
+        for id_animal in range(1, n_animais + 1):
+            for _ in range(escala.consultas_por_animal):
+                id_consulta += 1
+                for _ in range(20):
+                    dia = hoje - datetime.timedelta(days=rnd.randrange(escala.dias_historico))
+                    hora = datetime.time(rnd.randrange(8, 18), rnd.choice((0, 30)))
+                    id_vet = id_primeiro_vet + rnd.randrange(escala.veterinarios)
+                    if (id_vet, dia, hora) not in ocupados:
+                        ocupados.add((id_vet, dia, hora))
+                        break
+                else:
+                    id_vet = None  # agenda lotada nas escalas grandes: sem vet
+                yield (id_consulta, dia, hora, rnd.choice(MOTIVOS), rnd.choice(STATUS),
+                       rnd.choice(("normal", "normal", "normal", "urgente")), id_animal,
+                       id_vet)
+
+    def cirurgias() -> Iterator[tuple]:
+        total = n_animais * escala.cirurgias_por_100_animais // 100
+        for i in range(1, total + 1):
+            dia = hoje - datetime.timedelta(days=rnd.randrange(escala.dias_historico))
+            yield (i, dia, rnd.choice(CIRURGIAS), rnd.choice(STATUS[:2]),
+                   rnd.randrange(1, n_animais + 1))
+
+    with conexao() as conn:
+        try:
+            with conn.cursor() as c:
+                # a 0007 só cria partições de hoje em diante; sem as do histórico
+                # tudo cairia na partição padrão e os cenários por período não
+                # mediriam o pruning
+                inicio = hoje - datetime.timedelta(days=escala.dias_historico - 1)
+                for tabela in ("consulta", "cirurgia"):
+                    c.execute("SELECT criar_particoes_mensais(%s, %s, %s)", (tabela, inicio, hoje))
+                _copiar(c, "dono", "id_dono, nome, cpf, email, endereco, telefone", donos())
+                _copiar(c, "usuario", "id_usuario, username, senha_cripto, tipo, id_dono",
+                        usuarios())
+                _copiar(c, "animal", "id_animal, nome, especie, raca, idade, id_dono", animais())
+                _copiar(c, "consulta",
+                        "id_consulta, data, horario, motivo, status, prioridade, id_animal, id_vet",
+                        consultas())
+                _copiar(c, "cirurgia", "id_cirurgia, data, tipo_cirurgia, status, id_animal",
+                        cirurgias())
+                for tabela, coluna in (("dono", "id_dono"), ("usuario", "id_usuario"),
+                                       ("animal", "id_animal"), ("consulta", "id_consulta"),
+                                       ("cirurgia", "id_cirurgia")):
+                    c.execute(
+                        f"SELECT setval(pg_get_serial_sequence('{tabela}', '{coluna}'), "
+                        f"(SELECT coalesce(max({coluna}), 1) FROM {tabela}))"
+                    )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        # estatísticas atualizadas para o planejador antes de medir; só as
+        # tabelas carregadas (as do schema do benchmark, primeiro no search_path)
+        conn.autocommit = True
+        with conn.cursor() as c:
+            c.execute("ANALYZE dono, usuario, animal, consulta, cirurgia")
+        conn.autocommit = False
@@ -0,0 +1,252 @@
+"""Comandos não interativos para scripts e cron: `python main.py <comando>`.
+
+    python main.py consultas --from 2025-01-01 --to 2025-01-31 --vet 3
+    python main.py tutor --cpf 12345678901
+    python main.py report animais-por-tutor --format csv
+    python main.py animais
+    python main.py consulta add --animal 10 --data 2025-02-03 --horario 09:30 --motivo Vacina
+    python main.py consulta cancel --id 42
+
+A saída é JSON Lines (padrão) ou CSV em stdout, escrita à medida que as
+linhas chegam do cursor no servidor; mensagens de erro vão para stderr.
+Não há menu, animação nem checagem de esquema.
+
+Credenciais (só admin e veterinário): PETVIDA_USUARIO e PETVIDA_SENHA ou
+um arquivo de token (PETVIDA_TOKEN_FILE, padrão ~/.petvida_token) com
+"usuario:senha" numa linha, legível só pelo dono (chmod 600). Veterinário
+só vê e cancela as próprias consultas.
+
+Códigos de saída: 0 ok, 1 erro, 2 uso incorreto, 3 autenticação recusada.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import uuid
+from itertools import chain
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional, Sequence
+
+import repositorios as repo
+from config import LISTAGEM_CONFIG
+from exportacao import RELATORIOS
+from pool import PoolIndisponivel, fechar_pool, obter_pool
+from replicas import conexao_leitura
+from repositorios import Usuario
+
+TIPOS_PERMITIDOS = ("admin", "veterinario")
+
+OK, ERRO, AUTENTICACAO = 0, 1, 3
+
+
+class ErroCli(Exception):
+    """Falha já explicada ao usuário; vira mensagem em stderr e código de saída."""
+
+    def __init__(self, mensagem: str, codigo: int = ERRO) -> None:
+        super().__init__(mensagem)
+        self.codigo = codigo
+
+
+# SAÍDA
+def _emitir(formato: str, campos: Sequence[str], linhas: Iterable[Sequence[Any]]) -> int:
+    """Escreve as linhas em JSON Lines ou CSV; devolve quantas."""
+    saida = sys.stdout
+    total = 0
+    if formato == "csv":
+        escritor = csv.writer(saida)
+        escritor.writerow(campos)
+        for linha in linhas:
+            escritor.writerow(linha)
+            total += 1
+    else:
+        for linha in linhas:
+            saida.write(json.dumps(dict(zip(campos, linha)), default=str, ensure_ascii=False))
+            saida.write("\n")
+            total += 1
+    saida.flush()
+    return total
+
+
+# AUTENTICAÇÃO
+def _credenciais() -> Sequence[str]:
+    usuario = os.environ.get("PETVIDA_USUARIO")
+    senha = os.environ.get("PETVIDA_SENHA")
+    if usuario and senha:
+        return usuario, senha
+
+    arquivo = Path(os.environ.get("PETVIDA_TOKEN_FILE", "~/.petvida_token")).expanduser()
+    if not arquivo.exists():
+        raise ErroCli(
+            "sem credenciais: defina PETVIDA_USUARIO e PETVIDA_SENHA ou crie "
+            f"{arquivo} com 'usuario:senha'",
+            AUTENTICACAO,
+        )
+    if os.name == "posix" and arquivo.stat().st_mode & 0o077:
+        raise ErroCli(f"{arquivo} pode ser lido por outros usuários; use chmod 600", AUTENTICACAO)
+    usuario, _, senha = arquivo.read_text(encoding="utf-8").strip().partition(":")
+    if not usuario or not senha:
+        raise ErroCli(f"{arquivo} deve conter 'usuario:senha'", AUTENTICACAO)
+    return usuario, senha
+
+
+def _autenticar() -> Usuario:
+    from senhas import verificar_senha
+
+    username, senha = _credenciais()
+    u = repo.usuarios.buscar_por_username(username)
+    if not u:
+        raise ErroCli("usuário ou senha incorretos", AUTENTICACAO)
+    if u.bloqueado:
+        raise ErroCli("usuário bloqueado por muitas tentativas de login", AUTENTICACAO)
+    if not verificar_senha(senha, u.senha_cripto):
+        repo.usuarios.registrar_falha(u.id_usuario)
+        raise ErroCli("usuário ou senha incorretos", AUTENTICACAO)
+    if u.tipo not in TIPOS_PERMITIDOS:
+        raise ErroCli(f"usuários do tipo '{u.tipo}' não usam a linha de comando", AUTENTICACAO)
+    repo.usuarios.zerar_tentativas(u.id_usuario)
+    return u
+
+
+def _vet_permitido(u: Usuario, pedido: Optional[int]) -> Optional[int]:
+    """Veterinário fica restrito às próprias consultas."""
+    if u.tipo != "veterinario":
+        return pedido
+    if pedido not in (None, u.id_usuario):
+        raise ErroCli("veterinário só acessa as próprias consultas")
+    return u.id_usuario
+
+
+# COMANDOS
+def _consultas(args: argparse.Namespace, u: Usuario) -> None:
+    if (args.filtro_de is None) != (args.filtro_ate is None):
+        raise ErroCli("--from e --to devem ser usados juntos")
+    listagem = repo.consultas.listagem(
+        _vet_permitido(u, args.filtro_vet), args.filtro_de, args.filtro_ate
+    )
+    _emitir(args.formato, listagem.tipo._fields, listagem.iterar())
+
+
+def _tutor(args: argparse.Namespace, u: Usuario) -> None:
+    dono = repo.donos.buscar_por_cpf(args.cpf)
+    if not dono:
+        raise ErroCli("nenhum tutor com esse CPF")
+    _emitir(args.formato, dono._fields, [dono])
+
+
+def _animais(args: argparse.Namespace, u: Usuario) -> None:
+    if args.cpf:
+        dono = repo.donos.buscar_por_cpf(args.cpf)
+        if not dono:
+            raise ErroCli("nenhum tutor com esse CPF")
+        _emitir(args.formato, repo.Animal._fields, repo.donos.animais(dono.id_dono))
+        return
+    listagem = repo.animais.listagem()
+    _emitir(args.formato, listagem.tipo._fields, listagem.iterar())
+
+
+def _relatorio(args: argparse.Namespace, u: Usuario) -> None:
+    sql, params = RELATORIOS[args.relatorio].sql()
+    with conexao_leitura() as conn:
+        with conn.cursor(name=f"petvida_{uuid.uuid4().hex[:12]}") as c:
+            c.itersize = LISTAGEM_CONFIG["itersize"]
+            c.execute(sql, params)
+            # num cursor nomeado, description só existe depois da 1ª busca
+            linhas = iter(c)
+            primeira = next(linhas, None)
+            campos = [d.name for d in c.description or ()]
+            _emitir(args.formato, campos, () if primeira is None else chain([primeira], linhas))
+
+
+def _consulta_add(args: argparse.Namespace, u: Usuario) -> None:
+    from psycopg2 import errors as pg_errors
+
+    id_vet = u.id_usuario if u.tipo == "veterinario" else args.consulta_vet
+    try:
+        id_consulta = repo.consultas.criar(
+            args.animal, args.data, args.horario, args.motivo, args.diagnostico, id_vet
+        )
+    except pg_errors.ExclusionViolation:
+        raise ErroCli("o veterinário já tem consulta nesse horário")
+    except repo.AnimalInativo as e:
+        raise ErroCli(str(e))
+    _emitir(args.formato, ("id_consulta",), [(id_consulta,)])
+
+
+def _consulta_cancel(args: argparse.Namespace, u: Usuario) -> None:
+    somente_vet_id = u.id_usuario if u.tipo == "veterinario" else None
+    if not repo.consultas.cancelar(args.id, somente_vet_id):
+        raise ErroCli("consulta não encontrada, não agendada ou de outro veterinário")
+    _emitir(args.formato, ("id_consulta", "status"), [(args.id, "cancelada")])
+
+
+def adicionar_subcomandos(parser: argparse.ArgumentParser) -> None:
+    """Registra os subcomandos no parser do main.py."""
+    comum = argparse.ArgumentParser(add_help=False)
+    comum.add_argument(
+        "--format", dest="formato", choices=("jsonl", "csv"), default="jsonl",
+        help="formato da saída (padrão: jsonl)",
+    )
+
+    sub = parser.add_subparsers(dest="comando", metavar="COMANDO")
+
+    p = sub.add_parser("consultas", parents=[comum], help="lista consultas")
+    p.add_argument("--from", dest="filtro_de", metavar="AAAA-MM-DD")
+    p.add_argument("--to", dest="filtro_ate", metavar="AAAA-MM-DD")
+    p.add_argument("--vet", dest="filtro_vet", type=int, metavar="ID")
+    p.set_defaults(executar=_consultas)
+
+    p = sub.add_parser("tutor", parents=[comum], help="dados de um tutor")
+    p.add_argument("--cpf", required=True)
+    p.set_defaults(executar=_tutor)
+
+    p = sub.add_parser("animais", parents=[comum], help="lista animais (todos ou de um tutor)")
+    p.add_argument("--cpf", help="só os animais deste tutor")
+    p.set_defaults(executar=_animais)
+
+    p = sub.add_parser("report", parents=[comum], help="relatórios")
+    p.add_argument("relatorio", choices=list(RELATORIOS))
+    p.set_defaults(executar=_relatorio)
+
+    p = sub.add_parser("consulta", help="agenda ou cancela uma consulta")
+    acoes = p.add_subparsers(dest="acao", metavar="ACAO", required=True)
+    a = acoes.add_parser("add", parents=[comum], help="agenda uma consulta")
+    a.add_argument("--animal", type=int, required=True, metavar="ID")
+    a.add_argument("--data", required=True, metavar="AAAA-MM-DD")
+    a.add_argument("--horario", required=True, metavar="HH:MM")
+    a.add_argument("--motivo", required=True)
+    a.add_argument("--diagnostico")
+    a.add_argument(
+        "--vet", dest="consulta_vet", type=int, metavar="ID",
+        help="veterinário responsável (para veterinário, sempre ele mesmo)",
+    )
+    a.set_defaults(executar=_consulta_add)
+    a = acoes.add_parser("cancel", parents=[comum], help="cancela uma consulta agendada")
+    a.add_argument("--id", type=int, required=True)
+    a.set_defaults(executar=_consulta_cancel)
+
+
+def executar(args: argparse.Namespace) -> int:
+    """Roda o subcomando escolhido e devolve o código de saída."""
+    comando: Callable[[argparse.Namespace, Usuario], None] = args.executar
+    try:
+        obter_pool()
+    except PoolIndisponivel as e:
+        print(f"petvida: banco indisponível: {e}", file=sys.stderr)
+        return ERRO
+    try:
+        comando(args, _autenticar())
+        return OK
+    except ErroCli as e:
+        print(f"petvida: {e}", file=sys.stderr)
+        return e.codigo
+    except BrokenPipeError:
+        # leitor fechou o pipe (ex.: | head): o que sobrou no buffer do stdout
+        # vai para /dev/null, senão o flush da saída do Python gera outro erro
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return ERRO
+    except Exception as e:
+        print(f"petvida: erro: {e}", file=sys.stderr)
+        return ERRO
+    finally:
+        fechar_pool()
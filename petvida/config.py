@@ -1,5 +1,4 @@
 import os
-import bcrypt  # pip install bcrypt
 
 # Config do banco
 DB_CONFIG = {
@@ -8,20 +7,117 @@ DB_CONFIG = {
     "dbname": "postgres",
     "user": "postgres",
     "password": "2904",
-    "options": "-c search_path=petvida"
+    "options": "-c search_path=petvida,public"
 }
 
-def gerar_hash_senha(senha_clara: str) -> str:
-    senha_bytes = senha_clara.encode("utf-8")
-    hash_bytes = bcrypt.hashpw(senha_bytes, bcrypt.gensalt())
-    return hash_bytes.decode("utf-8")
+# Com PETVIDA_DSN, o primário vem de uma DSN (ex.: "host=db1 dbname=petvida user=app")
+if os.environ.get("PETVIDA_DSN"):
+    DB_CONFIG = {"dsn": os.environ["PETVIDA_DSN"], "options": DB_CONFIG["options"]}
 
+# Réplicas de leitura (replicas.py). Sem DSNs, tudo vai para o primário.
+REPLICAS_CONFIG = {
+    # DSNs separadas por ";", ex.: "host=db2 dbname=petvida user=app;host=db3 ..."
+    "dsns": [d.strip() for d in os.environ.get("PETVIDA_REPLICAS", "").split(";") if d.strip()],
+    "politica": os.environ.get("PETVIDA_REPLICAS_POLITICA", "round-robin"),  # ou "menor-latencia"
+    "atraso_max_s": 5.0,           # réplica mais atrasada que isso não recebe leituras
+    "verificar_atraso_apos": 2.0,  # segundos entre medições do atraso de cada réplica
+    "janela_proprias_escritas": 5.0,  # após um COMMIT da sessão, lê do primário por N s
+    "pausa_apos_falha": 30.0,      # réplica que não conectou fica fora por N s
+    "max_conexoes": 5,             # por réplica
+}
+
+# Pool de conexões (pool.py)
+POOL_CONFIG = {
+    "min_conexoes": 1,
+    "max_conexoes": 10,
+    "espera_checkout": 30.0,       # segundos aguardando conexão livre
+    "verificar_apos": 30.0,        # checa a conexão se ficou ociosa mais que isso
+    "tentativas_reconexao": 5,
+    "backoff_inicial": 0.5,        # segundos; dobra a cada tentativa
+    "backoff_maximo": 8.0,
+    # PREPARE/EXECUTE nas consultas mais frequentes (preparadas.py); desligue
+    # atrás de um pgbouncer em modo transação, que não preserva a sessão
+    "preparar_consultas": True,
+    # comandos preparados por conexão; além disso, o usado há mais tempo sai
+    "max_preparadas": 64,
+}
+
+# Pool assíncrono (pool_async.py): muitas sessões num único event loop
+POOL_ASYNC_CONFIG = {
+    "max_conexoes": 20,
+    "espera_checkout": 30.0,
+}
+
+# Listagens: paginação por chave (keyset) e cursores no servidor
+LISTAGEM_CONFIG = {
+    "tamanho_pagina": 50,   # 0 = sem paginação, imprime tudo em streaming
+    "itersize": 2000,       # linhas por ida ao servidor no cursor nomeado
+    "resultados_busca": 10, # linhas mostradas pelo seletor de busca
+}
+
+# Log de consultas lentas (consultas_lentas.py). Desligado, não há custo algum:
+# as conexões usam o cursor padrão do psycopg2.
+CONSULTAS_LENTAS = {
+    "ativo": os.environ.get("PETVIDA_SLOW_LOG", "0") == "1",
+    "limite_ms": float(os.environ.get("PETVIDA_SLOW_MS", "200")),
+    # grava também o plano estimado (EXPLAIN, sem ANALYZE: não executa de novo)
+    "explain": os.environ.get("PETVIDA_SLOW_EXPLAIN", "0") == "1",
+    "arquivo": os.environ.get("PETVIDA_SLOW_ARQUIVO", "consultas_lentas.log"),
+    "tamanho_max_bytes": 5 * 1024 * 1024,
+    "arquivos_antigos": 3,
+}
+
+# Senhas (senhas.py). Custo do bcrypt: cada +1 dobra o tempo por hash.
+# Hashes gravados com outro custo são refeitos no próximo login.
+SENHA_CONFIG = {
+    "custo_bcrypt": int(os.environ.get("PETVIDA_BCRYPT_CUSTO", "12")),
+    "threads": 4,           # hashes/verificações simultâneos fora da thread chamadora
+}
+
+# Partições mensais de consulta e cirurgia (migração 0007)
+PARTICOES_CONFIG = {
+    "meses_a_frente": 3,    # `python main.py --particoes` cria até este mês
+}
+
+# Arquivamento de consultas/cirurgias encerradas (arquivamento.py)
+ARQUIVO_CONFIG = {
+    "meses": 24,            # arquiva o que terminou antes do 1º dia de N meses atrás
+    "lote": 1000,           # linhas movidas por transação
+    "pausa": 0.5,           # segundos entre lotes
+}
+
+# Purga de tutores e animais excluídos (purga.py)
+PURGA_CONFIG = {
+    "carencia_horas": 24,   # excluídos há menos que isso ainda podem ser restaurados
+    "lote": 1000,           # linhas apagadas por transação
+    "pausa": 0.5,           # segundos entre lotes
+}
+
+# Agenda dos veterinários: horários livres e duração padrão das consultas
+AGENDA_CONFIG = {
+    "inicio": "08:00",
+    "fim": "18:00",            # última consulta termina até este horário
+    "duracao_minutos": 30,     # duração de cada consulta nova e de cada horário livre
+    "dias_semana": [1, 2, 3, 4, 5],  # ISO: 1 = segunda ... 7 = domingo
+}
+
+# Painel da clínica (painel.py)
+PAINEL_CONFIG = {
+    "ttl_s": float(os.environ.get("PETVIDA_PAINEL_TTL", "60")),  # validade do painel guardado
+}
 
-def verificar_senha(senha_digitada: str, senha_hash: str) -> bool:
-    try:
-        return bcrypt.checkpw(
-            senha_digitada.encode("utf-8"),
-            senha_hash.encode("utf-8")
-        )
-    except Exception:
-        return False
+# Saída das listagens (saida.py)
+SAIDA_CONFIG = {
+    "limite": int(os.environ.get("PETVIDA_LIMITE", "0")),  # máx. de linhas por listagem; 0 = todas
+    "linhas_por_bloco": 1000,  # linhas formatadas por escrita no terminal
+    # pager das listagens sem paginação (tamanho_pagina = 0), ex.: "less -S"
+    "pager": os.environ.get("PETVIDA_PAGER", ""),
+}
+
+# Inicialização do menu (inicio.py)
+INICIO_CONFIG = {
+    # animação "Carregando..." ao abrir cada menu (0,75 s); desligada por padrão
+    "animacoes": os.environ.get("PETVIDA_ANIMACOES", "0") == "1",
+    # conecta e confere o esquema em segundo plano enquanto o menu é exibido
+    "checagens_em_segundo_plano": os.environ.get("PETVIDA_CHECAGEM_ADIADA", "1") == "1",
+}
@@ -0,0 +1,101 @@
+"""Cursor instrumentado que registra consultas lentas.
+
+Só é usado quando CONSULTAS_LENTAS["ativo"] está ligado (config.py ou
+PETVIDA_SLOW_LOG=1): o pool passa a abrir as conexões com
+cursor_factory=CursorInstrumentado, então todo conn.cursor() dos
+repositórios é medido sem mudar o código que o chama.
+"""
+import hashlib
+import logging
+import re
+import time
+from logging.handlers import RotatingFileHandler
+from typing import Any, Optional
+
+import psycopg2
+from psycopg2.extensions import cursor as PgCursor
+
+from config import CONSULTAS_LENTAS
+
+_log = logging.getLogger("petvida.consultas_lentas")
+
+# comandos que aceitam EXPLAIN (DDL, COPY, PREPARE, SET... não)
+_EXPLICAVEL = re.compile(r"(?i)^\s*(select|with|insert|update|delete|values|execute)\b")
+
+
+def _configurar_log() -> None:
+    if _log.handlers:
+        return
+    handler = RotatingFileHandler(
+        CONSULTAS_LENTAS["arquivo"],
+        maxBytes=CONSULTAS_LENTAS["tamanho_max_bytes"],
+        backupCount=CONSULTAS_LENTAS["arquivos_antigos"],
+        encoding="utf-8",
+    )
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+    _log.addHandler(handler)
+    _log.setLevel(logging.INFO)
+    _log.propagate = False
+
+
+def _texto(query: Any, conn: Any) -> str:
+    if isinstance(query, bytes):
+        return query.decode("utf-8", "replace")
+    if hasattr(query, "as_string"):  # psycopg2.sql.Composed
+        return query.as_string(conn)
+    return str(query)
+
+
+def impressao_digital(params: Any) -> str:
+    """Identifica os parâmetros sem gravar os valores (CPF, hashes de senha...)."""
+    if params is None:
+        return "-"
+    return hashlib.sha1(repr(params).encode("utf-8")).hexdigest()[:12]
+
+
+class CursorInstrumentado(PgCursor):
+    def execute(self, query: Any, vars: Optional[Any] = None) -> None:
+        inicio = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            ms = (time.perf_counter() - inicio) * 1000
+            if ms >= CONSULTAS_LENTAS["limite_ms"]:
+                self._registrar(query, vars, ms)
+
+    def _registrar(self, query: Any, vars: Optional[Any], ms: float) -> None:
+        _configurar_log()
+        sql = _texto(query, self.connection)
+        _log.warning(
+            "lenta %.1f ms | linhas=%s | params=%s | %s",
+            ms, self.rowcount, impressao_digital(vars), re.sub(r"\s+", " ", sql).strip(),
+        )
+        if CONSULTAS_LENTAS["explain"] and self.name is None:
+            self._explicar(sql, vars)
+
+    def _explicar(self, sql: str, vars: Optional[Any]) -> None:
+        # Só EXPLAIN, sem ANALYZE: ANALYZE executaria o comando de novo, e um
+        # SELECT também pode escrever (SELECT criar_particoes_mensais(...), CTEs com
+        # UPDATE, pg_advisory_lock). O EXPLAIN de um EXECUTE mostra o plano do
+        # comando preparado (preparadas.py).
+        if not _EXPLICAVEL.match(sql):
+            return
+        status = self.connection.get_transaction_status()
+        if status == psycopg2.extensions.TRANSACTION_STATUS_INERROR:
+            return
+        # um EXPLAIN que falhe não pode abortar a transação de quem chamou
+        em_transacao = status == psycopg2.extensions.TRANSACTION_STATUS_INTRANS
+        # cursor base: o EXPLAIN não deve ser medido (nem explicado) de novo
+        with PgCursor(self.connection) as c:
+            try:
+                if em_transacao:
+                    c.execute("SAVEPOINT petvida_explain")
+                c.execute("EXPLAIN " + sql, vars)
+                plano = "\n".join(r[0] for r in c.fetchall())
+                if em_transacao:
+                    c.execute("RELEASE SAVEPOINT petvida_explain")
+                _log.warning("plano estimado:\n%s", plano)
+            except psycopg2.Error as e:
+                if em_transacao:
+                    c.execute("ROLLBACK TO SAVEPOINT petvida_explain")
+                _log.warning("EXPLAIN falhou: %s", e)
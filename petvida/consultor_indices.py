@@ -0,0 +1,267 @@
+"""Consultor de índices: `python main.py --indices`.
+
+Roda as leituras das telas de services.py (pelos mesmos métodos dos
+repositórios) com um cursor que, antes de cada SELECT, pede o plano com
+EXPLAIN sobre os dados atuais. Aponta varreduras sequenciais e
+ordenações em tabelas grandes e, pelos catálogos do PostgreSQL, índices
+redundantes, índices nunca usados e chaves estrangeiras sem índice.
+"""
+import datetime
+import json
+import re
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from psycopg2.extensions import cursor as PgCursor
+
+import repositorios as repo
+from config import DB_CONFIG, LISTAGEM_CONFIG
+from pool import conexao, fechar_pool, iniciar_pool
+from replicas import somente_primario
+
+# Abaixo disso, Seq Scan e Sort são baratos e não são apontados.
+LIMIAR_LINHAS = 1000
+
+_planos: List[Dict[str, Any]] = []
+
+
+class CursorExplicador(PgCursor):
+    """Guarda o plano de cada leitura e então executa a consulta normalmente."""
+
+    def execute(self, query: Any, vars: Optional[Any] = None) -> None:
+        if (
+            self.name is None
+            and isinstance(query, str)
+            and re.match(r"(?i)^\s*(select|with|execute)\b", query)
+        ):
+            super().execute("EXPLAIN (FORMAT JSON) " + query, vars)
+            plano = self.fetchone()[0]
+            if isinstance(plano, str):
+                plano = json.loads(plano)
+            _planos.append(plano[0]["Plan"])
+        return super().execute(query, vars)
+
+
+class Amostra(NamedTuple):
+    username: Optional[str]
+    id_cliente: Optional[int]
+    id_vet: Optional[int]
+    ultima_data: Optional[Any]
+    cpf: Optional[str]
+    id_dono: Optional[int]
+    id_animal: Optional[int]
+    id_consulta: Optional[int]
+
+
+def _amostra() -> Amostra:
+    """Parâmetros reais para as consultas (o plano depende dos valores)."""
+    with conexao() as conn, conn.cursor() as c:
+        c.execute(
+            """
+            SELECT
+              (SELECT username FROM usuario WHERE tipo = 'cliente' LIMIT 1),
+              (SELECT id_usuario FROM usuario WHERE id_dono IS NOT NULL LIMIT 1),
+              (SELECT id_vet FROM consulta WHERE id_vet IS NOT NULL
+                GROUP BY id_vet ORDER BY count(*) DESC LIMIT 1),
+              (SELECT max(data) FROM consulta),
+              (SELECT cpf FROM dono LIMIT 1),
+              (SELECT id_dono FROM animal GROUP BY id_dono ORDER BY count(*) DESC LIMIT 1),
+              (SELECT id_animal FROM animal LIMIT 1),
+              (SELECT id_consulta FROM consulta LIMIT 1)
+            """
+        )
+        return Amostra._make(c.fetchone())
+
+
+def _leituras(a: Amostra) -> List[Tuple[str, Callable[[], object]]]:
+    """As leituras de cada tela, com os parâmetros da amostra."""
+    pagina = LISTAGEM_CONFIG["tamanho_pagina"] or 50
+    leituras: List[Tuple[str, Callable[[], object]]] = [
+        ("listar_donos", lambda: repo.donos.listagem().pagina(pagina)),
+        ("listar_animais", lambda: repo.animais.listagem().pagina(pagina)),
+        ("join_consultas", lambda: repo.consultas.listagem().pagina(pagina)),
+        ("relatorio_qtd_animais_por_tutor", repo.donos.qtd_animais_por_tutor),
+    ]
+    if a.username:
+        leituras.append(("login", lambda: repo.usuarios.buscar_por_username(a.username)))
+    if a.id_cliente:
+        leituras += [
+            ("obter_id_dono_do_usuario", lambda: repo.usuarios.id_dono(a.id_cliente)),
+            ("mostrar_dados_cliente", lambda: repo.donos.do_usuario(a.id_cliente)),
+        ]
+    if a.id_vet:
+        leituras.append(
+            ("join_consultas (veterinário)", lambda: repo.consultas.listagem(a.id_vet).pagina(pagina))
+        )
+    if a.ultima_data:
+        ini = a.ultima_data - datetime.timedelta(days=30)
+        leituras.append(
+            (
+                "listar_consultas_por_periodo",
+                lambda: repo.consultas.listagem(None, ini, a.ultima_data).pagina(pagina),
+            )
+        )
+    if a.cpf:
+        leituras.append(("buscar_dono_por_cpf", lambda: repo.donos.buscar_por_cpf(a.cpf)))
+    if a.id_dono:
+        leituras += [
+            ("animais do tutor", lambda: repo.donos.animais(a.id_dono)),
+            (
+                "mostrar_consultas_cliente",
+                lambda: repo.consultas.listagem_do_tutor(a.id_dono).pagina(pagina),
+            ),
+            ("cancelar_consulta_cliente", lambda: repo.consultas.agendadas_do_tutor(a.id_dono)),
+            ("editar_dono", lambda: repo.donos.obter(a.id_dono)),
+        ]
+    if a.id_animal:
+        leituras.append(("editar_animal", lambda: repo.animais.obter(a.id_animal)))
+    if a.id_consulta:
+        leituras.append(
+            ("editar_diagnostico_consulta", lambda: repo.consultas.avaliacao(a.id_consulta))
+        )
+    return leituras
+
+
+def _nos(plano: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    yield plano
+    for filho in plano.get("Plans", []):
+        yield from _nos(filho)
+
+
+def _problemas(plano: Dict[str, Any], tamanhos: Dict[str, float]) -> List[str]:
+    achados = []
+    for no in _nos(plano):
+        tipo = no["Node Type"]
+        if tipo == "Seq Scan":
+            tabela = no["Relation Name"]
+            linhas = tamanhos.get(tabela, 0)
+            if linhas >= LIMIAR_LINHAS:
+                filtro = f" filtro {no['Filter']}" if "Filter" in no else ""
+                achados.append(f"Seq Scan em {tabela} (~{linhas:,.0f} linhas){filtro}")
+        elif tipo in ("Sort", "Incremental Sort"):
+            entrada = no["Plans"][0]["Plan Rows"] if no.get("Plans") else no["Plan Rows"]
+            if entrada >= LIMIAR_LINHAS:
+                chave = ", ".join(no.get("Sort Key", []))
+                achados.append(f"{tipo} de ~{entrada:,.0f} linhas por {chave}")
+    return achados
+
+
+_REDUNDANTES = """
+    SELECT a.indexrelid::regclass, b.indexrelid::regclass, a.indrelid::regclass,
+           pg_size_pretty(pg_relation_size(a.indexrelid))
+    FROM pg_index a
+    JOIN pg_index b ON b.indrelid = a.indrelid AND b.indexrelid <> a.indexrelid
+    JOIN pg_class t ON t.oid = a.indrelid
+    JOIN pg_class ia ON ia.oid = a.indexrelid
+    JOIN pg_class ib ON ib.oid = b.indexrelid
+    WHERE t.relnamespace = current_schema()::regnamespace
+      AND NOT a.indisunique
+      AND a.indpred IS NULL AND b.indpred IS NULL
+      AND a.indexprs IS NULL AND b.indexprs IS NULL
+      -- mesmo tipo de índice (um GIN de trigramas não é coberto por um btree)
+      AND ia.relam = ib.relam
+      -- colunas de a são prefixo das colunas de b, com as mesmas classes de
+      -- operadores e a mesma ordenação (ASC/DESC, NULLS FIRST/LAST)
+      AND (b.indkey::text || ' ') LIKE (a.indkey::text || ' %')
+      AND (b.indclass::text || ' ') LIKE (a.indclass::text || ' %')
+      AND (b.indoption::text || ' ') LIKE (a.indoption::text || ' %')
+      -- índices de constraints (EXCLUDE, ...) só saem junto com a constraint
+      AND NOT EXISTS (SELECT 1 FROM pg_constraint k WHERE k.conindid = a.indexrelid)
+      -- dois índices iguais e não únicos: aponta só um deles
+      AND (b.indisunique OR a.indkey::text <> b.indkey::text OR a.indexrelid > b.indexrelid)
+    ORDER BY 3, 1
+"""
+
+_NAO_USADOS = """
+    SELECT s.indexrelid::regclass, s.relid::regclass,
+           pg_size_pretty(pg_relation_size(s.indexrelid)),
+           (SELECT stats_reset FROM pg_stat_database WHERE datname = current_database())
+    FROM pg_stat_user_indexes s
+    JOIN pg_index i ON i.indexrelid = s.indexrelid
+    WHERE s.schemaname = current_schema()
+      AND s.idx_scan = 0
+      AND NOT i.indisunique AND NOT i.indisprimary
+    ORDER BY pg_relation_size(s.indexrelid) DESC
+"""
+
+_FK_SEM_INDICE = """
+    SELECT c.conrelid::regclass, a.attname, c.confrelid::regclass
+    FROM pg_constraint c
+    JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = c.conkey[1]
+    WHERE c.contype = 'f'
+      AND c.connamespace = current_schema()::regnamespace
+      AND NOT EXISTS (
+          SELECT 1 FROM pg_index i
+          WHERE i.indrelid = c.conrelid AND i.indkey[0] = c.conkey[1]
+      )
+    ORDER BY 1, 2
+"""
+
+
+def _catalogo(sql: str) -> List[tuple]:
+    with conexao() as conn, conn.cursor() as c:
+        c.execute(sql)
+        return c.fetchall()
+
+
+def aconselhar_indices() -> None:
+    """Relatório do consultor. Reabre o pool com o cursor que coleta os planos."""
+    fechar_pool()
+    db_config = dict(DB_CONFIG, cursor_factory=CursorExplicador)
+    if not iniciar_pool(db_config):
+        return
+    try:
+        tamanhos = {
+            nome: linhas
+            for nome, linhas in _catalogo(
+                """
+                -- reltuples é -1 em tabela nunca analisada: usa também n_live_tup
+                SELECT c.relname, GREATEST(c.reltuples, s.n_live_tup, 0)
+                FROM pg_class c
+                LEFT JOIN pg_stat_user_tables s ON s.relid = c.oid
+                WHERE c.relnamespace = current_schema()::regnamespace
+                  AND c.relkind IN ('r', 'p')
+                """
+            )
+        }
+
+        print("\n=== Planos das leituras de services.py ===")
+        ok = True
+        for nome, leitura in _leituras(_amostra()):
+            _planos.clear()
+            # os planos vêm do cursor do primário, não de uma réplica
+            with somente_primario():
+                leitura()
+            achados = [p for plano in _planos for p in _problemas(plano, tamanhos)]
+            if achados:
+                ok = False
+                print(f"⚠ {nome}")
+                for achado in achados:
+                    print(f"    {achado}")
+            else:
+                print(f"✓ {nome}")
+        if ok:
+            print("Nenhuma varredura sequencial ou ordenação grande encontrada.")
+
+        print("\n=== Índices redundantes (cobertos por outro índice) ===")
+        linhas = _catalogo(_REDUNDANTES)
+        for indice, coberto_por, tabela, tamanho in linhas:
+            print(f"{tabela}: {indice} ({tamanho}) já coberto por {coberto_por}")
+        if not linhas:
+            print("Nenhum.")
+
+        print("\n=== Índices nunca usados (pg_stat_user_indexes) ===")
+        linhas = _catalogo(_NAO_USADOS)
+        for indice, tabela, tamanho, desde in linhas:
+            print(f"{tabela}: {indice} ({tamanho}), sem uso desde {desde or 'a criação do cluster'}")
+        if not linhas:
+            print("Nenhum.")
+
+        print("\n=== Chaves estrangeiras sem índice ===")
+        linhas = _catalogo(_FK_SEM_INDICE)
+        for tabela, coluna, referencia in linhas:
+            print(f"{tabela}.{coluna} -> {referencia} (JOINs e ON DELETE varrem {tabela})")
+        if not linhas:
+            print("Nenhuma.")
+    finally:
+        _planos.clear()
+        fechar_pool()
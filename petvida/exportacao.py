@@ -0,0 +1,144 @@
+import gzip
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from psycopg2.extensions import encodings as pg_encodings
+
+from replicas import conexao_leitura
+from repositorios import ATIVOS
+
+
+class Relatorio(NamedTuple):
+    descricao: str
+    sql: Callable[..., Tuple[str, Sequence[Any]]]
+
+
+def _consultas(
+    somente_vet_id: Optional[int] = None,
+    data_ini: Optional[str] = None,
+    data_fim: Optional[str] = None,
+) -> Tuple[str, List[Any]]:
+    filtros: List[str] = [ATIVOS]
+    params: List[Any] = []
+    if data_ini and data_fim:
+        filtros.append("c.data BETWEEN %s AND %s")
+        params += [data_ini, data_fim]
+    if somente_vet_id:
+        filtros.append("c.id_vet = %s")
+        params.append(somente_vet_id)
+    where = f"WHERE {' AND '.join(filtros)}"
+    sql = f"""
+        SELECT c.id_consulta, c.data, c.horario, c.status, c.prioridade,
+               c.motivo, c.diagnostico, c.id_vet,
+               a.id_animal, a.nome AS animal, d.id_dono, d.nome AS tutor
+        FROM consulta c
+        JOIN animal a ON a.id_animal = c.id_animal
+        JOIN dono d   ON d.id_dono   = a.id_dono
+        {where}
+        ORDER BY c.data DESC, c.horario DESC, c.id_consulta DESC
+    """
+    return sql, params
+
+
+def _animais_por_tutor(**_: Any) -> Tuple[str, List[Any]]:
+    return (
+        """
+        SELECT id_dono, nome AS tutor, total_animais
+        FROM dono
+        WHERE excluido_em IS NULL
+        ORDER BY total_animais DESC, nome
+        """,
+        [],
+    )
+
+
+def _donos(**_: Any) -> Tuple[str, List[Any]]:
+    return (
+        """
+        SELECT id_dono, nome, cpf, email, endereco, telefone, observacao, criado_em
+        FROM dono
+        WHERE excluido_em IS NULL
+        ORDER BY id_dono
+        """,
+        [],
+    )
+
+
+def _animais(**_: Any) -> Tuple[str, List[Any]]:
+    return (
+        f"""
+        SELECT a.id_animal, a.nome, a.especie, a.raca, a.idade,
+               d.id_dono, d.nome AS tutor
+        FROM animal a
+        JOIN dono d ON d.id_dono = a.id_dono
+        WHERE {ATIVOS}
+        ORDER BY a.id_animal
+        """,
+        [],
+    )
+
+
+RELATORIOS: Dict[str, Relatorio] = {
+    "animais-por-tutor": Relatorio("Quantidade de animais por tutor", _animais_por_tutor),
+    "consultas": Relatorio("Consultas (todas, ou por período / veterinário)", _consultas),
+    "donos": Relatorio("Tutores", _donos),
+    "animais": Relatorio("Animais", _animais),
+}
+
+
+def exportar_csv(
+    relatorio: str,
+    destino: Path,
+    compactar: bool = False,
+    **filtros: Any,
+) -> Path:
+    """Grava o relatório em CSV com COPY (consulta) TO STDOUT direto no arquivo.
+
+    As linhas não passam por tuplas Python: o servidor gera o CSV e o
+    psycopg2 repassa os blocos para o arquivo (ou para o gzip).
+    """
+    sql, params = RELATORIOS[relatorio].sql(**filtros)
+    if compactar and destino.suffix != ".gz":
+        destino = destino.with_name(destino.name + ".gz")
+
+    abrir = gzip.open if compactar else open
+    with conexao_leitura() as conn, conn.cursor() as c:
+        # COPY não aceita parâmetros: os valores são escapados pelo mogrify
+        consulta = c.mogrify(sql, params).decode(pg_encodings[conn.encoding])
+        with abrir(destino, "wb") as arquivo:
+            c.copy_expert(
+                f"COPY ({consulta}) TO STDOUT WITH (FORMAT csv, HEADER)", arquivo
+            )
+    return destino
+
+
+def exportar_relatorio() -> None:
+    """Versão interativa, chamada pelo menu de relatórios do admin."""
+    print("\n=== Exportar relatório (CSV) ===")
+    nomes = list(RELATORIOS)
+    for i, nome in enumerate(nomes, start=1):
+        print(f"{i}) {RELATORIOS[nome].descricao}")
+    op = input("> ").strip()
+    if not op.isdigit() or not 1 <= int(op) <= len(nomes):
+        print("Opção inválida.")
+        return
+    nome = nomes[int(op) - 1]
+
+    filtros: Dict[str, Any] = {}
+    if nome == "consultas":
+        data_ini = input("Data inicial (AAAA-MM-DD, vazio = todas): ").strip()
+        if data_ini:
+            filtros["data_ini"] = data_ini
+            filtros["data_fim"] = input("Data final  (AAAA-MM-DD): ").strip()
+        vet = input("ID do veterinário (vazio = todos): ").strip()
+        if vet.isdigit():
+            filtros["somente_vet_id"] = int(vet)
+
+    destino = Path(input(f"Arquivo de saída [{nome}.csv]: ").strip() or f"{nome}.csv")
+    compactar = input("Compactar com gzip? (s/n): ").strip().lower() == "s"
+
+    try:
+        caminho = exportar_csv(nome, destino, compactar, **filtros)
+        print(f"Relatório exportado para {caminho}.")
+    except Exception as e:
+        print("Erro ao exportar relatório:", e)
@@ -0,0 +1,321 @@
+import csv
+import io
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+import pool
+from pool import conexao
+from utils import cpf_valido, idade_valida, so_letras, telefone_valido
+
+# Linhas por bloco quando o arquivo é dividido entre processos.
+LINHAS_POR_BLOCO = 50_000
+
+
+class ResumoImportacao(NamedTuple):
+    lidas: int
+    inseridas: int
+    ignoradas: int      # válidas, mas já existiam no banco (ou repetidas no arquivo)
+    rejeitadas: int
+    relatorio: Optional[Path]
+
+
+# VALIDAÇÃO (mesmas regras dos cadastros interativos)
+
+# Tamanhos das colunas VARCHAR (staging e tabelas): um valor maior faria o
+# COPY falhar e desfazer o bloco inteiro em vez de rejeitar só a linha.
+_TAMANHOS_TUTOR = {"nome": 120, "cpf": 20, "email": 120, "endereco": 200, "telefone": 30}
+_TAMANHOS_ANIMAL = {"nome": 120, "especie": 60, "raca": 80, "cpf_dono": 20}
+
+
+def _longo_demais(r: Dict[str, str], tamanhos: Dict[str, int]) -> Optional[str]:
+    for campo, maximo in tamanhos.items():
+        if len(r.get(campo) or "") > maximo:
+            return f"{campo} passa de {maximo} caracteres"
+    return None
+
+
+def _validar_tutor(r: Dict[str, str]) -> Optional[str]:
+    longo = _longo_demais(r, _TAMANHOS_TUTOR)
+    if longo:
+        return longo
+    if not r["nome"] or not so_letras(r["nome"]):
+        return "nome deve conter apenas letras"
+    if not cpf_valido(r["cpf"]):
+        return "CPF precisa ter 11 dígitos"
+    if not r["endereco"]:
+        return "endereço obrigatório"
+    if not telefone_valido(r["telefone"]):
+        return "telefone deve ter ao menos 8 dígitos"
+    return None
+
+
+def _validar_animal(r: Dict[str, str]) -> Optional[str]:
+    longo = _longo_demais(r, _TAMANHOS_ANIMAL)
+    if longo:
+        return longo
+    for campo in ("nome", "especie", "raca"):
+        if not r[campo] or not so_letras(r[campo]):
+            return f"{campo} deve conter apenas letras"
+    if not idade_valida(r["idade"]):
+        return "idade deve estar entre 0 e 40 anos"
+    if not cpf_valido(r["cpf_dono"]):
+        return "CPF do tutor precisa ter 11 dígitos"
+    return None
+
+
+class _Formato(NamedTuple):
+    colunas: Tuple[str, ...]
+    opcionais: Tuple[str, ...]
+    validar: Callable[[Dict[str, str]], Optional[str]]
+    staging: str
+    merge: str
+    orfaos: Optional[str]
+
+
+_TUTORES = _Formato(
+    colunas=("nome", "cpf", "email", "endereco", "telefone", "observacao"),
+    opcionais=("email", "observacao"),
+    validar=_validar_tutor,
+    staging="""
+        CREATE TEMP TABLE stg_dono (
+            linha      INT,
+            nome       VARCHAR(120),
+            cpf        VARCHAR(20),
+            email      VARCHAR(120),
+            endereco   VARCHAR(200),
+            telefone   VARCHAR(30),
+            observacao TEXT
+        ) ON COMMIT DROP;
+    """,
+    merge="""
+        INSERT INTO dono (nome, cpf, email, endereco, telefone, observacao)
+        SELECT DISTINCT ON (cpf) nome, cpf, email, endereco, telefone, observacao
+        FROM stg_dono
+        ORDER BY cpf, linha
+        ON CONFLICT (cpf) WHERE excluido_em IS NULL DO NOTHING;
+    """,
+    orfaos=None,
+)
+
+_ANIMAIS = _Formato(
+    colunas=("nome", "especie", "raca", "idade", "cpf_dono"),
+    opcionais=(),
+    validar=_validar_animal,
+    staging="""
+        CREATE TEMP TABLE stg_animal (
+            linha    INT,
+            nome     VARCHAR(120),
+            especie  VARCHAR(60),
+            raca     VARCHAR(80),
+            idade    INT,
+            cpf_dono VARCHAR(20)
+        ) ON COMMIT DROP;
+    """,
+    # id_dono resolvido pelo CPF (índice único de 0012); tutor
+    # excluído (0010) conta como não encontrado
+    merge="""
+        INSERT INTO animal (nome, especie, raca, idade, id_dono)
+        SELECT s.nome, s.especie, s.raca, s.idade, d.id_dono
+        FROM stg_animal s
+        JOIN dono d ON d.cpf = s.cpf_dono AND d.excluido_em IS NULL;
+    """,
+    orfaos="""
+        SELECT s.linha, s.cpf_dono
+        FROM stg_animal s
+        WHERE NOT EXISTS (
+            SELECT 1 FROM dono d WHERE d.cpf = s.cpf_dono AND d.excluido_em IS NULL
+        )
+        ORDER BY s.linha;
+    """,
+)
+
+
+class FluxoCopy:
+    """Objeto tipo arquivo que gera CSV sob demanda para o COPY FROM STDIN."""
+
+    def __init__(self, linhas: Iterator[Sequence]) -> None:
+        self._linhas = linhas
+        self._buf = io.StringIO()
+        self._escritor = csv.writer(self._buf, lineterminator="\n")
+        self._resto = ""
+
+    def read(self, size: int = -1) -> str:
+        partes = [self._resto]
+        total = len(self._resto)
+        for linha in self._linhas:
+            self._escritor.writerow(linha)
+            texto = self._buf.getvalue()
+            self._buf.seek(0)
+            self._buf.truncate()
+            partes.append(texto)
+            total += len(texto)
+            if 0 <= size <= total:
+                break
+        dados = "".join(partes)
+        if size < 0:
+            self._resto = ""
+            return dados
+        self._resto = dados[size:]
+        return dados[:size]
+
+
+def _importar_bloco(
+    tipo: str, caminho: str, cabecalho: List[str], inicio: int, fim: int, primeira_linha: int
+) -> Tuple[int, int, int, List[Tuple[int, str, List[str]]]]:
+    """Valida, copia para staging e faz o merge de um trecho do arquivo.
+
+    Roda no processo principal ou num worker do pool de processos; cada
+    bloco é uma transação própria.
+    """
+    fmt = _TUTORES if tipo == "tutores" else _ANIMAIS
+    with open(caminho, "rb") as f:
+        f.seek(inicio)
+        texto = f.read(fim - inicio).decode("utf-8")
+
+    lidas = 0
+    rejeitadas: List[Tuple[int, str, List[str]]] = []
+
+    def validas() -> Iterator[Sequence]:
+        nonlocal lidas
+        for num, campos in enumerate(csv.reader(texto.splitlines()), start=primeira_linha):
+            if not campos:
+                continue
+            lidas += 1
+            r = {k: (v or "").strip() for k, v in zip(cabecalho, campos)}
+            for col in fmt.colunas:
+                r.setdefault(col, "")
+            motivo = fmt.validar(r)
+            if motivo:
+                rejeitadas.append((num, motivo, campos))
+                continue
+            yield (num, *(r[col] or None for col in fmt.colunas))
+
+    with conexao() as conn:
+        try:
+            with conn.cursor() as c:
+                c.execute(fmt.staging)
+                tabela = "stg_dono" if tipo == "tutores" else "stg_animal"
+                c.copy_expert(
+                    f"COPY {tabela} (linha, {', '.join(fmt.colunas)}) "
+                    "FROM STDIN WITH (FORMAT csv)",
+                    FluxoCopy(validas()),
+                )
+                c.execute(fmt.merge)
+                inseridas = c.rowcount
+                if fmt.orfaos:
+                    c.execute(fmt.orfaos)
+                    for num, cpf in c.fetchall():
+                        rejeitadas.append((num, f"tutor com CPF {cpf} não encontrado", []))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    validas_total = lidas - len(rejeitadas)
+    return lidas, inseridas, validas_total - inseridas, rejeitadas
+
+
+def _blocos(caminho: Path, linhas_por_bloco: int) -> Tuple[List[str], List[Tuple[int, int, int]]]:
+    """Lê o cabeçalho e divide o restante em faixas de bytes (início, fim, 1ª linha).
+
+    Assume um registro por linha (sem quebras de linha dentro de campos).
+    """
+    with open(caminho, "rb") as f:
+        primeira = f.readline()
+        cabecalho = next(csv.reader([primeira.decode("utf-8-sig")]))
+        cabecalho = [c.strip().lower() for c in cabecalho]
+
+        blocos = []
+        inicio = f.tell()
+        num_linha = 2
+        primeira_do_bloco = num_linha
+        contador = 0
+        for linha in f:
+            contador += 1
+            num_linha += 1
+            if contador == linhas_por_bloco:
+                blocos.append((inicio, f.tell(), primeira_do_bloco))
+                inicio = f.tell()
+                primeira_do_bloco = num_linha
+                contador = 0
+        if contador:
+            blocos.append((inicio, f.tell(), primeira_do_bloco))
+    return cabecalho, blocos
+
+
+def _iniciar_worker(db_config: Dict) -> None:
+    """Initializer dos workers: cada processo abre o seu próprio pool.
+
+    Com spawn o worker já nasce sem pool; zerar `pool._pool` garante que,
+    mesmo com fork, o socket herdado do processo pai nunca seja usado.
+    """
+    pool._pool = None
+    pool.obter_pool(db_config)
+
+
+def _config_dos_workers() -> Dict:
+    # as fábricas de conexão/cursor são recolocadas por obter_pool() no worker
+    return {
+        k: v
+        for k, v in pool.obter_pool().db_config.items()
+        if k not in ("connection_factory", "cursor_factory")
+    }
+
+
+def _importar(tipo: str, caminho: Path, processos: int) -> ResumoImportacao:
+    fmt = _TUTORES if tipo == "tutores" else _ANIMAIS
+    cabecalho, blocos = _blocos(caminho, LINHAS_POR_BLOCO)
+
+    faltando = [c for c in fmt.colunas if c not in cabecalho and c not in fmt.opcionais]
+    if faltando:
+        raise ValueError(f"Colunas obrigatórias ausentes em {caminho.name}: {', '.join(faltando)}")
+
+    args = [(tipo, str(caminho), cabecalho, *b) for b in blocos]
+    if processos > 1 and len(args) > 1:
+        with ProcessPoolExecutor(
+            max_workers=processos,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_iniciar_worker,
+            initargs=(_config_dos_workers(),),
+        ) as executor:
+            resultados = list(executor.map(_importar_bloco, *zip(*args)))
+    else:
+        resultados = [_importar_bloco(*a) for a in args]
+
+    lidas = sum(r[0] for r in resultados)
+    inseridas = sum(r[1] for r in resultados)
+    ignoradas = sum(r[2] for r in resultados)
+    rejeitadas = sorted(rej for r in resultados for rej in r[3])
+
+    relatorio = None
+    if rejeitadas:
+        relatorio = caminho.with_name(caminho.stem + ".rejeitados.csv")
+        with open(relatorio, "w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            w.writerow(["linha", "motivo", *cabecalho])
+            for num, motivo, campos in rejeitadas:
+                w.writerow([num, motivo, *campos])
+
+    return ResumoImportacao(lidas, inseridas, ignoradas, len(rejeitadas), relatorio)
+
+
+def importar_tutores(caminho: Path, processos: int = 1) -> ResumoImportacao:
+    """Colunas: nome, cpf, email, endereco, telefone[, observacao]."""
+    return _importar("tutores", caminho, processos)
+
+
+def importar_animais(caminho: Path, processos: int = 1) -> ResumoImportacao:
+    """Colunas: nome, especie, raca, idade, cpf_dono (o tutor deve existir)."""
+    return _importar("animais", caminho, processos)
+
+
+def imprimir_resumo(titulo: str, resumo: ResumoImportacao) -> None:
+    print(f"\n=== Importação de {titulo} ===")
+    print(f"Linhas lidas:     {resumo.lidas}")
+    print(f"Inseridas:        {resumo.inseridas}")
+    print(f"Já existentes:    {resumo.ignoradas}")
+    print(f"Rejeitadas:       {resumo.rejeitadas}")
+    if resumo.relatorio:
+        print(f"Relatório de rejeitadas: {resumo.relatorio}")
@@ -0,0 +1,100 @@
+"""Inicialização do menu interativo e `python main.py --profile-startup`.
+
+Com INICIO_CONFIG["checagens_em_segundo_plano"], a conexão ao banco e a
+conferência da versão do esquema rodam numa thread enquanto o menu
+principal já está na tela; a thread não imprime nada (o texto se
+misturaria ao input() do menu): a primeira opção escolhida espera o
+resultado e só então mostra os avisos.
+O --profile-startup executa as mesmas etapas em sequência e mostra
+quanto tempo cada uma levou.
+"""
+import importlib
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Iterator, List, NamedTuple, Tuple
+
+import repositorios as repo
+from config import INICIO_CONFIG
+from migracoes import aviso_esquema, verificar_esquema
+from pool import PoolIndisponivel, fechar_pool, iniciar_pool, obter_pool
+
+
+def preparar_banco() -> bool:
+    """Conecta o pool e confere o esquema (sem interação)."""
+    return iniciar_pool() and verificar_esquema()
+
+
+class Preparo(NamedTuple):
+    pronto: bool
+    avisos: List[str]     # para o menu imprimir depois da primeira opção
+
+
+def _preparar_sem_imprimir() -> Preparo:
+    try:
+        obter_pool()
+    except PoolIndisponivel as e:
+        return Preparo(False, [f"Erro ao conectar ao banco: {e}"])
+    aviso = aviso_esquema()
+    return Preparo(aviso is None, [aviso] if aviso else [])
+
+
+def preparar_em_segundo_plano() -> "Future[Preparo]":
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="inicio")
+    futuro = executor.submit(_preparar_sem_imprimir)
+    executor.shutdown(wait=False)
+    return futuro
+
+
+class Cronometro:
+    def __init__(self, inicio: float) -> None:
+        self.fases: List[Tuple[str, float]] = []
+        self._ultimo = inicio
+
+    def marcar(self, nome: str) -> None:
+        """Fecha uma fase que começou na marcação anterior."""
+        agora = time.perf_counter()
+        self.fases.append((nome, (agora - self._ultimo) * 1000))
+        self._ultimo = agora
+
+    @contextmanager
+    def fase(self, nome: str) -> Iterator[None]:
+        self._ultimo = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.marcar(nome)
+
+
+def perfilar_inicio(inicio_processo: float) -> int:
+    """Mede cada etapa até o menu principal e imprime o tempo de cada uma."""
+    from saida import Coluna, Tabela
+
+    cron = Cronometro(inicio_processo)
+    cron.marcar("imports do main.py e de inicio.py (psycopg2, repositórios)")
+    with cron.fase("import de menus/services"):
+        importlib.import_module("menus")
+    with cron.fase("import do bcrypt (adiado para o 1º login)"):
+        importlib.import_module("bcrypt")
+    with cron.fase("conexão ao banco (pool)"):
+        conectou = iniciar_pool()
+    if conectou:
+        try:
+            with cron.fase("verificação da versão do esquema"):
+                verificar_esquema()
+            with cron.fase("checagem do administrador"):
+                repo.usuarios.existe_admin()
+        finally:
+            fechar_pool()
+
+    total = sum(ms for _, ms in cron.fases)
+    linhas = [(nome, f"{ms:.1f}") for nome, ms in cron.fases]
+    linhas.append(("total", f"{total:.1f}"))
+    Tabela((Coluna("Fase", 50), Coluna("ms", direita=True))).escrever(linhas, limite=0)
+
+    adiadas = INICIO_CONFIG["checagens_em_segundo_plano"]
+    print(
+        f"\nConexão e esquema em segundo plano: {'sim' if adiadas else 'não'}"
+        f" | animação dos menus: {'0,75 s' if INICIO_CONFIG['animacoes'] else 'desligada'}"
+    )
+    return 0 if conectou else 1
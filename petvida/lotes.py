@@ -0,0 +1,34 @@
+"""Execução em lotes das tarefas de manutenção (arquivamento.py, purga.py).
+
+Cada lote é um único comando que afeta no máximo `lote` linhas, confirmado
+na hora e seguido de uma pausa: os bloqueios duram pouco, o WAL é gerado
+aos poucos e a conexão volta ao pool entre um lote e outro.
+"""
+import time
+from typing import Any, Sequence
+
+from pool import conexao
+
+
+def executar_em_lotes(sql: str, params: Sequence[Any], lote: int, pausa: float) -> int:
+    """Repete `sql` até afetar menos que um lote; devolve o total de linhas.
+
+    O tamanho do lote vai como último parâmetro, depois de `params`. O SQL
+    deve escolher as linhas com LIMIT e FOR UPDATE SKIP LOCKED, para não
+    esperar linhas que estão sendo editadas (a próxima rodada as pega).
+    """
+    total = 0
+    while True:
+        with conexao() as conn:
+            try:
+                with conn.cursor() as c:
+                    c.execute(sql, (*params, lote))
+                    afetadas = c.rowcount
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        total += afetadas
+        if afetadas < lote:
+            return total
+        time.sleep(pausa)
@@ -1,4 +1,235 @@
-from menus import menu_principal
+import time
+
+_INICIO = time.perf_counter()  # antes dos demais imports (--profile-startup)
+
+import argparse
+import sys
+from pathlib import Path
+
+from config import SAIDA_CONFIG
+
+# Mesmas chaves de exportacao.RELATORIOS (conferido em tests/test_main.py):
+# importar exportacao aqui puxaria psycopg2 antes de o menu aparecer.
+RELATORIOS = ("animais-por-tutor", "consultas", "donos", "animais")
+
+
+def _parser(com_subcomandos: bool) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="PetVida - sistema terminal", add_help=com_subcomandos
+    )
+    parser.add_argument(
+        "--migrate",
+        action="store_true",
+        help="aplica as migrações de esquema pendentes e sai",
+    )
+    parser.add_argument(
+        "--importar-tutores",
+        metavar="CSV",
+        type=Path,
+        help="importa tutores (nome,cpf,email,endereco,telefone[,observacao])",
+    )
+    parser.add_argument(
+        "--importar-animais",
+        metavar="CSV",
+        type=Path,
+        help="importa animais (nome,especie,raca,idade,cpf_dono)",
+    )
+    parser.add_argument(
+        "--processos",
+        type=int,
+        default=1,
+        help="divide arquivos grandes entre N processos na importação",
+    )
+    parser.add_argument(
+        "--exportar",
+        metavar="RELATORIO",
+        choices=RELATORIOS,
+        help="exporta um relatório para CSV (use com --saida)",
+    )
+    parser.add_argument("--saida", type=Path, help="arquivo de destino da exportação")
+    parser.add_argument("--gzip", action="store_true", help="compacta o CSV exportado")
+    parser.add_argument("--de", metavar="AAAA-MM-DD", help="data inicial (consultas)")
+    parser.add_argument("--ate", metavar="AAAA-MM-DD", help="data final (consultas)")
+    parser.add_argument("--vet", type=int, help="ID do veterinário (consultas)")
+    parser.add_argument(
+        "--verificar-contadores",
+        action="store_true",
+        help="recalcula o total de animais de cada tutor e corrige divergências",
+    )
+    parser.add_argument(
+        "--indices",
+        action="store_true",
+        help="analisa os planos das consultas e os índices existentes e sai",
+    )
+    parser.add_argument(
+        "--particoes",
+        action="store_true",
+        help="cria as partições mensais futuras de consulta e cirurgia (rodar pelo cron)",
+    )
+    parser.add_argument(
+        "--arquivar",
+        action="store_true",
+        help="move consultas e cirurgias encerradas antigas para o arquivo "
+        "(corte: --ate, ou ARQUIVO_CONFIG['meses'])",
+    )
+    parser.add_argument(
+        "--purgar",
+        action="store_true",
+        help="apaga em lotes os tutores e animais excluídos há mais de "
+        "PURGA_CONFIG['carencia_horas'] (rodar pelo cron)",
+    )
+    parser.add_argument(
+        "--replicas",
+        action="store_true",
+        help="mostra o atraso e a latência de cada réplica de leitura e sai",
+    )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        metavar="N",
+        help="mostra no máximo N linhas em cada listagem (padrão: PETVIDA_LIMITE ou todas)",
+    )
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="mede o tempo de cada etapa da inicialização do menu e sai",
+    )
+    if com_subcomandos:
+        from cli import adicionar_subcomandos
+
+        adicionar_subcomandos(parser)
+    return parser
+
+
+def _argumentos() -> argparse.Namespace:
+    """Lê a linha de comando; o cli só é importado se houver um subcomando.
+
+    Menu e opções --xxx não carregam repositórios, réplicas nem psycopg2
+    aqui. --help e argumentos desconhecidos também vão ao parser completo.
+    """
+    args, resto = _parser(False).parse_known_args()
+    if not resto:
+        args.comando = None
+        return args
+    return _parser(True).parse_args()
+
+
+def _executar_comandos(args: argparse.Namespace) -> None:
+    from pool import fechar_pool, iniciar_pool
+
+    if not iniciar_pool():
+        return
+    try:
+        if args.migrate:
+            from migracoes import aplicar_migracoes
+
+            # com o esquema pela metade, os outros comandos não rodam
+            if not aplicar_migracoes():
+                return
+
+        if args.importar_tutores or args.importar_animais:
+            from importacao import imprimir_resumo, importar_animais, importar_tutores
+
+            # tutores primeiro: os animais resolvem o id_dono pelo CPF
+            if args.importar_tutores:
+                imprimir_resumo(
+                    "tutores", importar_tutores(args.importar_tutores, args.processos)
+                )
+            if args.importar_animais:
+                imprimir_resumo(
+                    "animais", importar_animais(args.importar_animais, args.processos)
+                )
+
+        if args.exportar:
+            from exportacao import exportar_csv
+
+            filtros = {}
+            if args.exportar == "consultas":
+                filtros = {"data_ini": args.de, "data_fim": args.ate, "somente_vet_id": args.vet}
+            destino = args.saida or Path(f"{args.exportar}.csv")
+            caminho = exportar_csv(args.exportar, destino, args.gzip, **filtros)
+            print(f"Relatório exportado para {caminho}.")
+
+        if args.verificar_contadores:
+            from services import verificar_contadores
+
+            verificar_contadores()
+
+        if args.indices:
+            from consultor_indices import aconselhar_indices
+
+            aconselhar_indices()
+
+        if args.particoes:
+            from migracoes import criar_particoes
+
+            criar_particoes()
+
+        if args.arquivar:
+            import datetime
+
+            from arquivamento import arquivar
+
+            arquivar(datetime.date.fromisoformat(args.ate) if args.ate else None)
+
+        if args.purgar:
+            from purga import purgar
+
+            purgar()
+
+        if args.replicas:
+            from replicas import situacao
+            from saida import Coluna, Tabela
+
+            linhas = situacao()
+            if not linhas:
+                print("Nenhuma réplica configurada (PETVIDA_REPLICAS).")
+            else:
+                colunas = (
+                    Coluna("Réplica", 50),
+                    Coluna("Conectou"),
+                    Coluna("Atraso (s)", direita=True),
+                    Coluna("Latência (ms)", direita=True),
+                    Coluna("Recebe leituras"),
+                )
+                Tabela(colunas).escrever(
+                    (
+                        (r.replica, "sim" if r.conectou else "não", r.atraso_s,
+                         r.latencia_ms, "sim" if r.recebe_leituras else "não")
+                        for r in linhas
+                    ),
+                    limite=0,
+                )
+    finally:
+        fechar_pool()
+
 
 if __name__ == "__main__":
-    menu_principal()
+    args = _argumentos()
+    if args.limit is not None:
+        SAIDA_CONFIG["limite"] = args.limit
+    if args.profile_startup:
+        from inicio import perfilar_inicio
+
+        sys.exit(perfilar_inicio(_INICIO))
+    if args.comando:
+        from cli import executar
+
+        sys.exit(executar(args))
+    if (
+        args.migrate
+        or args.importar_tutores
+        or args.importar_animais
+        or args.exportar
+        or args.verificar_contadores
+        or args.indices
+        or args.particoes
+        or args.arquivar
+        or args.purgar
+        or args.replicas
+    ):
+        _executar_comandos(args)
+    else:
+        from menus import menu_principal
+
+        menu_principal()
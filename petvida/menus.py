@@ -1,12 +1,13 @@
-from typing import Dict, Any
-
-from psycopg2.extensions import connection as PgConnection
+from concurrent.futures import Future
+from typing import Any, Dict, Optional
 
+from exportacao import exportar_relatorio
+from config import INICIO_CONFIG
+from inicio import Preparo, preparar_banco, preparar_em_segundo_plano
+from pool import PoolIndisponivel, fechar_pool
 from utils import mostrar_loading
 from services import (
     # infra
-    criar_conexao,
-    criar_tabelas,
     garantir_admin,
     login,
     cadastrar_cliente_publico,
@@ -19,14 +20,20 @@ from services import (
     editar_animal,
     excluir_dono,
     excluir_animal,
+    desfazer_exclusao_dono,
+    desfazer_exclusao_animal,
     buscar_dono_por_cpf,
     join_consultas,
     cadastrar_consulta,
+    agendar_consultas_recorrentes,
+    horarios_livres,
     editar_diagnostico_consulta,
     excluir_consulta,
     listar_consultas_por_periodo,
     cadastrar_cirurgia,
     relatorio_qtd_animais_por_tutor,
+    verificar_contadores,
+    mostrar_painel,
     limpar_tabelas,
     alterar_senha_admin,
 
@@ -38,7 +45,7 @@ from services import (
     cancelar_consulta_cliente,
 )
 
-def submenu_usuarios_admin(conn: PgConnection) -> None:
+def submenu_usuarios_admin() -> None:
     while True:
         print(
             """
@@ -49,14 +56,14 @@ def submenu_usuarios_admin(conn: PgConnection) -> None:
         )
         op = input("> ").strip()
         if op == "1":
-            cadastrar_usuario(conn)
+            cadastrar_usuario()
         elif op == "0":
             break
         else:
             print("Opção inválida.")
 
 
-def submenu_donos_animais_admin(conn: PgConnection) -> None:
+def submenu_donos_animais_admin() -> None:
     while True:
         print(
             """
@@ -67,29 +74,35 @@ def submenu_donos_animais_admin(conn: PgConnection) -> None:
 4) Editar animal
 5) Excluir tutor
 6) Excluir animal
+7) Desfazer exclusão de tutor
+8) Desfazer exclusão de animal
 0) Voltar
 """
         )
         op = input("> ").strip()
         if op == "1":
-            listar_donos(conn)
+            listar_donos()
         elif op == "2":
-            listar_animais(conn)
+            listar_animais()
         elif op == "3":
-            editar_dono(conn)
+            editar_dono()
         elif op == "4":
-            editar_animal(conn)
+            editar_animal()
         elif op == "5":
-            excluir_dono(conn)
+            excluir_dono()
         elif op == "6":
-            excluir_animal(conn)
+            excluir_animal()
+        elif op == "7":
+            desfazer_exclusao_dono()
+        elif op == "8":
+            desfazer_exclusao_animal()
         elif op == "0":
             break
         else:
             print("Opção inválida.")
 
 
-def submenu_consultas_admin(conn: PgConnection) -> None:
+def submenu_consultas_admin() -> None:
     while True:
         print(
             """
@@ -99,27 +112,33 @@ def submenu_consultas_admin(conn: PgConnection) -> None:
 3) Editar diagnóstico / status / prioridade
 4) Excluir consulta
 5) Listar por período
+6) Agendamento recorrente (várias consultas / vários animais)
+7) Horários livres dos veterinários
 0) Voltar
 """
         )
         op = input("> ").strip()
         if op == "1":
-            join_consultas(conn)
+            join_consultas()
         elif op == "2":
-            cadastrar_consulta(conn)
+            cadastrar_consulta()
         elif op == "3":
-            editar_diagnostico_consulta(conn)
+            editar_diagnostico_consulta()
         elif op == "4":
-            excluir_consulta(conn)
+            excluir_consulta()
         elif op == "5":
-            listar_consultas_por_periodo(conn)
+            listar_consultas_por_periodo()
+        elif op == "6":
+            agendar_consultas_recorrentes()
+        elif op == "7":
+            horarios_livres()
         elif op == "0":
             break
         else:
             print("Opção inválida.")
 
 
-def submenu_cirurgias_admin(conn: PgConnection) -> None:
+def submenu_cirurgias_admin() -> None:
     while True:
         print(
             """
@@ -130,38 +149,47 @@ def submenu_cirurgias_admin(conn: PgConnection) -> None:
         )
         op = input("> ").strip()
         if op == "1":
-            cadastrar_cirurgia(conn)
+            cadastrar_cirurgia()
         elif op == "0":
             break
         else:
             print("Opção inválida.")
 
 
-def submenu_relatorios_admin(conn: PgConnection) -> None:
+def submenu_relatorios_admin() -> None:
     while True:
         print(
             """
 --- ADMIN > RELATÓRIOS / MANUTENÇÃO ---
 1) Quantidade de animais por tutor
 2) Buscar tutor por CPF
-3) LIMPAR TODAS AS TABELAS (DROP) [CUIDADO]
+3) Exportar relatório para CSV
+4) LIMPAR TODAS AS TABELAS (DROP) [CUIDADO]
+5) Verificar contadores de animais por tutor
+6) Painel da clínica (resumo do mês)
 0) Voltar
 """
         )
         op = input("> ").strip()
         if op == "1":
-            relatorio_qtd_animais_por_tutor(conn)
+            relatorio_qtd_animais_por_tutor()
         elif op == "2":
-            buscar_dono_por_cpf(conn)
+            buscar_dono_por_cpf()
         elif op == "3":
-            limpar_tabelas(conn)
+            exportar_relatorio()
+        elif op == "4":
+            limpar_tabelas()
+        elif op == "5":
+            verificar_contadores()
+        elif op == "6":
+            mostrar_painel()
         elif op == "0":
             break
         else:
             print("Opção inválida.")
 
 
-def menu_admin(conn: PgConnection, usuario: Dict[str, Any]) -> None:
+def menu_admin(usuario: Dict[str, Any]) -> None:
     """Menu administrativo principal, com submenus."""
     mostrar_loading("Carregando menu do administrador")
 
@@ -181,23 +209,23 @@ def menu_admin(conn: PgConnection, usuario: Dict[str, Any]) -> None:
         op = input("> ").strip()
 
         if op == "1":
-            submenu_usuarios_admin(conn)
+            submenu_usuarios_admin()
         elif op == "2":
-            submenu_donos_animais_admin(conn)
+            submenu_donos_animais_admin()
         elif op == "3":
-            submenu_consultas_admin(conn)
+            submenu_consultas_admin()
         elif op == "4":
-            submenu_cirurgias_admin(conn)
+            submenu_cirurgias_admin()
         elif op == "5":
-            submenu_relatorios_admin(conn)
+            submenu_relatorios_admin()
         elif op == "6":
-            alterar_senha_admin(conn, usuario)
+            alterar_senha_admin(usuario)
         elif op == "0":
             break
         else:
             print("Opção inválida.")
 
-def menu_cliente(conn: PgConnection, usuario: Dict[str, Any]) -> None:
+def menu_cliente(usuario: Dict[str, Any]) -> None:
     mostrar_loading("Carregando menu do cliente")
 
     while True:
@@ -209,27 +237,30 @@ def menu_cliente(conn: PgConnection, usuario: Dict[str, Any]) -> None:
 3) Cadastrar novo animal
 4) Atualizar meus dados (e-mail, endereço, telefone, observação)
 5) Cancelar consulta agendada
+6) Ver histórico completo de consultas (inclui arquivadas)
 0) Voltar ao menu principal
 """
         )
         op = input("> ").strip()
 
         if op == "1":
-            mostrar_dados_cliente(conn, usuario)
+            mostrar_dados_cliente(usuario)
         elif op == "2":
-            mostrar_consultas_cliente(conn, usuario)
+            mostrar_consultas_cliente(usuario)
         elif op == "3":
-            cadastrar_novo_animal_cliente(conn, usuario)
+            cadastrar_novo_animal_cliente(usuario)
         elif op == "4":
-            atualizar_dados_cliente(conn, usuario)
+            atualizar_dados_cliente(usuario)
         elif op == "5":
-            cancelar_consulta_cliente(conn, usuario)
+            cancelar_consulta_cliente(usuario)
+        elif op == "6":
+            mostrar_consultas_cliente(usuario, incluir_arquivadas=True)
         elif op == "0":
             break
         else:
             print("Opção inválida.")
 
-def menu_veterinario(conn: PgConnection, usuario: Dict[str, Any]) -> None:
+def menu_veterinario(usuario: Dict[str, Any]) -> None:
     mostrar_loading("Carregando menu do veterinário")
 
     while True:
@@ -241,37 +272,46 @@ def menu_veterinario(conn: PgConnection, usuario: Dict[str, Any]) -> None:
 3) Cadastrar cirurgia
 4) Ver MINHAS consultas
 5) Ver MINHAS consultas por período
+6) Agendamento recorrente (retornos, vacinação)
+7) Meus horários livres
 0) Voltar ao menu principal
 """
         )
         op = input("> ").strip()
 
         if op == "1":
-            listar_animais(conn)
+            listar_animais()
         elif op == "2":
-            cadastrar_consulta(conn, usuario)
+            cadastrar_consulta(usuario)
         elif op == "3":
-            cadastrar_cirurgia(conn)
+            cadastrar_cirurgia()
         elif op == "4":
-            join_consultas(conn, somente_vet_id=usuario["id"])
+            join_consultas(somente_vet_id=usuario["id"])
         elif op == "5":
-            listar_consultas_por_periodo(conn, somente_vet_id=usuario["id"])
+            listar_consultas_por_periodo(somente_vet_id=usuario["id"])
+        elif op == "6":
+            agendar_consultas_recorrentes(usuario)
+        elif op == "7":
+            horarios_livres(usuario)
         elif op == "0":
             break
         else:
             print("Opção inválida.")
 
 def menu_principal() -> None:
-    conn = criar_conexao()
-    if not conn:
+    preparo: Optional["Future[Preparo]"] = None
+    if INICIO_CONFIG["checagens_em_segundo_plano"]:
+        preparo = preparar_em_segundo_plano()
+    elif not preparar_banco():
         return
 
-    criar_tabelas(conn)
-    garantir_admin(conn)
+    try:
+        if preparo is None:
+            garantir_admin()
 
-    while True:
-        print(
-            """
+        while True:
+            print(
+                """
 === PETVIDA - SISTEMA TERMINAL ===
 1) Login como ADMINISTRADOR
 2) Login como CLIENTE / TUTOR
@@ -279,32 +319,49 @@ def menu_principal() -> None:
 4) Cadastrar CLIENTE / TUTOR
 0) Sair
 """
-        )
-        op = input("> ").strip()
-
-        if op == "1":
-            u = login(conn, tipo_esperado="admin")
-            if u:
-                menu_admin(conn, u)
-
-        elif op == "2":
-            u = login(conn, tipo_esperado="cliente")
-            if u:
-                menu_cliente(conn, u)
-
-        elif op == "3":
-            u = login(conn, tipo_esperado="veterinario")
-            if u:
-                menu_veterinario(conn, u)
-
-        elif op == "4":
-            cadastrar_cliente_publico(conn)
-
-        elif op == "0":
-            print("Saindo... até mais!")
-            break
-
-        else:
-            print("Opção inválida.")
-
-    conn.close()
+            )
+            op = input("> ").strip()
+
+            if preparo is not None:
+                # conexão e esquema foram conferidos enquanto o menu era exibido
+                resultado, preparo = preparo.result(), None
+                for aviso in resultado.avisos:
+                    print(aviso)
+                if not resultado.pronto:
+                    return
+                if op != "0":
+                    garantir_admin()
+
+            try:
+                if op == "1":
+                    u = login(tipo_esperado="admin")
+                    if u:
+                        menu_admin(u)
+
+                elif op == "2":
+                    u = login(tipo_esperado="cliente")
+                    if u:
+                        menu_cliente(u)
+
+                elif op == "3":
+                    u = login(tipo_esperado="veterinario")
+                    if u:
+                        menu_veterinario(u)
+
+                elif op == "4":
+                    cadastrar_cliente_publico()
+
+                elif op == "0":
+                    print("Saindo... até mais!")
+                    break
+
+                else:
+                    print("Opção inválida.")
+
+            except PoolIndisponivel as e:
+                print("Banco de dados indisponível no momento:", e)
+                print("Tente novamente em instantes.")
+    finally:
+        if preparo is not None:
+            preparo.result()
+        fechar_pool()
@@ -0,0 +1,165 @@
+import re
+from pathlib import Path
+from typing import List, NamedTuple, Optional
+
+from psycopg2 import errors as pg_errors
+from psycopg2 import sql
+
+from config import PARTICOES_CONFIG
+from pool import conexao
+
+PASTA_SQL = Path(__file__).resolve().parent / "sql"
+
+# Primeira linha de arquivos que precisam rodar fora de transação
+# (ex.: CREATE INDEX CONCURRENTLY).
+MARCA_SEM_TRANSACAO = "-- petvida: sem-transacao"
+
+# Chave do advisory lock que impede dois --migrate simultâneos.
+_TRAVA_MIGRACAO = 7_311_2024
+
+
+class Migracao(NamedTuple):
+    versao: int
+    nome: str
+    caminho: Path
+
+
+def migracoes_disponiveis() -> List[Migracao]:
+    migracoes = []
+    for caminho in sorted(PASTA_SQL.glob("*.sql")):
+        m = re.match(r"(\d+)_(.+)\.sql$", caminho.name)
+        if m:
+            migracoes.append(Migracao(int(m.group(1)), m.group(2), caminho))
+    return migracoes
+
+
+def versao_atual() -> int:
+    """Versão aplicada no banco (0 se o controle de versão ainda não existe)."""
+    with conexao() as conn, conn.cursor() as c:
+        try:
+            c.execute("SELECT max(versao) FROM schema_version;")
+        except pg_errors.UndefinedTable:
+            return 0
+        return c.fetchone()[0] or 0
+
+
+def aviso_esquema() -> Optional[str]:
+    """Aviso de esquema desatualizado, ou None se está em dia (um SELECT, sem DDL)."""
+    atual = versao_atual()
+    esperada = max((m.versao for m in migracoes_disponiveis()), default=0)
+    if atual >= esperada:
+        return None
+    return (
+        f"⚠ Esquema do banco desatualizado (versão {atual}, esperada {esperada}).\n"
+        "Aplique as migrações com: python main.py --migrate"
+    )
+
+
+def verificar_esquema() -> bool:
+    """Checagem de inicialização: imprime o aviso, se houver."""
+    aviso = aviso_esquema()
+    if aviso:
+        print(aviso)
+    return aviso is None
+
+
+def _comandos(sql: str) -> List[str]:
+    linhas = [l for l in sql.splitlines() if not l.strip().startswith("--")]
+    comandos = re.split(r";\s*$", "\n".join(linhas), flags=re.M)
+    return [c.strip() for c in comandos if c.strip()]
+
+
+def aplicar_migracoes(esquema: str = "petvida") -> bool:
+    """Aplica as migrações pendentes no `esquema`, que deve ser o search_path da conexão.
+
+    Devolve False se alguma migração falhou (as seguintes não são aplicadas).
+    """
+    with conexao() as conn:
+        with conn.cursor() as c:
+            c.execute(
+                sql.SQL(
+                    """
+                    CREATE SCHEMA IF NOT EXISTS {esquema};
+                    CREATE TABLE IF NOT EXISTS {esquema}.schema_version (
+                        versao      INT PRIMARY KEY,
+                        nome        VARCHAR(200) NOT NULL,
+                        aplicada_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    );
+                    """
+                ).format(esquema=sql.Identifier(esquema))
+            )
+            conn.commit()
+
+            c.execute("SELECT pg_advisory_lock(%s);", (_TRAVA_MIGRACAO,))
+            try:
+                c.execute("SELECT coalesce(max(versao), 0) FROM schema_version;")
+                atual = c.fetchone()[0]
+                conn.commit()
+
+                pendentes = [m for m in migracoes_disponiveis() if m.versao > atual]
+                if not pendentes:
+                    print(f"Esquema já está na versão {atual}. Nada a fazer.")
+                    return True
+
+                for m in pendentes:
+                    print(f"Aplicando migração {m.versao:04d} ({m.nome})...")
+                    script = m.caminho.read_text(encoding="utf-8")
+                    try:
+                        if script.startswith(MARCA_SEM_TRANSACAO):
+                            conn.autocommit = True
+                            for comando in _comandos(script):
+                                c.execute(comando)
+                            conn.autocommit = False
+                        else:
+                            c.execute(script)
+                        c.execute(
+                            "INSERT INTO schema_version (versao, nome) VALUES (%s, %s);",
+                            (m.versao, m.nome),
+                        )
+                        conn.commit()
+                    except Exception as e:
+                        conn.rollback()
+                        conn.autocommit = False
+                        print(f"Erro na migração {m.versao:04d}:", e)
+                        return False
+
+                print(f"✅ Esquema atualizado para a versão {pendentes[-1].versao}.")
+                return True
+            finally:
+                c.execute("SELECT pg_advisory_unlock(%s);", (_TRAVA_MIGRACAO,))
+                conn.commit()
+
+
+# Tabelas particionadas por mês na migração 0007.
+TABELAS_PARTICIONADAS = ("consulta", "cirurgia")
+
+
+def criar_particoes(meses_a_frente: Optional[int] = None) -> None:
+    """Cria as partições mensais até `meses_a_frente` meses depois do atual.
+
+    Rodar pelo cron uma vez por mês (`python main.py --particoes`); criar
+    uma partição que já existe não faz nada.
+    """
+    if meses_a_frente is None:
+        meses_a_frente = PARTICOES_CONFIG["meses_a_frente"]
+    with conexao() as conn:
+        try:
+            with conn.cursor() as c:
+                for tabela in TABELAS_PARTICIONADAS:
+                    c.execute(
+                        """
+                        SELECT criar_particoes_mensais(
+                            %s, current_date, (current_date + make_interval(months => %s))::date
+                        );
+                        """,
+                        (tabela, meses_a_frente),
+                    )
+                    criadas = c.fetchone()[0]
+                    print(f"{tabela}: {criadas} partição(ões) criada(s).")
+            conn.commit()
+        except pg_errors.UndefinedFunction:
+            conn.rollback()
+            print("⚠ Tabelas ainda não particionadas. Rode antes: python main.py --migrate")
+        except Exception as e:
+            conn.rollback()
+            print("Erro ao criar partições:", e)
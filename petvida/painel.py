@@ -0,0 +1,121 @@
+"""Painel da clínica (Admin > Relatórios): números do mês numa consulta só.
+
+Um único SELECT com GROUPING SETS e agregados com FILTER devolve as
+consultas do mês por status, por prioridade e por veterinário, as
+cirurgias do mês por status, os animais por espécie e o total de
+tutores. O resultado fica guardado no processo por PAINEL_CONFIG["ttl_s"]
+segundos: abrir o painel de novo nesse intervalo não vai ao banco.
+"""
+import datetime
+import threading
+import time
+from typing import List, NamedTuple, Optional
+
+from config import PAINEL_CONFIG
+from replicas import conexao_leitura
+from repositorios import ATIVOS
+
+
+class LinhaPainel(NamedTuple):
+    secao: str                 # ex.: "consultas_vet"; sem sufixo = linha de total
+    chave: Optional[str]       # status, prioridade, veterinário ou espécie
+    total: int
+    urgentes: Optional[int]
+    agendadas: Optional[int]
+    novos_no_mes: Optional[int]
+
+
+class Painel(NamedTuple):
+    mes: datetime.date
+    gerado_em: datetime.datetime
+    linhas: List[LinhaPainel]
+
+    def secao(self, nome: str) -> List[LinhaPainel]:
+        return [linha for linha in self.linhas if linha.secao == nome]
+
+
+# GROUPING(col) = 0 quando a linha está agrupada por col; () é o total
+PAINEL = f"""
+    WITH c AS (
+        SELECT c.status, c.prioridade, coalesce(u.username, '(sem veterinário)') AS vet
+        FROM consulta c
+        JOIN animal a ON a.id_animal = c.id_animal
+        JOIN dono d   ON d.id_dono   = a.id_dono
+        LEFT JOIN usuario u ON u.id_usuario = c.id_vet
+        WHERE c.data >= %(ini)s AND c.data < %(fim)s AND {ATIVOS}
+    )
+    SELECT CASE
+               WHEN GROUPING(status) = 0 THEN 'consultas_status'
+               WHEN GROUPING(prioridade) = 0 THEN 'consultas_prioridade'
+               WHEN GROUPING(vet) = 0 THEN 'consultas_vet'
+               ELSE 'consultas'
+           END,
+           CASE
+               WHEN GROUPING(status) = 0 THEN status
+               WHEN GROUPING(prioridade) = 0 THEN prioridade
+               ELSE vet
+           END,
+           count(*),
+           count(*) FILTER (WHERE prioridade = 'urgente'),
+           count(*) FILTER (WHERE status = 'agendada'),
+           NULL::bigint
+    FROM c
+    GROUP BY GROUPING SETS ((status), (prioridade), (vet), ())
+
+    UNION ALL
+    SELECT CASE WHEN GROUPING(ci.status) = 0 THEN 'cirurgias_status' ELSE 'cirurgias' END,
+           ci.status,
+           count(*),
+           NULL,
+           count(*) FILTER (WHERE ci.status = 'agendada'),
+           NULL
+    FROM cirurgia ci
+    JOIN animal a ON a.id_animal = ci.id_animal
+    JOIN dono d   ON d.id_dono   = a.id_dono
+    WHERE ci.data >= %(ini)s AND ci.data < %(fim)s AND {ATIVOS}
+    GROUP BY GROUPING SETS ((ci.status), ())
+
+    UNION ALL
+    SELECT CASE WHEN GROUPING(a.especie) = 0 THEN 'animais_especie' ELSE 'animais' END,
+           a.especie,
+           count(*),
+           NULL,
+           NULL,
+           count(*) FILTER (WHERE a.criado_em >= %(ini)s)
+    FROM animal a
+    JOIN dono d ON d.id_dono = a.id_dono
+    WHERE {ATIVOS}
+    GROUP BY GROUPING SETS ((a.especie), ())
+
+    UNION ALL
+    SELECT 'tutores', NULL, count(*), NULL, NULL, count(*) FILTER (WHERE criado_em >= %(ini)s)
+    FROM dono
+    WHERE excluido_em IS NULL
+
+    ORDER BY 1, 3 DESC, 2
+"""
+
+_painel: Optional[Painel] = None
+_gerado_monotonic = float("-inf")
+_trava = threading.Lock()
+
+
+def _buscar(mes: datetime.date) -> Painel:
+    fim = (mes + datetime.timedelta(days=32)).replace(day=1)
+    with conexao_leitura() as conn, conn.cursor() as c:
+        c.execute(PAINEL, {"ini": mes, "fim": fim})
+        linhas = [LinhaPainel._make(r) for r in c]
+    return Painel(mes, datetime.datetime.now(), linhas)
+
+
+def obter_painel(atualizar: bool = False) -> Painel:
+    """Painel do mês atual; refaz a consulta só se o guardado venceu ou mudou o mês."""
+    global _painel, _gerado_monotonic
+    mes = datetime.date.today().replace(day=1)
+    with _trava:
+        vencido = time.monotonic() - _gerado_monotonic >= PAINEL_CONFIG["ttl_s"]
+        if atualizar or vencido or _painel is None or _painel.mes != mes:
+            _painel = _buscar(mes)
+            _gerado_monotonic = time.monotonic()
+        return _painel
+
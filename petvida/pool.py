@@ -0,0 +1,181 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+import psycopg2
+from psycopg2 import pool as pg_pool
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+from psycopg2.extensions import connection as PgConnection
+
+from config import CONSULTAS_LENTAS, DB_CONFIG, POOL_CONFIG, REPLICAS_CONFIG
+
+
+class PoolIndisponivel(Exception):
+    """Não foi possível obter uma conexão (banco fora ou pool esgotado)."""
+
+
+class PoolConexoes:
+    """Pool thread-safe sobre o ThreadedConnectionPool do psycopg2.
+
+    Acrescenta espera bloqueante quando o pool está cheio, verificação
+    de vida da conexão no checkout e reconexão com backoff exponencial.
+    """
+
+    def __init__(self, db_config: Dict, pool_config: Dict) -> None:
+        self.db_config = db_config
+        self.min_conexoes = pool_config["min_conexoes"]
+        self.max_conexoes = pool_config["max_conexoes"]
+        self.espera_checkout = pool_config["espera_checkout"]
+        self.verificar_apos = pool_config["verificar_apos"]
+        self.tentativas = pool_config["tentativas_reconexao"]
+        self.backoff_inicial = pool_config["backoff_inicial"]
+        self.backoff_maximo = pool_config["backoff_maximo"]
+
+        self._vagas = threading.BoundedSemaphore(self.max_conexoes)
+        self._trava = threading.Lock()
+        self._devolvida_em: Dict[int, float] = {}
+        self._pool = self._com_backoff(
+            lambda: pg_pool.ThreadedConnectionPool(
+                self.min_conexoes, self.max_conexoes, **self.db_config
+            )
+        )
+
+    def _com_backoff(self, acao):
+        espera = self.backoff_inicial
+        for tentativa in range(1, self.tentativas + 1):
+            try:
+                return acao()
+            except psycopg2.OperationalError as e:
+                if tentativa == self.tentativas:
+                    raise PoolIndisponivel(f"Banco indisponível: {e}") from e
+                time.sleep(espera)
+                espera = min(espera * 2, self.backoff_maximo)
+
+    def _viva(self, conn: PgConnection) -> bool:
+        if conn.closed:
+            return False
+        ociosa_desde = self._devolvida_em.get(id(conn))
+        if ociosa_desde is not None and time.monotonic() - ociosa_desde < self.verificar_apos:
+            return True
+        try:
+            with conn.cursor() as c:
+                c.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _descartar(self, conn: PgConnection) -> None:
+        with self._trava:
+            self._devolvida_em.pop(id(conn), None)
+        try:
+            self._pool.putconn(conn, close=True)
+        except pg_pool.PoolError:
+            pass
+
+    def obter(self) -> PgConnection:
+        if not self._vagas.acquire(timeout=self.espera_checkout):
+            raise PoolIndisponivel("Nenhuma conexão livre no pool.")
+        try:
+            while True:
+                conn = self._com_backoff(self._pool.getconn)
+                if self._viva(conn):
+                    conn.autocommit = False
+                    return conn
+                # conexão caiu enquanto estava ociosa: joga fora e pega outra
+                self._descartar(conn)
+        except BaseException:
+            self._vagas.release()
+            raise
+
+    def devolver(self, conn: PgConnection) -> None:
+        try:
+            if conn.closed:
+                self._descartar(conn)
+                return
+            try:
+                if conn.get_transaction_status() != TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except psycopg2.Error:
+                self._descartar(conn)
+                return
+            with self._trava:
+                self._devolvida_em[id(conn)] = time.monotonic()
+            self._pool.putconn(conn)
+        finally:
+            self._vagas.release()
+
+    @contextmanager
+    def conexao(self) -> Iterator[PgConnection]:
+        conn = self.obter()
+        try:
+            yield conn
+        finally:
+            self.devolver(conn)
+
+    def fechar(self) -> None:
+        self._pool.closeall()
+
+
+_pool: Optional[PoolConexoes] = None
+_pool_trava = threading.Lock()
+
+
+def configurar_conexoes(db_config: Dict) -> Dict:
+    """Acrescenta as fábricas de conexão/cursor ligadas no config (usado também pelas réplicas)."""
+    db_config = dict(db_config)
+    if POOL_CONFIG["preparar_consultas"]:
+        from preparadas import ConexaoPreparada
+
+        db_config["connection_factory"] = ConexaoPreparada
+    if CONSULTAS_LENTAS["ativo"]:
+        from consultas_lentas import CursorInstrumentado
+
+        db_config.setdefault("cursor_factory", CursorInstrumentado)
+    return db_config
+
+
+def obter_pool(db_config: Optional[Dict] = None) -> PoolConexoes:
+    """Pool global; `db_config` só é usado na primeira chamada (padrão: DB_CONFIG)."""
+    global _pool
+    if _pool is None:
+        with _pool_trava:
+            if _pool is None:
+                db_config = configurar_conexoes(db_config or DB_CONFIG)
+                if REPLICAS_CONFIG["dsns"]:
+                    from replicas import com_registro_de_escritas
+
+                    db_config["connection_factory"] = com_registro_de_escritas(
+                        db_config.get("connection_factory", PgConnection)
+                    )
+                _pool = PoolConexoes(db_config, POOL_CONFIG)
+    return _pool
+
+
+def iniciar_pool(db_config: Optional[Dict] = None) -> bool:
+    try:
+        obter_pool(db_config)
+        return True
+    except PoolIndisponivel as e:
+        print("Erro ao conectar ao banco:", e)
+        return False
+
+
+@contextmanager
+def conexao() -> Iterator[PgConnection]:
+    """Empresta uma conexão do pool global e a devolve ao sair do bloco."""
+    with obter_pool().conexao() as conn:
+        yield conn
+
+
+def fechar_pool() -> None:
+    global _pool
+    with _pool_trava:
+        if _pool is not None:
+            _pool.fechar()
+            _pool = None
+    if REPLICAS_CONFIG["dsns"]:
+        from replicas import fechar_replicas
+
+        fechar_replicas()
@@ -0,0 +1,218 @@
+"""Pool de conexões assíncronas para asyncio, sem dependências novas.
+
+Usa o modo assíncrono nativo do psycopg2 (`async_=1`): o socket de cada
+conexão é registrado no event loop (add_reader/add_writer) enquanto o
+servidor responde, então uma única thread atende dezenas de sessões.
+
+Conexões assíncronas estão sempre em autocommit; transações são abertas
+explicitamente com `transacao()`. Se a tarefa for cancelada no meio de
+uma consulta, o pedido de cancelamento é enviado ao servidor (PQcancel)
+antes de a conexão voltar ao pool.
+"""
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Mapping, Optional, Sequence, Union
+
+import psycopg2
+from psycopg2.extensions import (
+    POLL_OK,
+    POLL_READ,
+    POLL_WRITE,
+    TRANSACTION_STATUS_IDLE,
+)
+from psycopg2.extensions import connection as PgConnection
+from psycopg2.extensions import cursor as PgCursor
+
+from config import DB_CONFIG, POOL_ASYNC_CONFIG, POOL_CONFIG
+from pool import PoolIndisponivel
+
+
+def _acordar(fut: "asyncio.Future[None]") -> None:
+    if not fut.done():
+        fut.set_result(None)
+
+
+async def aguardar(conn: PgConnection) -> None:
+    """Conduz conn.poll() até a operação terminar, sem bloquear o loop."""
+    loop = asyncio.get_running_loop()
+    while True:
+        estado = conn.poll()
+        if estado == POLL_OK:
+            return
+        fd = conn.fileno()
+        fut = loop.create_future()
+        if estado == POLL_READ:
+            loop.add_reader(fd, _acordar, fut)
+            try:
+                await fut
+            finally:
+                loop.remove_reader(fd)
+        elif estado == POLL_WRITE:
+            loop.add_writer(fd, _acordar, fut)
+            try:
+                await fut
+            finally:
+                loop.remove_writer(fd)
+        else:
+            raise psycopg2.OperationalError(f"poll() retornou estado inesperado: {estado}")
+
+
+async def executar(
+    conn: PgConnection,
+    sql: str,
+    params: Optional[Union[Sequence[Any], Mapping[str, Any]]] = None,
+) -> PgCursor:
+    """Executa e devolve o cursor já com o resultado disponível."""
+    c = conn.cursor()
+    c.execute(sql, params)
+    try:
+        await aguardar(conn)
+    except asyncio.CancelledError:
+        # interrompe a consulta no servidor e consome a resposta de erro,
+        # para a conexão poder ser reaproveitada
+        conn.cancel()
+        try:
+            await aguardar(conn)
+        except psycopg2.Error:
+            pass
+        raise
+    return c
+
+
+class PoolAssincrono:
+    """Pool de conexões assíncronas; o limite de conexões vira um semáforo."""
+
+    def __init__(self, db_config: Dict, pool_config: Dict) -> None:
+        self.db_config = db_config
+        self.max_conexoes = pool_config["max_conexoes"]
+        self.espera_checkout = pool_config["espera_checkout"]
+        self.verificar_apos = POOL_CONFIG["verificar_apos"]
+        self.tentativas = POOL_CONFIG["tentativas_reconexao"]
+        self.backoff_inicial = POOL_CONFIG["backoff_inicial"]
+        self.backoff_maximo = POOL_CONFIG["backoff_maximo"]
+
+        self._vagas = asyncio.Semaphore(self.max_conexoes)
+        self._livres: List[PgConnection] = []
+        self._devolvida_em: Dict[int, float] = {}
+
+    async def _conectar(self) -> PgConnection:
+        espera = self.backoff_inicial
+        for tentativa in range(1, self.tentativas + 1):
+            conn = None
+            try:
+                conn = psycopg2.connect(async_=1, **self.db_config)
+                await aguardar(conn)
+                return conn
+            except asyncio.CancelledError:
+                if conn is not None:
+                    conn.close()
+                raise
+            except psycopg2.OperationalError as e:
+                # o socket já foi aberto mesmo quando o poll() falha
+                if conn is not None:
+                    conn.close()
+                if tentativa == self.tentativas:
+                    raise PoolIndisponivel(f"Banco indisponível: {e}") from e
+                await asyncio.sleep(espera)
+                espera = min(espera * 2, self.backoff_maximo)
+        raise PoolIndisponivel("Banco indisponível.")
+
+    async def _viva(self, conn: PgConnection) -> bool:
+        """Mesma verificação do pool síncrono: SELECT 1 se ficou ociosa demais."""
+        ociosa_desde = self._devolvida_em.pop(id(conn), None)
+        if conn.closed:
+            return False
+        if ociosa_desde is not None and time.monotonic() - ociosa_desde < self.verificar_apos:
+            return True
+        try:
+            await executar(conn, "SELECT 1")
+            return True
+        except psycopg2.Error:
+            return False
+        except asyncio.CancelledError:
+            conn.close()
+            raise
+
+    async def obter(self) -> PgConnection:
+        try:
+            await asyncio.wait_for(self._vagas.acquire(), self.espera_checkout)
+        except asyncio.TimeoutError:
+            raise PoolIndisponivel("Nenhuma conexão livre no pool.") from None
+        try:
+            while self._livres:
+                conn = self._livres.pop()
+                if await self._viva(conn):
+                    return conn
+                # conexão caiu enquanto estava ociosa: joga fora e pega outra
+                conn.close()
+            return await self._conectar()
+        except BaseException:
+            self._vagas.release()
+            raise
+
+    async def devolver(self, conn: PgConnection) -> None:
+        try:
+            if conn.closed:
+                return
+            if conn.get_transaction_status() != TRANSACTION_STATUS_IDLE:
+                try:
+                    await executar(conn, "ROLLBACK")
+                except psycopg2.Error:
+                    conn.close()
+                    return
+                except asyncio.CancelledError:
+                    conn.close()
+                    raise
+            self._devolvida_em[id(conn)] = time.monotonic()
+            self._livres.append(conn)
+        finally:
+            self._vagas.release()
+
+    @asynccontextmanager
+    async def conexao(self) -> AsyncIterator[PgConnection]:
+        conn = await self.obter()
+        try:
+            yield conn
+        finally:
+            await self.devolver(conn)
+
+    @asynccontextmanager
+    async def transacao(self) -> AsyncIterator[PgConnection]:
+        """BEGIN/COMMIT explícitos; erro ou cancelamento fazem ROLLBACK na devolução."""
+        async with self.conexao() as conn:
+            await executar(conn, "BEGIN")
+            yield conn
+            await executar(conn, "COMMIT")
+
+    def fechar(self) -> None:
+        for conn in self._livres:
+            conn.close()
+        self._livres.clear()
+        self._devolvida_em.clear()
+
+
+_pool: Optional[PoolAssincrono] = None
+
+
+def obter_pool(db_config: Optional[Dict] = None) -> PoolAssincrono:
+    """Pool global do event loop; `db_config` só é usado na primeira chamada."""
+    global _pool
+    if _pool is None:
+        _pool = PoolAssincrono(dict(db_config or DB_CONFIG), POOL_ASYNC_CONFIG)
+    return _pool
+
+
+def conexao():
+    return obter_pool().conexao()
+
+
+def transacao():
+    return obter_pool().transacao()
+
+
+def fechar_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.fechar()
+        _pool = None
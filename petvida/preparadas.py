@@ -0,0 +1,94 @@
+"""Registro de comandos preparados (PREPARE/EXECUTE) por conexão.
+
+As consultas mais frequentes (login, listagens de consultas, id_dono do
+usuário) passam por `executar()`: na primeira vez em cada conexão o SQL
+é enviado com PREPARE; daí em diante só vai o EXECUTE com os parâmetros,
+e o servidor reaproveita a análise e, após algumas execuções, o plano.
+
+O pool abre as conexões com `connection_factory=ConexaoPreparada`, que
+guarda os nomes já preparados. Uma reconexão cria um objeto novo, com o
+registro vazio, então tudo é preparado de novo automaticamente. As
+listagens montam o SQL conforme filtros e direção da página, então o
+registro guarda no máximo POOL_CONFIG["max_preparadas"] comandos: ao
+passar disso, o usado há mais tempo sai com DEALLOCATE.
+Desligado (POOL_CONFIG["preparar_consultas"]), `executar()` é só
+cursor.execute().
+"""
+import hashlib
+import re
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Sequence, Tuple
+
+from psycopg2 import errors as pg_errors
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+from psycopg2.extensions import connection as PgConnection
+from psycopg2.extensions import cursor as PgCursor
+
+from config import POOL_CONFIG
+
+
+class ConexaoPreparada(PgConnection):
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        # nome -> None, do usado há mais tempo para o mais recente
+        self.preparadas: "OrderedDict[str, None]" = OrderedDict()
+
+
+@lru_cache(maxsize=256)
+def _traduzir(sql: str) -> Tuple[str, str, int]:
+    """Nome estável, texto com $1..$n no lugar de %s e número de parâmetros."""
+    texto = sql.strip().rstrip(";")
+    n = 0
+
+    def posicional(_: "re.Match[str]") -> str:
+        nonlocal n
+        n += 1
+        return f"${n}"
+
+    texto = re.sub(r"%s", posicional, texto).replace("%%", "%")
+    nome = "petvida_" + hashlib.md5(texto.encode("utf-8")).hexdigest()[:12]
+    return nome, texto, n
+
+
+def _preparar(c: PgCursor, nome: str, texto: str) -> None:
+    preparadas = c.connection.preparadas
+    if nome in preparadas:
+        preparadas.move_to_end(nome)
+        return
+    while len(preparadas) >= POOL_CONFIG["max_preparadas"]:
+        antigo, _ = preparadas.popitem(last=False)
+        c.execute(f"DEALLOCATE {antigo}")
+    # comandos preparados não são desfeitos por ROLLBACK: basta uma vez
+    c.execute(f"PREPARE {nome} AS {texto}")
+    preparadas[nome] = None
+
+
+def _executar(c: PgCursor, nome: str, n: int, params: Sequence[Any]) -> None:
+    if n:
+        c.execute(f"EXECUTE {nome} ({', '.join(['%s'] * n)})", params)
+    else:
+        c.execute(f"EXECUTE {nome}")
+
+
+def executar(c: PgCursor, sql: str, params: Sequence[Any] = ()) -> None:
+    """cursor.execute() via comando preparado, preparando na 1ª vez por conexão."""
+    preparadas = getattr(c.connection, "preparadas", None)
+    if preparadas is None:
+        c.execute(sql, params)
+        return
+
+    nome, texto, n = _traduzir(sql)
+    ocioso = c.connection.get_transaction_status() == TRANSACTION_STATUS_IDLE
+    try:
+        _preparar(c, nome, texto)
+        _executar(c, nome, n, params)
+    except pg_errors.InvalidSqlStatementName:
+        # sessão trocada por baixo (ex.: DISCARD ALL): nada do registro vale mais
+        preparadas.clear()
+        if not ocioso:
+            # a transação de quem chamou abortou com o erro: não dá para repetir
+            raise
+        c.connection.rollback()
+        _preparar(c, nome, texto)
+        _executar(c, nome, n, params)
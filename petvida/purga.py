@@ -0,0 +1,153 @@
+"""Purga de tutores e animais excluídos: `python main.py --purgar`.
+
+Excluir no menu só preenche excluido_em (migração 0010): é um UPDATE de
+uma linha e, até a purga, o administrador pode desfazer. A purga pega o
+que foi excluído há mais de PURGA_CONFIG["carencia_horas"], marca
+em_purga (daí em diante não há como desfazer) e apaga em lotes de
+PURGA_CONFIG["lote"] linhas (lotes.py, como o arquivamento): primeiro
+consultas e cirurgias (ativas e arquivadas), depois os animais e por fim
+os tutores, quando o ON DELETE CASCADE já não encontra mais nada. Pode ser interrompida e rodada de novo.
+"""
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from config import PURGA_CONFIG
+from lotes import executar_em_lotes
+from pool import conexao
+
+# em_purga só é marcado uma vez: quem já começou a ser apagado segue na fila
+MARCAR = """
+    WITH donos AS (
+        UPDATE dono SET em_purga = TRUE
+        WHERE excluido_em < now() - make_interval(hours => %(carencia)s) AND NOT em_purga
+        RETURNING 1
+    ), animais AS (
+        UPDATE animal SET em_purga = TRUE
+        WHERE excluido_em < now() - make_interval(hours => %(carencia)s) AND NOT em_purga
+        RETURNING 1
+    )
+    SELECT (SELECT count(*) FROM donos), (SELECT count(*) FROM animais)
+"""
+
+# Os IDs em purga são lidos uma vez por rodada (em_purga não volta atrás,
+# índices parciais de 0013) e cada lote só busca por chave. Animais: os
+# marcados e os de tutor marcado.
+_ANIMAIS_EM_PURGA = """
+    SELECT id_animal FROM animal WHERE em_purga
+    UNION
+    SELECT a.id_animal
+    FROM dono d
+    JOIN animal a ON a.id_dono = d.id_dono
+    WHERE d.em_purga
+"""
+
+_DONOS_EM_PURGA = "SELECT id_dono FROM dono WHERE em_purga"
+
+
+class Dependente(NamedTuple):
+    tabela: str
+    chave: str
+
+
+DEPENDENTES = (
+    Dependente("consulta", "id_consulta"),
+    Dependente("cirurgia", "id_cirurgia"),
+    Dependente("consulta_arquivo", "id_consulta"),
+    Dependente("cirurgia_arquivo", "id_cirurgia"),
+)
+
+
+def _sql_lote(t: Dependente) -> str:
+    # data no lote e no USING: cada linha é procurada só na sua partição (0007)
+    return f"""
+        WITH lote AS (
+            SELECT {t.chave}, data FROM {t.tabela}
+            WHERE id_animal = ANY(%s)
+            LIMIT %s
+            FOR UPDATE SKIP LOCKED
+        )
+        DELETE FROM {t.tabela} x
+        USING lote l
+        WHERE x.{t.chave} = l.{t.chave} AND x.data = l.data
+    """
+
+
+APAGAR_ANIMAIS = """
+    DELETE FROM animal
+    WHERE id_animal IN (
+        SELECT id_animal FROM animal
+        WHERE id_animal = ANY(%s)
+        LIMIT %s
+        FOR UPDATE SKIP LOCKED
+    )
+"""
+
+APAGAR_DONOS = """
+    DELETE FROM dono
+    WHERE id_dono IN (
+        SELECT id_dono FROM dono
+        WHERE id_dono = ANY(%s)
+        LIMIT %s
+        FOR UPDATE SKIP LOCKED
+    )
+"""
+
+
+def apagar_em_lotes(
+    sql: str, ids: List[int], lote: Optional[int] = None, pausa: Optional[float] = None
+) -> int:
+    """Apaga em lotes (lotes.py) as linhas de `ids`; devolve quantas."""
+    if not ids:
+        return 0
+    return executar_em_lotes(
+        sql,
+        (ids,),
+        lote or PURGA_CONFIG["lote"],
+        PURGA_CONFIG["pausa"] if pausa is None else pausa,
+    )
+
+
+def em_purga() -> Tuple[List[int], List[int]]:
+    """IDs de animais e de tutores marcados para a purga."""
+    with conexao() as conn, conn.cursor() as c:
+        c.execute(_ANIMAIS_EM_PURGA)
+        animais = [r[0] for r in c]
+        c.execute(_DONOS_EM_PURGA)
+        donos = [r[0] for r in c]
+    return animais, donos
+
+
+def marcar(carencia_horas: Optional[int] = None) -> Dict[str, int]:
+    """Fecha o desfazer do que passou da carência; devolve quantos de cada."""
+    carencia = PURGA_CONFIG["carencia_horas"] if carencia_horas is None else carencia_horas
+    with conexao() as conn:
+        try:
+            with conn.cursor() as c:
+                c.execute(MARCAR, {"carencia": carencia})
+                donos, animais = c.fetchone()
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    return {"dono": donos, "animal": animais}
+
+
+def purgar(carencia_horas: Optional[int] = None) -> Dict[str, int]:
+    print("\n=== Purga de tutores e animais excluídos ===")
+    apagadas: Dict[str, int] = {}
+    try:
+        marcados = marcar(carencia_horas)
+        print(
+            f"{marcados['dono']} tutor(es) e {marcados['animal']} animal(is) "
+            "entraram na purga."
+        )
+        animais, donos = em_purga()
+        for t in DEPENDENTES:
+            apagadas[t.tabela] = apagar_em_lotes(_sql_lote(t), animais)
+            print(f"{t.tabela}: {apagadas[t.tabela]} linha(s) apagada(s).")
+        apagadas["animal"] = apagar_em_lotes(APAGAR_ANIMAIS, animais)
+        print(f"animal: {apagadas['animal']} linha(s) apagada(s).")
+        apagadas["dono"] = apagar_em_lotes(APAGAR_DONOS, donos)
+        print(f"dono: {apagadas['dono']} linha(s) apagada(s).")
+    except Exception as e:
+        print("Erro na purga:", e)
+    return apagadas
@@ -0,0 +1,329 @@
+"""Roteamento de leituras para réplicas (REPLICAS_CONFIG).
+
+Listagens e relatórios pedem `conexao_leitura()` em vez de `conexao()`.
+A conexão sai de uma réplica escolhida por round-robin ou pela menor
+latência medida, e volta para o primário quando:
+
+- não há réplicas configuradas, ou todas estão fora do ar ou atrasadas
+  mais que `atraso_max_s` (o atraso é medido na própria réplica contra
+  a posição do WAL no primário, no máximo a cada
+  `verificar_atraso_apos` segundos);
+- a sessão gravou algo no primário (COMMIT de uma transação que
+  escreveu) há menos de `janela_proprias_escritas` segundos, para que
+  ela enxergue o que acabou de gravar.
+
+Uma sessão é um processo (um terminal): a marca da última escrita é
+global ao módulo. Conexões de réplica abrem com
+default_transaction_read_only, então uma escrita por engano falha em
+vez de ir para o lugar errado.
+"""
+import itertools
+import re
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Iterator, List, NamedTuple, Optional, Tuple, Type
+
+import psycopg2
+from psycopg2.extensions import connection as PgConnection
+from psycopg2.extensions import cursor as PgCursor
+
+from config import DB_CONFIG, POOL_CONFIG, REPLICAS_CONFIG
+from pool import PoolConexoes, PoolIndisponivel, conexao, configurar_conexoes
+
+# Atraso de replay. Zero se a réplica já aplicou tudo o que o primário tinha
+# gravado quando foi consultado logo antes (um primário ocioso não gera
+# transações e o replay_timestamp envelhece). Sem o primário para comparar,
+# "aplicou tudo o que recebeu" só vale com o receptor de WAL conectado: um
+# receptor caído não recebe nada e pareceria em dia para sempre.
+_ATRASO = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN %(lsn_primario)s::pg_lsn IS NOT NULL
+             AND pg_last_wal_replay_lsn() >= %(lsn_primario)s::pg_lsn THEN 0
+        WHEN %(lsn_primario)s::pg_lsn IS NULL
+             AND pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn()
+             AND EXISTS (SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming') THEN 0
+        ELSE coalesce(
+            extract(epoch FROM now() - pg_last_xact_replay_timestamp())::float8,
+            'Infinity'::float8
+        )
+    END
+"""
+
+_ultima_escrita = float("-inf")
+_desligadas = 0
+
+
+def registrar_escrita() -> None:
+    global _ultima_escrita
+    _ultima_escrita = time.monotonic()
+
+
+# Tag de status do comando (cursor.statusmessage) que não grava nada. Os de
+# DML gravam se afetaram linhas; SELECT só com uma CTE de escrita no texto
+# (WITH ... UPDATE ... SELECT). O resto (DDL, CALL, DO) conta como escrita.
+_SO_LEITURA = frozenset(
+    ("SHOW", "SET", "RESET", "BEGIN", "SAVEPOINT", "RELEASE", "ROLLBACK",
+     "DECLARE", "FETCH", "MOVE", "CLOSE", "PREPARE", "DEALLOCATE", "EXPLAIN")
+)
+_DML = frozenset(("INSERT", "UPDATE", "DELETE", "MERGE", "COPY"))
+_CTE_DE_ESCRITA = re.compile(rb"(?i)\b(insert|update|delete|merge)\b")
+_COPY_FROM = re.compile(rb"(?i)\bfrom\s+stdin\b")
+
+
+def _escreveu(cursor: PgCursor) -> bool:
+    """O último comando do cursor gravou algo? Só olha o que já veio na resposta."""
+    tag = (cursor.statusmessage or "").split(" ", 1)[0]
+    if not tag or tag in _SO_LEITURA:
+        return False
+    if tag in _DML:
+        return cursor.rowcount > 0
+    if tag == "SELECT":
+        return bool(cursor.query and _CTE_DE_ESCRITA.search(cursor.query))
+    return True
+
+
+@lru_cache(maxsize=None)
+def _cursor_que_marca(base: Type[PgCursor]) -> Type[PgCursor]:
+    class CursorQueMarca(base):
+        def execute(self, query: Any, vars: Optional[Any] = None) -> None:
+            try:
+                return super().execute(query, vars)
+            finally:
+                if _escreveu(self):
+                    self.connection.escreveu = True
+
+        def copy_expert(self, sql: Any, file: Any, size: int = 8192) -> None:
+            super().copy_expert(sql, file, size)
+            texto = sql if isinstance(sql, bytes) else str(sql).encode()
+            if self.rowcount > 0 and _COPY_FROM.search(texto):
+                self.connection.escreveu = True
+
+    return CursorQueMarca
+
+
+def com_registro_de_escritas(base: Type[PgConnection]) -> Type[PgConnection]:
+    """Classe de conexão do primário que marca cada COMMIT que escreveu algo.
+
+    Os cursores anotam na conexão se um comando gravou (pela tag de status
+    que já vem com a resposta); o COMMIT não faz nenhuma ida extra ao banco.
+    """
+
+    class ConexaoPrimaria(base):
+        escreveu = False
+
+        def cursor(self, *args: Any, **kwargs: Any) -> PgCursor:
+            fabrica = kwargs.get("cursor_factory") or self.cursor_factory or PgCursor
+            kwargs["cursor_factory"] = _cursor_que_marca(fabrica)
+            return super().cursor(*args, **kwargs)
+
+        def commit(self) -> None:
+            super().commit()
+            if self.escreveu:
+                self.escreveu = False
+                registrar_escrita()
+
+        def rollback(self) -> None:
+            self.escreveu = False
+            super().rollback()
+
+    return ConexaoPrimaria
+
+
+def _lsn_primario() -> Optional[str]:
+    """Posição atual do WAL no primário, ou None se ele não respondeu."""
+    try:
+        with conexao() as conn:
+            with conn.cursor() as c:
+                c.execute("SELECT pg_current_wal_lsn()")
+                lsn = c.fetchone()[0]
+            conn.rollback()
+            return lsn
+    except (PoolIndisponivel, psycopg2.Error):
+        return None
+
+
+class Replica:
+    __slots__ = ("dsn", "pool", "atraso", "latencia_ms", "medido_em", "falhou_em")
+
+    def __init__(self, dsn: str) -> None:
+        self.dsn = dsn
+        self.pool: Optional[PoolConexoes] = None
+        self.atraso = 0.0
+        self.latencia_ms = 0.0
+        self.medido_em = float("-inf")
+        self.falhou_em = float("-inf")
+
+    @property
+    def nome(self) -> str:
+        """DSN sem a senha, para mensagens."""
+        return " ".join(p for p in self.dsn.split() if not p.startswith("password="))
+
+    def disponivel(self, agora: float) -> bool:
+        """Fora do ar há pouco: não. Atrasada: só quando for hora de medir de novo."""
+        if agora - self.falhou_em < REPLICAS_CONFIG["pausa_apos_falha"]:
+            return False
+        return (
+            self.atraso <= REPLICAS_CONFIG["atraso_max_s"]
+            or agora - self.medido_em >= REPLICAS_CONFIG["verificar_atraso_apos"]
+        )
+
+    def _pool(self) -> PoolConexoes:
+        with _trava:
+            if self.pool is None:
+                self.pool = self._criar_pool()
+        return self.pool
+
+    def _criar_pool(self) -> PoolConexoes:
+        opcoes = f"{DB_CONFIG.get('options', '')} -c default_transaction_read_only=on"
+        db_config = configurar_conexoes({"dsn": self.dsn, "options": opcoes.strip()})
+        # sem conexões abertas de saída e sem backoff: réplica fora cai para o primário
+        pool_config = dict(
+            POOL_CONFIG,
+            min_conexoes=0,
+            max_conexoes=REPLICAS_CONFIG["max_conexoes"],
+            espera_checkout=1.0,
+            tentativas_reconexao=1,
+        )
+        return PoolConexoes(db_config, pool_config)
+
+    def medir(self, conn: PgConnection) -> None:
+        # primário antes da réplica: o que ele tinha gravado já deve ter chegado
+        lsn = _lsn_primario()
+        inicio = time.perf_counter()
+        with conn.cursor() as c:
+            c.execute(_ATRASO, {"lsn_primario": lsn})
+            atraso = float(c.fetchone()[0])
+        conn.rollback()
+        ms = (time.perf_counter() - inicio) * 1000
+        # média móvel: um pico isolado não tira a réplica da frente
+        primeira = self.medido_em == float("-inf")
+        self.latencia_ms = ms if primeira else 0.7 * self.latencia_ms + 0.3 * ms
+        self.atraso = atraso
+        self.medido_em = time.monotonic()
+
+    def obter(self) -> Optional[PgConnection]:
+        """Conexão da réplica, ou None se ela está fora ou atrasada demais."""
+        try:
+            conn = self._pool().obter()
+        except PoolIndisponivel:
+            self.falhou_em = time.monotonic()
+            return None
+        try:
+            if time.monotonic() - self.medido_em >= REPLICAS_CONFIG["verificar_atraso_apos"]:
+                self.medir(conn)
+        except psycopg2.Error:
+            self.pool.devolver(conn)
+            self.falhou_em = time.monotonic()
+            return None
+        if self.atraso > REPLICAS_CONFIG["atraso_max_s"]:
+            self.pool.devolver(conn)
+            return None
+        return conn
+
+
+_replicas: Optional[List[Replica]] = None
+_trava = threading.Lock()
+_proxima = itertools.count()
+
+
+def replicas() -> List[Replica]:
+    global _replicas
+    if _replicas is None:
+        with _trava:
+            if _replicas is None:
+                _replicas = [Replica(dsn) for dsn in REPLICAS_CONFIG["dsns"]]
+    return _replicas
+
+
+def _candidatas() -> List[Replica]:
+    """Réplicas na ordem de tentativa, conforme a política."""
+    agora = time.monotonic()
+    todas = replicas()
+    if REPLICAS_CONFIG["politica"] == "menor-latencia":
+        return sorted(
+            (r for r in todas if r.disponivel(agora)), key=lambda r: r.latencia_ms
+        )
+    inicio = next(_proxima) % len(todas)
+    girada = todas[inicio:] + todas[:inicio]
+    return [r for r in girada if r.disponivel(agora)]
+
+
+@contextmanager
+def somente_primario() -> Iterator[None]:
+    """Desvia todas as leituras para o primário durante o bloco."""
+    global _desligadas
+    _desligadas += 1
+    try:
+        yield
+    finally:
+        _desligadas -= 1
+
+
+def _obter_de_replica() -> Optional[Tuple[Replica, PgConnection]]:
+    if not REPLICAS_CONFIG["dsns"] or _desligadas:
+        return None
+    if time.monotonic() - _ultima_escrita < REPLICAS_CONFIG["janela_proprias_escritas"]:
+        return None
+    for replica in _candidatas():
+        conn = replica.obter()
+        if conn is not None:
+            return replica, conn
+    return None
+
+
+@contextmanager
+def conexao_leitura() -> Iterator[PgConnection]:
+    """Conexão para leituras que toleram alguns segundos de atraso."""
+    escolhida = _obter_de_replica()
+    if escolhida is None:
+        with conexao() as conn:
+            yield conn
+        return
+
+    replica, conn = escolhida
+    try:
+        yield conn
+    finally:
+        replica.pool.devolver(conn)
+
+
+class SituacaoReplica(NamedTuple):
+    replica: str
+    conectou: bool
+    atraso_s: float
+    latencia_ms: float
+    recebe_leituras: bool
+
+
+def situacao() -> List[SituacaoReplica]:
+    """Mede cada réplica agora (para `python main.py --replicas`)."""
+    linhas = []
+    for replica in replicas():
+        replica.medido_em = float("-inf")
+        replica.falhou_em = float("-inf")
+        conn = replica.obter()
+        if conn is not None:
+            replica.pool.devolver(conn)
+        conectou = replica.falhou_em == float("-inf")
+        linhas.append(
+            SituacaoReplica(
+                replica.nome,
+                conectou,
+                round(replica.atraso, 3),
+                round(replica.latencia_ms, 1),
+                conn is not None,
+            )
+        )
+    return linhas
+
+
+def fechar_replicas() -> None:
+    global _replicas
+    with _trava:
+        for replica in _replicas or []:
+            if replica.pool is not None:
+                replica.pool.fechar()
+        _replicas = None
@@ -0,0 +1,1098 @@
+"""Camada de acesso a dados, sem input() nem print().
+
+Os métodos recebem argumentos, emprestam uma conexão do pool e devolvem
+linhas tipadas (NamedTuple: imutáveis, sem __dict__ por linha e ainda
+desempacotáveis como tupla). Erros do banco sobem como exceções do
+psycopg2; quem chama decide como mostrá-los.
+"""
+import datetime
+import uuid
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Type
+
+from psycopg2.extras import execute_values
+
+from config import AGENDA_CONFIG, LISTAGEM_CONFIG
+from pool import conexao
+from preparadas import executar as executar_preparada
+from replicas import conexao_leitura
+
+
+# LINHAS
+class Usuario(NamedTuple):
+    id_usuario: int
+    username: str
+    tipo: str
+    senha_cripto: str
+    bloqueado: bool
+
+
+class Dono(NamedTuple):
+    id_dono: int
+    nome: str
+    cpf: str
+    email: Optional[str]
+    endereco: str
+    telefone: str
+    observacao: Optional[str]
+
+
+class DonoResumo(NamedTuple):
+    id_dono: int
+    nome: str
+    cpf: str
+    email: Optional[str]
+    telefone: str
+
+
+class Animal(NamedTuple):
+    id_animal: int
+    nome: str
+    especie: str
+    raca: str
+    idade: int
+
+
+class AnimalComTutor(NamedTuple):
+    id_animal: int
+    nome: str
+    especie: str
+    raca: str
+    idade: int
+    tutor: str
+
+
+class AnimaisPorTutor(NamedTuple):
+    id_dono: int
+    nome: str
+    total_animais: int
+
+
+class ConsultaResumo(NamedTuple):
+    id_consulta: int
+    data: datetime.date
+    horario: datetime.time
+    status: str
+    animal: str
+    tutor: str
+
+
+class ConsultaCliente(NamedTuple):
+    id_consulta: int
+    data: datetime.date
+    horario: datetime.time
+    status: str
+    prioridade: str
+    animal: str
+
+
+class ConsultaAvaliacao(NamedTuple):
+    diagnostico: Optional[str]
+    status: str
+    prioridade: str
+
+
+class HorarioLivre(NamedTuple):
+    id_vet: int
+    veterinario: str
+    data: datetime.date
+    horario: datetime.time
+
+
+class Excluido(NamedTuple):
+    id: int
+    nome: str
+    detalhe: str               # CPF do tutor ou nome do tutor do animal
+    excluido_em: datetime.datetime
+
+
+class NovoDono(NamedTuple):
+    nome: str
+    cpf: str
+    email: Optional[str]
+    endereco: str
+    telefone: str
+
+
+class NovoAnimal(NamedTuple):
+    nome: str
+    especie: str
+    raca: str
+    idade: int
+
+
+# Agendamento em lote: linhas por INSERT ... VALUES (execute_values).
+LINHAS_POR_INSERT = 500
+
+
+class Recorrencia(NamedTuple):
+    """`quantidade` consultas a partir de `inicio`, a cada `intervalo_dias` dias.
+
+    Com vários animais, cada um começa `minutos_entre_animais` depois do
+    anterior no mesmo dia (dia de campanha).
+    """
+
+    inicio: datetime.date
+    horario: datetime.time
+    intervalo_dias: int
+    quantidade: int
+    minutos_entre_animais: int = 0
+
+    def validar(self) -> None:
+        """ValueError antes de qualquer acesso ao banco se a recorrência não faz sentido."""
+        if self.intervalo_dias < 1:
+            raise ValueError("o intervalo entre consultas deve ser de pelo menos 1 dia")
+        if self.quantidade < 1:
+            raise ValueError("a quantidade de consultas deve ser pelo menos 1")
+        if self.minutos_entre_animais < 0:
+            raise ValueError("os minutos entre animais não podem ser negativos")
+
+    def horarios(self, n_animal: int) -> List[Tuple[datetime.date, datetime.time]]:
+        base = datetime.datetime.combine(self.inicio, self.horario) + datetime.timedelta(
+            minutes=n_animal * self.minutos_entre_animais
+        )
+        passo = datetime.timedelta(days=self.intervalo_dias)
+        return [
+            ((base + i * passo).date(), (base + i * passo).time())
+            for i in range(self.quantidade)
+        ]
+
+
+# LISTAGENS PAGINADAS
+class Listagem:
+    """SELECT paginável pela chave de ordenação (keyset), sem OFFSET.
+
+    `chave` é uma lista de (expressão SQL, campo da linha); a ordenação
+    usa todas as colunas da chave na mesma direção.
+    """
+
+    __slots__ = ("select", "chave", "desc", "tipo", "filtros", "params")
+
+    def __init__(
+        self,
+        select: str,
+        chave: Sequence[Tuple[str, str]],
+        desc: bool,
+        tipo: Type[NamedTuple],
+        filtros: Sequence[str] = (),
+        params: Sequence[Any] = (),
+    ) -> None:
+        self.select = select
+        self.chave = chave
+        self.desc = desc
+        self.tipo = tipo
+        self.filtros = list(filtros)
+        self.params = list(params)
+
+    def _sql(self, filtros: Sequence[str], desc: bool, com_limite: bool) -> str:
+        ordem = "DESC" if desc else "ASC"
+        where = " AND ".join(filtros)
+        sql = self.select + (f" WHERE {where}" if where else "")
+        sql += " ORDER BY " + ", ".join(f"{expr} {ordem}" for expr, _ in self.chave)
+        if com_limite:
+            sql += " LIMIT %s"
+        return sql
+
+    def chave_de(self, linha: NamedTuple) -> tuple:
+        return tuple(getattr(linha, campo) for _, campo in self.chave)
+
+    def sql_pagina(
+        self, limite: int, apos: Optional[tuple] = None, voltar: bool = False
+    ) -> Tuple[str, List[Any]]:
+        """SQL e parâmetros de uma página (usado também pela camada assíncrona).
+
+        `apos` é a chave da última (ou, ao voltar, da primeira) linha já
+        exibida. Para voltar, inverte a comparação e a ordem; quem executa
+        reverte as linhas.
+        """
+        filtros = list(self.filtros)
+        params = list(self.params)
+        ordem_desc = self.desc != voltar
+        if apos is not None:
+            cols = ", ".join(expr for expr, _ in self.chave)
+            marcas = ", ".join(["%s"] * len(self.chave))
+            filtros.append(f"({cols}) {'<' if ordem_desc else '>'} ({marcas})")
+            params.extend(apos)
+        return self._sql(filtros, ordem_desc, com_limite=True), params + [limite]
+
+    def pagina(
+        self, limite: int, apos: Optional[tuple] = None, voltar: bool = False
+    ) -> List[Any]:
+        sql, params = self.sql_pagina(limite, apos, voltar)
+        with conexao_leitura() as conn, conn.cursor() as c:
+            executar_preparada(c, sql, params)
+            linhas = [self.tipo._make(r) for r in c]
+        return linhas[::-1] if voltar else linhas
+
+    def iterar(self) -> Iterator[Any]:
+        """Percorre tudo com um cursor nomeado (no servidor), em lotes de itersize."""
+        with conexao_leitura() as conn:
+            with conn.cursor(name=f"petvida_{uuid.uuid4().hex[:12]}") as c:
+                c.itersize = LISTAGEM_CONFIG["itersize"]
+                c.execute(self._sql(self.filtros, self.desc, com_limite=False), self.params)
+                for r in c:
+                    yield self.tipo._make(r)
+
+
+def _executar_e_contar(sql: str, params: Sequence[Any]) -> int:
+    """Um UPDATE/DELETE numa transação própria; devolve as linhas afetadas."""
+    with conexao() as conn:
+        try:
+            with conn.cursor() as c:
+                c.execute(sql, params)
+                afetadas = c.rowcount
+            conn.commit()
+            return afetadas
+        except Exception:
+            conn.rollback()
+            raise
+
+
+def padrao_busca(termo: str) -> str:
+    """'%trecho%' para ILIKE, com os curingas do próprio termo escapados."""
+    escapado = termo.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escapado}%"
+
+
+# Animais cujo nome, ou nome/CPF/telefone do tutor, contém o trecho. UNION em
+# vez de OR entre as tabelas: cada ramo usa os índices de trigramas (0006).
+# Quem usa filtra os excluídos (ATIVOS) ao juntar com animal e dono.
+_ANIMAIS_ENCONTRADOS = """
+    WITH encontrados AS (
+        SELECT id_animal FROM animal WHERE nome ILIKE %(padrao)s
+        UNION
+        SELECT a.id_animal
+        FROM dono d
+        JOIN animal a ON a.id_dono = d.id_dono
+        WHERE d.nome ILIKE %(padrao)s OR d.cpf LIKE %(padrao)s OR d.telefone LIKE %(padrao)s
+    )
+"""
+
+
+# Tutores e animais excluídos (0010) ficam fora de todas as leituras até a
+# purga; `a` e `d` são os apelidos de animal e dono nos SELECTs.
+ATIVOS = "a.excluido_em IS NULL AND d.excluido_em IS NULL"
+
+
+class AnimalInativo(Exception):
+    """Animal inexistente ou excluído (ele ou o tutor): não recebe consulta nem cirurgia."""
+
+
+# FOR SHARE segura animal e tutor até o COMMIT: uma exclusão lógica (UPDATE
+# de excluido_em) feita ao mesmo tempo espera, e o agendamento não fica
+# pendurado num cadastro excluído. Também usado por servicos_async.
+TRAVAR_ATIVOS = f"""
+    SELECT a.id_animal
+    FROM animal a
+    JOIN dono d ON d.id_dono = a.id_dono
+    WHERE a.id_animal = ANY(%s) AND {ATIVOS}
+    FOR SHARE OF a, d
+"""
+
+
+def conferir_ativos(id_animais: Sequence[int], travados: Iterable[tuple]) -> None:
+    """AnimalInativo se algum ID não voltou de TRAVAR_ATIVOS."""
+    faltando = set(id_animais) - {r[0] for r in travados}
+    if faltando:
+        ids = ", ".join(map(str, sorted(faltando)))
+        raise AnimalInativo(f"animal não encontrado ou excluído (ID {ids})")
+
+
+def _exigir_ativos(c: Any, id_animais: Sequence[int]) -> None:
+    c.execute(TRAVAR_ATIVOS, (list(id_animais),))
+    conferir_ativos(id_animais, c)
+
+
+# REPOSITÓRIOS
+class RepositorioUsuario:
+    POR_USERNAME = """
+        SELECT id_usuario, username, tipo, senha_cripto, bloqueado
+        FROM usuario WHERE username = %s
+    """
+    ZERAR_TENTATIVAS = "UPDATE usuario SET tentativas_erradas = 0 WHERE id_usuario = %s"
+    REGISTRAR_FALHA = """
+        UPDATE usuario
+        SET tentativas_erradas = tentativas_erradas + 1,
+            bloqueado = bloqueado OR tentativas_erradas + 1 >= %s
+        WHERE id_usuario = %s
+        RETURNING tentativas_erradas;
+    """
+    ID_DONO = "SELECT id_dono FROM usuario WHERE id_usuario = %s"
+    ALTERAR_SENHA = "UPDATE usuario SET senha_cripto = %s WHERE id_usuario = %s"
+
+    def buscar_por_username(self, username: str) -> Optional[Usuario]:
+        with conexao() as conn, conn.cursor() as c:
+            executar_preparada(c, self.POR_USERNAME, (username,))
+            r = c.fetchone()
+        return Usuario._make(r) if r else None
+
+    def senha_hash(self, id_usuario: int) -> Optional[str]:
+        with conexao() as conn, conn.cursor() as c:
+            c.execute(
+                "SELECT senha_cripto FROM usuario WHERE id_usuario = %s",
+                (id_usuario,),
+            )
+            r = c.fetchone()
+        return r[0] if r else None
+
+    def existe_admin(self) -> bool:
+        with conexao() as conn, conn.cursor() as c:
+            c.execute("SELECT 1 FROM usuario WHERE tipo='admin'")
+            return c.fetchone() is not None
+
+    def criar(
+        self,
+        username: str,
+        senha_hash: str,
+        tipo: str,
+        tutor: Optional[NovoDono] = None,
+        animal: Optional[NovoAnimal] = None,
+    ) -> int:
+        """Grava usuário (e, se vier, tutor e animal) numa única transação curta."""
+        with conexao() as conn:
+            try:
+                with conn.cursor() as c:
+                    c.execute(
+                        """
+                        INSERT INTO usuario (username, senha_cripto, tipo)
+                        VALUES (%s,%s,%s) RETURNING id_usuario;
+                        """,
+                        (username, senha_hash, tipo),
+                    )
+                    id_user = c.fetchone()[0]
+
+                    if tutor:
+                        c.execute(
+                            """
+                            INSERT INTO dono (nome, cpf, email, endereco, telefone)
+                            VALUES (%s,%s,%s,%s,%s) RETURNING id_dono;
+                            """,
+                            tutor,
+                        )
+                        id_dono = c.fetchone()[0]
+
+                        if animal:
+                            c.execute(
+                                """
+                                INSERT INTO animal (nome, especie, raca, idade, id_dono)
+                                VALUES (%s,%s,%s,%s,%s)
+                                """,
+                                (*animal, id_dono),
+                            )
+
+                        c.execute(
+                            "UPDATE usuario SET id_dono = %s WHERE id_usuario = %s",
+                            (id_dono, id_user),
+                        )
+                conn.commit()
+                return id_user
+            except Exception:
+                conn.rollback()
+                raise
+
+    def zerar_tentativas(self, id_usuario: int) -> None:
+        with conexao() as conn:
+            with conn.cursor() as c:
+                c.execute(self.ZERAR_TENTATIVAS, (id_usuario,))
+            conn.commit()
+
+    def registrar_falha(self, id_usuario: int, limite: int = 3) -> int:
+        """Soma uma tentativa errada e bloqueia ao atingir `limite`."""
+        with conexao() as conn:
+            with conn.cursor() as c:
+                c.execute(self.REGISTRAR_FALHA, (limite, id_usuario))
+                tentativas = c.fetchone()[0]
+            conn.commit()
+        return tentativas
+
+    def alterar_senha(self, id_usuario: int, senha_hash: str) -> None:
+        with conexao() as conn:
+            try:
+                with conn.cursor() as c:
+                    c.execute(self.ALTERAR_SENHA, (senha_hash, id_usuario))
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+    def id_dono(self, id_usuario: int) -> Optional[int]:
+        with conexao() as conn, conn.cursor() as c:
+            executar_preparada(c, self.ID_DONO, (id_usuario,))
+            r = c.fetchone()
+        return r[0] if r else None
+
+
+class RepositorioDono:
+    _SELECT = "SELECT id_dono, nome, cpf, email, endereco, telefone, observacao FROM dono"
+
+    def listagem(self) -> Listagem:
+        return Listagem(
+            "SELECT id_dono, nome, cpf, email, telefone FROM dono",
+            [("id_dono", "id_dono")],
+            False,
+            DonoResumo,
+            ["excluido_em IS NULL"],
+        )
+
+    def buscar(self, termo: str, limite: int) -> List[DonoResumo]:
+        """Tutores cujo nome, CPF ou telefone contém `termo`, mais parecidos primeiro."""
+        with conexao() as conn, conn.cursor() as c:
+            c.execute(
+                """
+                SELECT id_dono, nome, cpf, email, telefone
+                FROM dono
+                WHERE (nome ILIKE %(padrao)s OR cpf LIKE %(padrao)s OR telefone LIKE %(padrao)s)
+                  AND excluido_em IS NULL
+                ORDER BY greatest(similarity(nome, %(termo)s),
+                                  similarity(cpf, %(termo)s),
+                                  similarity(telefone, %(termo)s)) DESC, nome
+                LIMIT %(limite)s
+                """,
+                {"padrao": padrao_busca(termo), "termo": termo, "limite": limite},
+            )
+            return [DonoResumo._make(r) for r in c]
+
+    def obter(self, id_dono: int) -> Optional[Dono]:
+        with conexao() as conn, conn.cursor() as c:
+            c.execute(self._SELECT + " WHERE id_dono = %s AND excluido_em IS NULL", (id_dono,))
+            r = c.fetchone()
+        return Dono._make(r) if r else None
+
+    def buscar_por_cpf(self, cpf: str) -> Optional[Dono]:
+        with conexao() as conn, conn.cursor() as c:
+            c.execute(self._SELECT + " WHERE cpf = %s AND excluido_em IS NULL", (cpf,))
+            r = c.fetchone()
+        return Dono._make(r) if r else None
+
+    def do_usuario(self, id_usuario: int) -> Optional[Dono]:
+        with conexao() as conn, conn.cursor() as c:
+            c.execute(
+                """
+                SELECT d.id_dono, d.nome, d.cpf, d.email, d.endereco, d.telefone, d.observacao
+                FROM usuario u
+                JOIN dono d ON d.id_dono = u.id_dono
+                WHERE u.id_usuario = %s AND d.excluido_em IS NULL;
+                """,
+                (id_usuario,),
+            )
+            r = c.fetchone()
+        return Dono._make(r) if r else None
+
+    def animais(self, id_dono: int) -> List[Animal]:
+        with conexao() as conn, conn.cursor() as c:
+            c.execute(
+                """
+                SELECT id_animal, nome, especie, raca, idade
+                FROM animal
+                WHERE id_dono = %s AND excluido_em IS NULL
+                ORDER BY id_animal;
+                """,
+                (id_dono,),
+            )
+            return [Animal._make(r) for r in c]
+
+    # total_animais é mantido pelos triggers de animal (migração 0004)
+    QTD_ANIMAIS_POR_TUTOR = """
+        SELECT id_dono, nome, total_animais
+        FROM dono
+        WHERE excluido_em IS NULL
+        ORDER BY total_animais DESC, nome;
+    """
+
+    def qtd_animais_por_tutor(self) -> List[AnimaisPorTutor]:
+        with conexao_leitura() as conn, conn.cursor() as c:
+            c.execute(self.QTD_ANIMAIS_POR_TUTOR)
+            return [AnimaisPorTutor._make(r) for r in c]
+
+    def corrigir_contadores(self) -> List[Tuple[int, str, int, int]]:
+        """Recalcula total_animais e corrige os divergentes.
+
+        Devolve (id_dono, nome, valor gravado, valor real) de cada correção.
+        Bloqueia escritas em animal só durante a verificação.
+        """
+        with conexao() as conn:
+            try:
+                with conn.cursor() as c:
+                    c.execute("LOCK TABLE animal IN SHARE MODE")
+                    c.execute(
+                        """
+                        WITH divergentes AS (
+                            SELECT d.id_dono, d.nome, d.total_animais AS gravado,
+                                   count(a.id_animal)::int AS contado
+                            FROM dono d
+                            LEFT JOIN animal a
+                                   ON a.id_dono = d.id_dono AND a.excluido_em IS NULL
+                            GROUP BY d.id_dono
+                            HAVING d.total_animais <> count(a.id_animal)
+                        ), corrigidos AS (
+                            UPDATE dono d
+                            SET total_animais = v.contado
+                            FROM divergentes v
+                            WHERE d.id_dono = v.id_dono
+                        )
+                        SELECT id_dono, nome, gravado, contado FROM divergentes ORDER BY id_dono;
+                        """
+                    )
+                    corrigidos = c.fetchall()
+                conn.commit()
+                return corrigidos
+            except Exception:
+                conn.rollback()
+                raise
+
+    def atualizar(self, dono: Dono) -> bool:
+        with conexao() as conn:
+            try:
+                with conn.cursor() as c:
+                    c.execute(
+                        """
+                        UPDATE dono
+                        SET nome = %s, email = %s, endereco = %s, telefone = %s, observacao = %s
+                        WHERE id_dono = %s AND excluido_em IS NULL
+                        """,
+                        (dono.nome, dono.email, dono.endereco, dono.telefone,
+                         dono.observacao, dono.id_dono),
+                    )
+                    alterou = c.rowcount > 0
+                conn.commit()
+                return alterou
+            except Exception:
+                conn.rollback()
+                raise
+
+    # tutor com login de cliente não é excluído (usuario.id_dono aponta para ele)
+    EXCLUIR = """
+        UPDATE dono SET excluido_em = now()
+        WHERE id_dono = %s
+          AND excluido_em IS NULL
+          AND NOT EXISTS (SELECT 1 FROM usuario u WHERE u.id_dono = dono.id_dono)
+    """
+    EXCLUIDOS = """
+        SELECT id_dono, nome, cpf, excluido_em
+        FROM dono
+        WHERE excluido_em IS NOT NULL AND NOT em_purga
+        ORDER BY excluido_em DESC
+    """
+    RESTAURAR = """
+        UPDATE dono SET excluido_em = NULL
+        WHERE id_dono = %s AND excluido_em IS NOT NULL AND NOT em_purga
+    """
+
+    def excluir(self, id_dono: int) -> bool:
+        """Marca o tutor como excluído; animais e consultas somem junto das leituras.
+
+        A remoção de verdade é da purga (purga.py). Devolve False se o tutor
+        não existe, já foi excluído ou tem login de cliente.
+        """
+        return _executar_e_contar(self.EXCLUIR, (id_dono,)) > 0
+
+    def excluidos(self) -> List[Excluido]:
+        """Tutores excluídos que a purga ainda não começou a apagar."""
+        with conexao() as conn, conn.cursor() as c:
+            c.execute(self.EXCLUIDOS)
+            return [Excluido._make(r) for r in c]
+
+    def restaurar(self, id_dono: int) -> bool:
+        """Desfaz a exclusão, se a purga ainda não começou.
+
+        UniqueViolation se o CPF foi cadastrado de novo depois da exclusão
+        (o índice único de 0012 só vale para tutores não excluídos).
+        """
+        return _executar_e_contar(self.RESTAURAR, (id_dono,)) > 0
+
+
+class RepositorioAnimal:
+    def listagem(self) -> Listagem:
+        return Listagem(
+            """
+            SELECT a.id_animal, a.nome, a.especie, a.raca, a.idade, d.nome
+            FROM animal a
+            JOIN dono d ON a.id_dono = d.id_dono
+            """,
+            [("a.id_animal", "id_animal")],
+            False,
+            AnimalComTutor,
+            [ATIVOS],
+        )
+
+    def buscar(self, termo: str, limite: int) -> List[AnimalComTutor]:
+        """Animais pelo nome do pet ou nome/CPF/telefone do tutor."""
+        with conexao() as conn, conn.cursor() as c:
+            c.execute(
+                _ANIMAIS_ENCONTRADOS
+                + f"""
+                SELECT a.id_animal, a.nome, a.especie, a.raca, a.idade, d.nome
+                FROM encontrados
+                JOIN animal a USING (id_animal)
+                JOIN dono d ON d.id_dono = a.id_dono
+                WHERE {ATIVOS}
+                ORDER BY greatest(similarity(a.nome, %(termo)s),
+                                  similarity(d.nome, %(termo)s)) DESC, a.nome
+                LIMIT %(limite)s
+                """,
+                {"padrao": padrao_busca(termo), "termo": termo, "limite": limite},
+            )
+            return [AnimalComTutor._make(r) for r in c]
+
+    def obter(self, id_animal: int) -> Optional[Animal]:
+        with conexao() as conn, conn.cursor() as c:
+            c.execute(
+                f"""
+                SELECT a.id_animal, a.nome, a.especie, a.raca, a.idade
+                FROM animal a
+                JOIN dono d ON d.id_dono = a.id_dono
+                WHERE a.id_animal = %s AND {ATIVOS}
+                """,
+                (id_animal,),
+            )
+            r = c.fetchone()
+        return Animal._make(r) if r else None
+
+    def criar(self, animal: NovoAnimal, id_dono: int) -> int:
+        with conexao() as conn:
+            try:
+                with conn.cursor() as c:
+                    c.execute(
+                        """
+                        INSERT INTO animal (nome, especie, raca, idade, id_dono)
+                        VALUES (%s,%s,%s,%s,%s) RETURNING id_animal
+                        """,
+                        (*animal, id_dono),
+                    )
+                    id_animal = c.fetchone()[0]
+                conn.commit()
+                return id_animal
+            except Exception:
+                conn.rollback()
+                raise
+
+    def atualizar(self, animal: Animal) -> bool:
+        with conexao() as conn:
+            try:
+                with conn.cursor() as c:
+                    c.execute(
+                        """
+                        UPDATE animal
+                        SET nome = %s, especie = %s, raca = %s, idade = %s
+                        WHERE id_animal = %s AND excluido_em IS NULL
+                        """,
+                        (animal.nome, animal.especie, animal.raca, animal.idade,
+                         animal.id_animal),
+                    )
+                    alterou = c.rowcount > 0
+                conn.commit()
+                return alterou
+            except Exception:
+                conn.rollback()
+                raise
+
+    EXCLUIR = """
+        UPDATE animal SET excluido_em = now()
+        WHERE id_animal = %s AND excluido_em IS NULL
+    """
+    # animais de tutor excluído voltam com o tutor, não sozinhos
+    EXCLUIDOS = """
+        SELECT a.id_animal, a.nome, d.nome, a.excluido_em
+        FROM animal a
+        JOIN dono d ON d.id_dono = a.id_dono
+        WHERE a.excluido_em IS NOT NULL AND NOT a.em_purga AND d.excluido_em IS NULL
+        ORDER BY a.excluido_em DESC
+    """
+    RESTAURAR = """
+        UPDATE animal SET excluido_em = NULL
+        WHERE id_animal = %s AND excluido_em IS NOT NULL AND NOT em_purga
+    """
+
+    def excluir(self, id_animal: int) -> bool:
+        """Marca o animal como excluído; a purga (purga.py) apaga depois."""
+        return _executar_e_contar(self.EXCLUIR, (id_animal,)) > 0
+
+    def excluidos(self) -> List[Excluido]:
+        with conexao() as conn, conn.cursor() as c:
+            c.execute(self.EXCLUIDOS)
+            return [Excluido._make(r) for r in c]
+
+    def restaurar(self, id_animal: int) -> bool:
+        """Desfaz a exclusão, se a purga ainda não começou."""
+        return _executar_e_contar(self.RESTAURAR, (id_animal,)) > 0
+
+
+class RepositorioConsulta:
+    _SELECT = """
+        SELECT c.id_consulta, c.data, c.horario, c.status,
+               a.nome, d.nome
+        FROM consulta c
+        JOIN animal a ON a.id_animal = c.id_animal
+        JOIN dono d   ON d.id_dono   = a.id_dono
+    """
+    # id_consulta desempata consultas no mesmo dia e horário
+    _CHAVE = [("c.data", "data"), ("c.horario", "horario"), ("c.id_consulta", "id_consulta")]
+    INSERIR = """
+        INSERT INTO consulta (data, horario, motivo, diagnostico, status,
+                              prioridade, id_animal, id_vet, duracao_minutos)
+        VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s) RETURNING id_consulta
+    """
+    # Horários do expediente (AGENDA_CONFIG) sem consulta sobreposta do vet.
+    # Cada NOT EXISTS é uma busca por (id_vet, data) em idx_consulta_vet_data.
+    HORARIOS_LIVRES = """
+        WITH vets AS (
+            SELECT id_usuario AS id_vet, username
+            FROM usuario
+            WHERE tipo = 'veterinario'
+              AND (%(id_vet)s::int IS NULL OR id_usuario = %(id_vet)s)
+        ), horarios AS (
+            SELECT h::date AS data, h::time AS horario
+            FROM generate_series(%(de)s::date::timestamp, %(ate)s::date::timestamp,
+                                 INTERVAL '1 day') AS d,
+                 generate_series(d + %(inicio)s::time,
+                                 d + %(fim)s::time - %(duracao)s::interval,
+                                 %(duracao)s::interval) AS h
+            WHERE extract(isodow FROM d) = ANY(%(dias)s)
+              AND h >= localtimestamp
+        )
+        SELECT v.id_vet, v.username, h.data, h.horario
+        FROM vets v
+        CROSS JOIN horarios h
+        WHERE NOT EXISTS (
+            SELECT 1 FROM consulta c
+            WHERE c.id_vet = v.id_vet
+              AND c.data = h.data
+              AND c.status <> 'cancelada'
+              AND c.horario < h.horario + %(duracao)s::interval
+              AND h.horario < c.horario + make_interval(mins => c.duracao_minutos)
+        )
+        ORDER BY h.data, v.id_vet, h.horario
+    """
+    CANCELAR_DO_TUTOR = """
+        UPDATE consulta
+        SET status = 'cancelada'
+        WHERE id_consulta = %s
+          AND status = 'agendada'
+          AND id_animal IN (
+               SELECT a.id_animal
+               FROM animal a
+               JOIN dono d ON d.id_dono = a.id_dono
+               WHERE a.id_dono = %s AND a.excluido_em IS NULL AND d.excluido_em IS NULL
+          );
+    """
+
+    def listagem(
+        self,
+        somente_vet_id: Optional[int] = None,
+        data_ini: Optional[str] = None,
+        data_fim: Optional[str] = None,
+    ) -> Listagem:
+        filtros: List[str] = []
+        params: List[Any] = []
+        if data_ini is not None and data_fim is not None:
+            filtros.append("c.data BETWEEN %s AND %s")
+            params += [data_ini, data_fim]
+        if somente_vet_id:
+            filtros.append("c.id_vet = %s")
+            params.append(somente_vet_id)
+        filtros.append(ATIVOS)
+        return Listagem(self._SELECT, self._CHAVE, True, ConsultaResumo, filtros, params)
+
+    # consultas ativas e arquivadas (0008) com as colunas do histórico do tutor
+    _COM_ARQUIVADAS = """
+        (SELECT id_consulta, data, horario, status, prioridade, id_animal FROM consulta
+         UNION ALL
+         SELECT id_consulta, data, horario, status, prioridade, id_animal FROM consulta_arquivo)
+    """
+
+    def listagem_do_tutor(self, id_dono: int, incluir_arquivadas: bool = False) -> Listagem:
+        origem = self._COM_ARQUIVADAS if incluir_arquivadas else "consulta"
+        return Listagem(
+            f"""
+            SELECT c.id_consulta, c.data, c.horario, c.status, c.prioridade, a.nome
+            FROM {origem} c
+            JOIN animal a ON a.id_animal = c.id_animal
+            """,
+            self._CHAVE,
+            True,
+            ConsultaCliente,
+            ["a.id_dono = %s", "a.excluido_em IS NULL"],
+            [id_dono],
+        )
+
+    def buscar(self, termo: str, limite: int) -> List[ConsultaResumo]:
+        """Consultas mais recentes dos animais encontrados pelo termo."""
+        with conexao() as conn, conn.cursor() as c:
+            c.execute(
+                _ANIMAIS_ENCONTRADOS
+                + f"""
+                SELECT c.id_consulta, c.data, c.horario, c.status, a.nome, d.nome
+                FROM encontrados
+                JOIN consulta c USING (id_animal)
+                JOIN animal a ON a.id_animal = c.id_animal
+                JOIN dono d   ON d.id_dono   = a.id_dono
+                WHERE {ATIVOS}
+                ORDER BY c.data DESC, c.horario DESC, c.id_consulta DESC
+                LIMIT %(limite)s
+                """,
+                {"padrao": padrao_busca(termo), "limite": limite},
+            )
+            return [ConsultaResumo._make(r) for r in c]
+
+    def horarios_livres(
+        self,
+        de: datetime.date,
+        ate: datetime.date,
+        id_vet: Optional[int] = None,
+    ) -> List[HorarioLivre]:
+        """Horários livres de cada veterinário (ou só de `id_vet`) no período."""
+        with conexao() as conn, conn.cursor() as c:
+            c.execute(self.HORARIOS_LIVRES, self.params_horarios_livres(de, ate, id_vet))
+            return [HorarioLivre._make(r) for r in c]
+
+    def params_horarios_livres(
+        self, de: datetime.date, ate: datetime.date, id_vet: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Parâmetros de HORARIOS_LIVRES (usado também pela camada assíncrona)."""
+        return {
+            "de": de,
+            "ate": ate,
+            "id_vet": id_vet,
+            "inicio": AGENDA_CONFIG["inicio"],
+            "fim": AGENDA_CONFIG["fim"],
+            "duracao": f"{AGENDA_CONFIG['duracao_minutos']} minutes",
+            "dias": list(AGENDA_CONFIG["dias_semana"]),
+        }
+
+    def agendadas_do_tutor(self, id_dono: int) -> List[ConsultaCliente]:
+        with conexao() as conn, conn.cursor() as c:
+            c.execute(
+                """
+                SELECT c.id_consulta, c.data, c.horario, c.status, c.prioridade, a.nome
+                FROM consulta c
+                JOIN animal a ON a.id_animal = c.id_animal
+                WHERE a.id_dono = %s AND a.excluido_em IS NULL AND c.status = 'agendada'
+                ORDER BY c.data, c.horario;
+                """,
+                (id_dono,),
+            )
+            return [ConsultaCliente._make(r) for r in c]
+
+    def avaliacao(self, id_consulta: int) -> Optional[ConsultaAvaliacao]:
+        with conexao() as conn, conn.cursor() as c:
+            c.execute(
+                f"""
+                SELECT c.diagnostico, c.status, c.prioridade
+                FROM consulta c
+                JOIN animal a ON a.id_animal = c.id_animal
+                JOIN dono d   ON d.id_dono   = a.id_dono
+                WHERE c.id_consulta = %s AND {ATIVOS}
+                """,
+                (id_consulta,),
+            )
+            r = c.fetchone()
+        return ConsultaAvaliacao._make(r) if r else None
+
+    def criar(
+        self,
+        id_animal: int,
+        data: str,
+        horario: str,
+        motivo: str,
+        diagnostico: Optional[str] = None,
+        id_vet: Optional[int] = None,
+        status: str = "agendada",
+        prioridade: str = "normal",
+    ) -> int:
+        with conexao() as conn:
+            try:
+                with conn.cursor() as c:
+                    _exigir_ativos(c, [id_animal])
+                    c.execute(
+                        self.INSERIR,
+                        (data, horario, motivo, diagnostico, status, prioridade,
+                         id_animal, id_vet, AGENDA_CONFIG["duracao_minutos"]),
+                    )
+                    id_consulta = c.fetchone()[0]
+                conn.commit()
+                return id_consulta
+            except Exception:
+                conn.rollback()
+                raise
+
+    def criar_em_lote(
+        self,
+        id_animais: Sequence[int],
+        recorrencia: Recorrencia,
+        motivo: str,
+        id_vet: Optional[int] = None,
+        prioridade: str = "normal",
+    ) -> List[int]:
+        """Agenda a recorrência para cada animal num único INSERT; devolve os IDs.
+
+        Tudo ou nada: se uma linha falhar, nenhuma consulta é criada.
+        """
+        recorrencia.validar()
+        duracao = AGENDA_CONFIG["duracao_minutos"]
+        linhas = [
+            (data, horario, motivo, None, "agendada", prioridade, id_animal, id_vet, duracao)
+            for n, id_animal in enumerate(id_animais)
+            for data, horario in recorrencia.horarios(n)
+        ]
+        if not linhas:
+            return []
+        with conexao() as conn:
+            try:
+                with conn.cursor() as c:
+                    _exigir_ativos(c, id_animais)
+                    # até LINHAS_POR_INSERT linhas por comando (o texto do INSERT
+                    # cresce com o lote); tudo na mesma transação
+                    ids = execute_values(
+                        c,
+                        """
+                        INSERT INTO consulta (data, horario, motivo, diagnostico, status,
+                                              prioridade, id_animal, id_vet, duracao_minutos)
+                        VALUES %s RETURNING id_consulta
+                        """,
+                        linhas,
+                        page_size=LINHAS_POR_INSERT,
+                        fetch=True,
+                    )
+                conn.commit()
+                return [r[0] for r in ids]
+            except Exception:
+                conn.rollback()
+                raise
+
+    def avaliar(self, id_consulta: int, avaliacao: ConsultaAvaliacao) -> bool:
+        with conexao() as conn:
+            try:
+                with conn.cursor() as c:
+                    c.execute(
+                        f"""
+                        UPDATE consulta c
+                        SET diagnostico = %s, status = %s, prioridade = %s
+                        FROM animal a
+                        JOIN dono d ON d.id_dono = a.id_dono
+                        WHERE c.id_consulta = %s AND a.id_animal = c.id_animal AND {ATIVOS}
+                        """,
+                        (*avaliacao, id_consulta),
+                    )
+                    alterou = c.rowcount > 0
+                conn.commit()
+                return alterou
+            except Exception:
+                conn.rollback()
+                raise
+
+    def excluir(self, id_consulta: int) -> bool:
+        with conexao() as conn:
+            try:
+                with conn.cursor() as c:
+                    c.execute(
+                        f"""
+                        DELETE FROM consulta c
+                        USING animal a
+                        JOIN dono d ON d.id_dono = a.id_dono
+                        WHERE c.id_consulta = %s AND a.id_animal = c.id_animal AND {ATIVOS}
+                        """,
+                        (id_consulta,),
+                    )
+                    excluiu = c.rowcount > 0
+                conn.commit()
+                return excluiu
+            except Exception:
+                conn.rollback()
+                raise
+
+    def cancelar_do_tutor(self, id_consulta: int, id_dono: int) -> bool:
+        """Cancela só se a consulta está agendada e é de um animal do tutor."""
+        with conexao() as conn:
+            try:
+                with conn.cursor() as c:
+                    c.execute(self.CANCELAR_DO_TUTOR, (id_consulta, id_dono))
+                    cancelou = c.rowcount > 0
+                conn.commit()
+                return cancelou
+            except Exception:
+                conn.rollback()
+                raise
+
+    def cancelar(self, id_consulta: int, somente_vet_id: Optional[int] = None) -> bool:
+        """Cancela se a consulta está agendada (e, com `somente_vet_id`, é desse vet)."""
+        with conexao() as conn:
+            try:
+                with conn.cursor() as c:
+                    c.execute(
+                        f"""
+                        UPDATE consulta c
+                        SET status = 'cancelada'
+                        FROM animal a
+                        JOIN dono d ON d.id_dono = a.id_dono
+                        WHERE c.id_consulta = %s
+                          AND c.status = 'agendada'
+                          AND (%s::int IS NULL OR c.id_vet = %s)
+                          AND a.id_animal = c.id_animal AND {ATIVOS}
+                        """,
+                        (id_consulta, somente_vet_id, somente_vet_id),
+                    )
+                    cancelou = c.rowcount > 0
+                conn.commit()
+                return cancelou
+            except Exception:
+                conn.rollback()
+                raise
+
+
+class RepositorioCirurgia:
+    def criar(
+        self,
+        id_animal: int,
+        data: str,
+        tipo_cirurgia: str,
+        observacoes: Optional[str] = None,
+        status: str = "agendada",
+    ) -> int:
+        with conexao() as conn:
+            try:
+                with conn.cursor() as c:
+                    _exigir_ativos(c, [id_animal])
+                    c.execute(
+                        """
+                        INSERT INTO cirurgia (data, tipo_cirurgia, observacoes,
+                                              status, id_animal)
+                        VALUES (%s,%s,%s,%s,%s) RETURNING id_cirurgia
+                        """,
+                        (data, tipo_cirurgia, observacoes, status, id_animal),
+                    )
+                    id_cirurgia = c.fetchone()[0]
+                conn.commit()
+                return id_cirurgia
+            except Exception:
+                conn.rollback()
+                raise
+
+
+def apagar_tabelas() -> None:
+    with conexao() as conn:
+        try:
+            with conn.cursor() as c:
+                c.execute(
+                    """
+                    DROP TABLE IF EXISTS cirurgia_arquivo CASCADE;
+                    DROP TABLE IF EXISTS consulta_arquivo CASCADE;
+                    DROP TABLE IF EXISTS cirurgia CASCADE;
+                    DROP TABLE IF EXISTS consulta CASCADE;
+                    DROP TABLE IF EXISTS animal   CASCADE;
+                    DROP TABLE IF EXISTS usuario  CASCADE;
+                    DROP TABLE IF EXISTS dono     CASCADE;
+                    DROP TABLE IF EXISTS schema_version;
+                    DROP FUNCTION IF EXISTS atualizar_total_animais();
+                    DROP FUNCTION IF EXISTS criar_particoes_mensais(TEXT, DATE, DATE);
+                    """
+                )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+
+usuarios = RepositorioUsuario()
+donos = RepositorioDono()
+animais = RepositorioAnimal()
+consultas = RepositorioConsulta()
+cirurgias = RepositorioCirurgia()
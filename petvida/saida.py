@@ -0,0 +1,124 @@
+"""Tabelas de saída das listagens de services.py.
+
+As linhas são formatadas em blocos de SAIDA_CONFIG["linhas_por_bloco"] e
+cada bloco vai para o terminal numa única escrita, em vez de um print()
+por linha. As larguras das colunas saem do título e do primeiro bloco
+(limitadas por Coluna.largura_max) e ficam fixas até o fim da listagem,
+inclusive entre páginas; textos maiores são cortados.
+
+Com a saída redirecionada (arquivo, pipe) não há alinhamento: cada linha
+vira os valores separados por TAB, prontos para cut/awk/planilha.
+"""
+import shlex
+import subprocess
+import sys
+from contextlib import contextmanager
+from itertools import islice
+from typing import IO, Any, Iterable, Iterator, List, NamedTuple, Optional, Sequence
+
+from config import SAIDA_CONFIG
+
+
+class Coluna(NamedTuple):
+    titulo: str
+    largura_max: int = 30
+    direita: bool = False   # números: alinhados à direita e nunca cortados
+
+
+def _texto(valor: Any) -> str:
+    return "-" if valor is None else str(valor)
+
+
+class Tabela:
+    __slots__ = ("colunas", "_formato", "_separador")
+
+    def __init__(self, colunas: Sequence[Coluna]) -> None:
+        self.colunas = colunas
+        self._formato: Optional[str] = None
+        self._separador = ""
+
+    def _fixar_larguras(self, bloco: List[Sequence[str]]) -> None:
+        partes = []
+        larguras = []
+        for i, col in enumerate(self.colunas):
+            maior = max((len(linha[i]) for linha in bloco), default=0)
+            largura = min(max(len(col.titulo), maior), col.largura_max)
+            larguras.append(largura)
+            # texto: ".N" corta o que passar da largura; número nunca é cortado
+            if col.direita:
+                partes.append(f"{{:>{largura}}}")
+            else:
+                partes.append(f"{{:<{largura}.{largura}}}")
+        self._formato = " | ".join(partes)
+        self._separador = "-+-".join("-" * n for n in larguras)
+
+    def escrever(
+        self,
+        linhas: Iterable[Sequence[Any]],
+        saida: Optional[IO[str]] = None,
+        limite: Optional[int] = None,
+        formatar: Optional[bool] = None,
+    ) -> int:
+        """Escreve as linhas (com o cabeçalho) e devolve quantas foram escritas.
+
+        `limite` corta a listagem (padrão: SAIDA_CONFIG["limite"], 0 = sem
+        limite); `formatar` força ou desliga o alinhamento (padrão: só em TTY).
+        """
+        saida = saida or sys.stdout
+        if limite is None:
+            limite = SAIDA_CONFIG["limite"]
+        if formatar is None:
+            formatar = saida.isatty()
+        tamanho_bloco = SAIDA_CONFIG["linhas_por_bloco"]
+
+        restantes = iter(linhas)
+        if limite:
+            restantes = islice(restantes, limite)
+
+        total = 0
+        while True:
+            bloco = [tuple(map(_texto, linha)) for linha in islice(restantes, tamanho_bloco)]
+            if not bloco:
+                break
+            if formatar:
+                if self._formato is None:
+                    self._fixar_larguras(bloco)
+                formato = self._formato.format
+                texto = "\n".join([formato(*linha) for linha in bloco])
+                if total == 0:
+                    titulos = formato(*(col.titulo for col in self.colunas))
+                    texto = f"{titulos}\n{self._separador}\n{texto}"
+            else:
+                texto = "\n".join(["\t".join(linha) for linha in bloco])
+                if total == 0:
+                    texto = "\t".join(col.titulo for col in self.colunas) + "\n" + texto
+            saida.write(texto + "\n")
+            total += len(bloco)
+        saida.flush()
+        return total
+
+
+@contextmanager
+def paginador() -> Iterator[IO[str]]:
+    """Saída para listagens longas: o pager configurado, se houver e for TTY.
+
+    Sem pager (ou com a saída redirecionada) é o próprio sys.stdout.
+    """
+    comando = SAIDA_CONFIG["pager"]
+    if not comando or not sys.stdout.isatty():
+        yield sys.stdout
+        return
+
+    processo = subprocess.Popen(
+        shlex.split(comando), stdin=subprocess.PIPE, text=True, encoding="utf-8"
+    )
+    try:
+        yield processo.stdin
+    except BrokenPipeError:
+        pass  # o usuário saiu do pager antes do fim
+    finally:
+        try:
+            processo.stdin.close()
+        except BrokenPipeError:
+            pass
+        processo.wait()
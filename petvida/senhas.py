@@ -0,0 +1,73 @@
+"""Hash e verificação de senhas com bcrypt, fora da thread que chama.
+
+O bcrypt é lento de propósito (~250 ms no custo 12). As operações rodam
+num pool limitado de threads (o bcrypt libera o GIL durante o cálculo),
+então o event loop da camada assíncrona não trava e um pico de logins
+usa no máximo SENHA_CONFIG["threads"] núcleos.
+"""
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from config import SENHA_CONFIG
+
+# bcrypt (pip install bcrypt) é importado só no primeiro hash/verificação:
+# o menu aparece sem esperar pela extensão nativa.
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_trava = threading.Lock()
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_trava:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=SENHA_CONFIG["threads"], thread_name_prefix="bcrypt"
+                )
+    return _executor
+
+
+def gerar_hash_senha(senha_clara: str, custo: Optional[int] = None) -> str:
+    import bcrypt
+
+    salt = bcrypt.gensalt(custo or SENHA_CONFIG["custo_bcrypt"])
+    return bcrypt.hashpw(senha_clara.encode("utf-8"), salt).decode("utf-8")
+
+
+def verificar_senha(senha_digitada: str, senha_hash: str) -> bool:
+    import bcrypt
+
+    try:
+        return bcrypt.checkpw(senha_digitada.encode("utf-8"), senha_hash.encode("utf-8"))
+    except Exception:
+        return False
+
+
+def custo_do_hash(senha_hash: str) -> Optional[int]:
+    """Custo gravado no hash ("$2b$12$..." -> 12)."""
+    partes = senha_hash.split("$")
+    if len(partes) < 4 or not partes[2].isdigit():
+        return None
+    return int(partes[2])
+
+
+def precisa_rehash(senha_hash: str) -> bool:
+    return custo_do_hash(senha_hash) != SENHA_CONFIG["custo_bcrypt"]
+
+
+def em_segundo_plano(funcao: Callable[..., Any], *args: Any) -> "Future[Any]":
+    """Agenda no pool do bcrypt; quem chama segue e pega .result() quando precisar."""
+    return _pool().submit(funcao, *args)
+
+
+async def gerar_hash_async(senha_clara: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_pool(), gerar_hash_senha, senha_clara)
+
+
+async def verificar_async(senha_digitada: str, senha_hash: str) -> bool:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_pool(), verificar_senha, senha_digitada, senha_hash)
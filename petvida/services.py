@@ -1,125 +1,33 @@
-from typing import Optional, Dict, Any
-
-import psycopg2
-from psycopg2.extensions import connection as PgConnection
-
-from config import DB_CONFIG, gerar_hash_senha, verificar_senha
+import datetime
+import sys
+from itertools import groupby
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from psycopg2 import errors as pg_errors
+
+import repositorios as repo
+from config import LISTAGEM_CONFIG, SAIDA_CONFIG
+from repositorios import (
+    ConsultaAvaliacao,
+    Excluido,
+    Listagem,
+    NovoAnimal,
+    NovoDono,
+    Recorrencia,
+)
+from saida import Coluna, Tabela, paginador
+from senhas import em_segundo_plano, gerar_hash_senha, precisa_rehash, verificar_senha
+from sessao import ContextoSessao, contexto
 from utils import (
+    cpf_valido,
+    telefone_valido,
     ler_numero,
     ler_letras,
     ler_senha_mascarada,
     senha_forte,
 )
 
-def criar_conexao() -> Optional[PgConnection]:
-    try:
-        conn = psycopg2.connect(**DB_CONFIG)
-        conn.autocommit = False
-        return conn
-    except Exception as e:
-        print("Erro ao conectar ao banco:", e)
-        return None
-
-
-def criar_tabelas(conn: PgConnection) -> None:
-    try:
-        with conn.cursor() as c:
-
-            c.execute("SET search_path TO petvida;")
-
-            c.execute("""
-            CREATE TABLE IF NOT EXISTS dono (
-                id_dono   SERIAL PRIMARY KEY,
-                nome      VARCHAR(120) NOT NULL,
-                cpf       VARCHAR(20)  NOT NULL UNIQUE,
-                email     VARCHAR(120),
-                endereco  VARCHAR(200) NOT NULL,
-                telefone  VARCHAR(30)  NOT NULL,
-                observacao TEXT,
-                criado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-
-            CREATE TABLE IF NOT EXISTS usuario (
-                id_usuario         SERIAL PRIMARY KEY,
-                username           VARCHAR(50) UNIQUE NOT NULL,
-                senha_cripto       VARCHAR(255) NOT NULL,
-                tipo               VARCHAR(20)  NOT NULL,
-                id_dono            INT REFERENCES dono(id_dono),
-                tentativas_erradas INT DEFAULT 0,
-                bloqueado          BOOLEAN DEFAULT FALSE,
-                criado_em          TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-
-            CREATE TABLE IF NOT EXISTS animal (
-                id_animal SERIAL PRIMARY KEY,
-                nome      VARCHAR(120) NOT NULL,
-                especie   VARCHAR(60)  NOT NULL,
-                raca      VARCHAR(80)  NOT NULL,
-                idade     INT          NOT NULL,
-                id_dono   INT          NOT NULL REFERENCES dono(id_dono) ON DELETE CASCADE,
-                criado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-
-            CREATE TABLE IF NOT EXISTS consulta (
-                id_consulta  SERIAL PRIMARY KEY,
-                data         DATE         NOT NULL,
-                horario      TIME         NOT NULL,
-                motivo       VARCHAR(200) NOT NULL,
-                diagnostico  VARCHAR(400),
-                status       VARCHAR(20)  DEFAULT 'agendada',
-                prioridade   VARCHAR(20)  DEFAULT 'normal',
-                id_animal    INT          NOT NULL REFERENCES animal(id_animal) ON DELETE CASCADE,
-                id_vet       INT REFERENCES usuario(id_usuario),
-                criado_em    TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-
-            CREATE TABLE IF NOT EXISTS cirurgia (
-                id_cirurgia   SERIAL PRIMARY KEY,
-                data          DATE         NOT NULL,
-                tipo_cirurgia VARCHAR(120) NOT NULL,
-                observacoes   VARCHAR(500),
-                status        VARCHAR(20) DEFAULT 'agendada',
-                id_animal     INT NOT NULL REFERENCES animal(id_animal) ON DELETE CASCADE,
-                criado_em     TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-            """)
-
-            c.execute("""
-            ALTER TABLE consulta 
-                ADD COLUMN IF NOT EXISTS prioridade VARCHAR(20) DEFAULT 'normal';
-
-            ALTER TABLE dono 
-                ADD COLUMN IF NOT EXISTS observacao TEXT;
-
-            ALTER TABLE usuario 
-                ADD COLUMN IF NOT EXISTS tentativas_erradas INT DEFAULT 0;
-
-            ALTER TABLE usuario 
-                ADD COLUMN IF NOT EXISTS bloqueado BOOLEAN DEFAULT FALSE;
-            """)
-
-            c.execute("""
-            CREATE INDEX IF NOT EXISTS idx_dono_cpf ON dono (cpf);
-            CREATE INDEX IF NOT EXISTS idx_consulta_data ON consulta (data);
-            CREATE INDEX IF NOT EXISTS idx_animal_dono ON animal (id_dono);
-            CREATE INDEX IF NOT EXISTS idx_usuario_username ON usuario (username);
-            """)
-
-        conn.commit()
-        print("✅ Tabelas criadas/validadas com sucesso no schema petvida.")
-
-    except Exception as e:
-        conn.rollback()
-        print("Erro ao criar/alterar tabelas:", e)
-
-def limpar_tabelas(conn: PgConnection) -> None:
-    sql_drop = """
-    DROP TABLE IF EXISTS cirurgia CASCADE;
-    DROP TABLE IF EXISTS consulta CASCADE;
-    DROP TABLE IF EXISTS animal   CASCADE;
-    DROP TABLE IF EXISTS usuario  CASCADE;
-    DROP TABLE IF EXISTS dono     CASCADE;
-    """
+def limpar_tabelas() -> None:
     conf = input(
         "ATENÇÃO: isso vai APAGAR TODAS as tabelas e dados! Confirmar? (s/n): "
     ).lower()
@@ -128,61 +36,83 @@ def limpar_tabelas(conn: PgConnection) -> None:
         return
 
     try:
-        with conn.cursor() as c:
-            c.execute(sql_drop)
-        conn.commit()
+        repo.apagar_tabelas()
         print("Todas as tabelas principais foram apagadas com sucesso.")
     except Exception as e:
-        conn.rollback()
         print("Erro ao limpar tabelas:", e)
 
 
-def garantir_admin(conn: PgConnection) -> None:
+def garantir_admin() -> None:
     try:
-        with conn.cursor() as c:
-            c.execute("SELECT 1 FROM usuario WHERE tipo='admin'")
-            if c.fetchone():
-                return  # já existe admin
-
-        print("\n⚠ PRIMEIRA EXECUÇÃO ⚠")
-        print("Nenhum administrador encontrado.")
-        print("Crie agora a senha do ADMIN.")
+        if repo.usuarios.existe_admin():
+            return  # já existe admin
+    except Exception as e:
+        print("Erro ao verificar o administrador:", e)
+        return
 
-        while True:
-            senha = ler_senha_mascarada("Nova senha do admin: ")
+    print("\n⚠ PRIMEIRA EXECUÇÃO ⚠")
+    print("Nenhum administrador encontrado.")
+    print("Crie agora a senha do ADMIN.")
 
-            if not senha_forte(senha):
-                print("Senha fraca. Use pelo menos 8 caracteres, com letras e números.")
-                continue
+    while True:
+        senha = ler_senha_mascarada("Nova senha do admin: ")
 
-            confirmar = ler_senha_mascarada("Confirme a senha: ")
-            if senha != confirmar:
-                print("As senhas não conferem. Tente novamente.")
-                continue
+        if not senha_forte(senha):
+            print("Senha fraca. Use pelo menos 8 caracteres, com letras e números.")
+            continue
 
-            break
+        confirmar = ler_senha_mascarada("Confirme a senha: ")
+        if senha != confirmar:
+            print("As senhas não conferem. Tente novamente.")
+            continue
 
-        senha_hash = gerar_hash_senha(senha)
+        break
 
-        with conn.cursor() as c:
-            c.execute(
-                """
-                INSERT INTO usuario (username, senha_cripto, tipo)
-                VALUES (%s, %s, %s)
-                """,
-                ("admin", senha_hash, "admin"),
-            )
-        conn.commit()
+    senha_hash = gerar_hash_senha(senha)
 
+    try:
+        repo.usuarios.criar("admin", senha_hash, "admin")
         print("\n✅ ADMIN CRIADO COM SUCESSO")
         print("Usuário: admin")
         print("Senha: a que você acabou de definir")
     except Exception as e:
-        conn.rollback()
         print("Erro ao criar admin:", e)
 
 # CADASTROS
-def cadastrar_usuario(conn: PgConnection) -> None:
+def _ler_dados_tutor() -> NovoDono:
+    nome = ler_letras("Nome completo: ")
+
+    cpf = ler_numero("CPF (11 dígitos, só números): ")
+    while not cpf_valido(cpf):
+        print("CPF precisa ter 11 dígitos.")
+        cpf = ler_numero("CPF (11 dígitos, só números): ")
+
+    email = input("E-mail (pode deixar vazio): ").strip() or None
+    end = input("Endereço: ").strip()
+
+    tel = ler_numero("Telefone (só números): ")
+    while not telefone_valido(tel):
+        print("Telefone muito curto, informe com DDD se possível.")
+        tel = ler_numero("Telefone (só números): ")
+
+    return NovoDono(nome, cpf, email, end, tel)
+
+
+def _ler_dados_animal() -> NovoAnimal:
+    nm = ler_letras("Nome do animal: ")
+    es = ler_letras("Espécie: ")
+    rc = ler_letras("Raça: ")
+
+    idade_str = ler_numero("Idade (em anos): ")
+    idade = int(idade_str)
+    while idade < 0 or idade > 40:
+        print("Idade estranha... informe uma idade entre 0 e 40 anos.")
+        idade = int(ler_numero("Idade (em anos): "))
+
+    return NovoAnimal(nm, es, rc, idade)
+
+
+def cadastrar_usuario() -> None:
     print("\n=== Cadastro de usuário (ADMIN) ===")
 
     # login
@@ -209,80 +139,26 @@ def cadastrar_usuario(conn: PgConnection) -> None:
             continue
         break
 
-    senha_hash = gerar_hash_senha(s1)
+    # o hash é calculado enquanto o operador digita os dados do tutor
+    senha_hash = em_segundo_plano(gerar_hash_senha, s1)
+
+    tutor = animal = None
+    if tipo == "cliente":
+        print("\n--- Dados do tutor ---")
+        tutor = _ler_dados_tutor()
+        print("\n--- Dados do animal ---")
+        animal = _ler_dados_animal()
 
     try:
-        with conn.cursor() as c:
-            c.execute(
-                """
-                INSERT INTO usuario (username, senha_cripto, tipo)
-                VALUES (%s,%s,%s) RETURNING id_usuario;
-                """,
-                (user, senha_hash, tipo),
-            )
-            id_user = c.fetchone()[0]
-            id_dono = None
-
-            if tipo == "cliente":
-                print("\n--- Dados do tutor ---")
-                nome = ler_letras("Nome completo: ")
-
-                cpf = ler_numero("CPF (11 dígitos, só números): ")
-                while len(cpf) != 11:
-                    print("CPF precisa ter 11 dígitos.")
-                    cpf = ler_numero("CPF (11 dígitos, só números): ")
-
-                email = input("E-mail (pode deixar vazio): ").strip() or None
-                end = input("Endereço: ").strip()
-
-                tel = ler_numero("Telefone (só números): ")
-                while len(tel) < 8:
-                    print("Telefone muito curto, informe com DDD se possível.")
-                    tel = ler_numero("Telefone (só números): ")
-
-                c.execute(
-                    """
-                    INSERT INTO dono (nome, cpf, email, endereco, telefone)
-                    VALUES (%s,%s,%s,%s,%s) RETURNING id_dono;
-                    """,
-                    (nome, cpf, email, end, tel),
-                )
-                id_dono = c.fetchone()[0]
-
-                print("\n--- Dados do animal ---")
-                nm = ler_letras("Nome do animal: ")
-                es = ler_letras("Espécie: ")
-                rc = ler_letras("Raça: ")
-
-                idade_str = ler_numero("Idade (em anos): ")
-                idade = int(idade_str)
-                while idade < 0 or idade > 40:
-                    print("Idade estranha... informe uma idade entre 0 e 40 anos.")
-                    idade = int(ler_numero("Idade (em anos): "))
-
-                c.execute(
-                    """
-                    INSERT INTO animal (nome, especie, raca, idade, id_dono)
-                    VALUES (%s,%s,%s,%s,%s)
-                    """,
-                    (nm, es, rc, idade, id_dono),
-                )
-
-                c.execute(
-                    "UPDATE usuario SET id_dono = %s WHERE id_usuario = %s",
-                    (id_dono, id_user),
-                )
-
-        conn.commit()
+        repo.usuarios.criar(user, senha_hash.result(), tipo, tutor, animal)
         print("\nUsuário cadastrado com sucesso.")
         if tipo == "cliente":
             print("Tutor e animal também foram cadastrados e vinculados ao usuário.")
     except Exception as e:
-        conn.rollback()
         print("Erro ao cadastrar usuário:", e)
 
 
-def cadastrar_cliente_publico(conn: PgConnection) -> None:
+def cadastrar_cliente_publico() -> None:
     """Cadastro público de CLIENTE/TUTOR vindo do menu inicial."""
     print("\n=== Cadastro de CLIENTE / TUTOR ===")
 
@@ -303,172 +179,93 @@ def cadastrar_cliente_publico(conn: PgConnection) -> None:
             continue
         break
 
-    senha_hash = gerar_hash_senha(s1)
-    tipo = "cliente"
-
-    try:
-        with conn.cursor() as c:
-            c.execute(
-                """
-                INSERT INTO usuario (username, senha_cripto, tipo)
-                VALUES (%s,%s,%s) RETURNING id_usuario;
-                """,
-                (user, senha_hash, tipo),
-            )
-            id_user = c.fetchone()[0]
-
-            print("\n--- Dados do tutor (seus dados) ---")
-            nome = ler_letras("Nome completo: ")
-
-            cpf = ler_numero("CPF (11 dígitos, só números): ")
-            while len(cpf) != 11:
-                print("CPF precisa ter 11 dígitos.")
-                cpf = ler_numero("CPF (11 dígitos, só números): ")
-
-            email = input("E-mail (pode deixar vazio): ").strip() or None
-            end = input("Endereço: ").strip()
-
-            tel = ler_numero("Telefone (só números): ")
-            while len(tel) < 8:
-                print("Telefone muito curto, informe com DDD se possível.")
-                tel = ler_numero("Telefone (só números): ")
-
-            c.execute(
-                """
-                INSERT INTO dono (nome, cpf, email, endereco, telefone)
-                VALUES (%s,%s,%s,%s,%s) RETURNING id_dono;
-                """,
-                (nome, cpf, email, end, tel),
-            )
-            id_dono = c.fetchone()[0]
-
-            print("\n--- Dados do animal ---")
-            nm = ler_letras("Nome do animal: ")
-            es = ler_letras("Espécie: ")
-            rc = ler_letras("Raça: ")
-
-            idade_str = ler_numero("Idade (em anos): ")
-            idade = int(idade_str)
-            while idade < 0 or idade > 40:
-                print("Idade estranha... informe uma idade entre 0 e 40 anos.")
-                idade = int(ler_numero("Idade (em anos): "))
-
-            c.execute(
-                """
-                INSERT INTO animal (nome, especie, raca, idade, id_dono)
-                VALUES (%s,%s,%s,%s,%s)
-                """,
-                (nm, es, rc, idade, id_dono),
-            )
+    senha_hash = em_segundo_plano(gerar_hash_senha, s1)
 
-            c.execute(
-                "UPDATE usuario SET id_dono = %s WHERE id_usuario = %s",
-                (id_dono, id_user),
-            )
+    print("\n--- Dados do tutor (seus dados) ---")
+    tutor = _ler_dados_tutor()
+    print("\n--- Dados do animal ---")
+    animal = _ler_dados_animal()
 
-        conn.commit()
+    try:
+        repo.usuarios.criar(user, senha_hash.result(), "cliente", tutor, animal)
         print("\nCadastro realizado com sucesso!")
         print("Você já pode usar seu login e senha na opção 'Login como CLIENTE / TUTOR'.")
     except Exception as e:
-        conn.rollback()
         print("Erro ao cadastrar cliente/tutor:", e)
 
 # LOGIN E CONTROLE DE TENTATIVAS
-def atualizar_login_sucesso(conn: PgConnection, id_usuario: int) -> None:
-    with conn.cursor() as c:
-        c.execute(
-            "UPDATE usuario SET tentativas_erradas = 0 WHERE id_usuario = %s",
-            (id_usuario,),
-        )
-    conn.commit()
-
-
-def registrar_tentativa_falha(conn: PgConnection, id_usuario: int) -> None:
-    with conn.cursor() as c:
-        c.execute(
-            """
-            UPDATE usuario
-            SET tentativas_erradas = tentativas_erradas + 1
-            WHERE id_usuario = %s
-            RETURNING tentativas_erradas;
-            """,
-            (id_usuario,),
-        )
-        tentativas = c.fetchone()[0]
-        if tentativas >= 3:
-            c.execute(
-                "UPDATE usuario SET bloqueado = TRUE WHERE id_usuario = %s",
-                (id_usuario,),
-            )
-    conn.commit()
+def atualizar_login_sucesso(id_usuario: int) -> None:
+    repo.usuarios.zerar_tentativas(id_usuario)
+
+
+def registrar_tentativa_falha(id_usuario: int) -> None:
+    repo.usuarios.registrar_falha(id_usuario)
 
 
-def login(
-    conn: PgConnection, tipo_esperado: Optional[str] = None
-) -> Optional[Dict[str, Any]]:
+def _refazer_hash(id_usuario: int, senha: str) -> None:
+    """Regrava o hash com o custo atual. Se falhar, o hash antigo continua
+    valendo e a troca é tentada de novo no próximo login."""
+    try:
+        repo.usuarios.alterar_senha(id_usuario, gerar_hash_senha(senha))
+    except Exception:
+        pass
+
+
+def login(tipo_esperado: Optional[str] = None) -> Optional[Dict[str, Any]]:
     print("\n=== Login ===")
     user = input("Usuário: ").strip()
     s = ler_senha_mascarada()
 
     try:
-        with conn.cursor() as c:
-            c.execute(
-                """
-                SELECT id_usuario, username, tipo, senha_cripto, bloqueado
-                FROM usuario WHERE username = %s
-                """,
-                (user,),
-            )
-            r = c.fetchone()
+        u = repo.usuarios.buscar_por_username(user)
     except Exception as e:
         print("Erro ao buscar usuário:", e)
         return None
 
-    if not r:
+    if not u:
         print("Usuário ou senha incorretos.")
         return None
 
-    id_usuario, username, tipo, senha_hash, bloqueado = r
-
-    if bloqueado:
+    if u.bloqueado:
         print("Usuário bloqueado por muitas tentativas de login. Contate o administrador.")
         return None
 
-    if not verificar_senha(s, senha_hash):
-        registrar_tentativa_falha(conn, id_usuario)
+    # a tela espera o resultado de qualquer jeito: mandar para o pool do
+    # bcrypt só somaria a troca de thread (servicos_async.login é que delega)
+    if not verificar_senha(s, u.senha_cripto):
+        registrar_tentativa_falha(u.id_usuario)
         print("Usuário ou senha incorretos.")
         return None
 
-    if tipo_esperado and tipo != tipo_esperado:
+    if tipo_esperado and u.tipo != tipo_esperado:
         print(
-            f"Este usuário é do tipo '{tipo}', não '{tipo_esperado}'. "
+            f"Este usuário é do tipo '{u.tipo}', não '{tipo_esperado}'. "
             "Entre pelo menu correto."
         )
         return None
 
-    atualizar_login_sucesso(conn, id_usuario)
-    print(f"Login realizado com sucesso ({username} - {tipo}).")
-    return {"id": id_usuario, "username": username, "tipo": tipo}
+    atualizar_login_sucesso(u.id_usuario)
+    if precisa_rehash(u.senha_cripto):
+        em_segundo_plano(_refazer_hash, u.id_usuario, s)
+    print(f"Login realizado com sucesso ({u.username} - {u.tipo}).")
+    return {
+        "id": u.id_usuario,
+        "username": u.username,
+        "tipo": u.tipo,
+        "contexto": ContextoSessao(u.id_usuario),
+    }
 
 
-def alterar_senha_admin(conn: PgConnection, usuario: Dict[str, Any]) -> None:
+def alterar_senha_admin(usuario: Dict[str, Any]) -> None:
     print("\n=== ALTERAR SENHA DO ADMIN ===")
 
     senha_atual = ler_senha_mascarada("Digite sua senha atual: ")
 
-    with conn.cursor() as c:
-        c.execute(
-            "SELECT senha_cripto FROM usuario WHERE id_usuario = %s",
-            (usuario["id"],),
-        )
-        row = c.fetchone()
-
-    if not row:
+    senha_hash_atual = repo.usuarios.senha_hash(usuario["id"])
+    if not senha_hash_atual:
         print("Usuário não encontrado no banco.")
         return
 
-    senha_hash_atual = row[0]
-
     if not verificar_senha(senha_atual, senha_hash_atual):
         print("Senha atual incorreta.")
         return
@@ -490,180 +287,317 @@ def alterar_senha_admin(conn: PgConnection, usuario: Dict[str, Any]) -> None:
     nova_hash = gerar_hash_senha(nova)
 
     try:
-        with conn.cursor() as c:
-            c.execute(
-                "UPDATE usuario SET senha_cripto = %s WHERE id_usuario = %s",
-                (nova_hash, usuario["id"]),
-            )
-        conn.commit()
+        repo.usuarios.alterar_senha(usuario["id"], nova_hash)
         print("✅ Senha alterada com sucesso.")
     except Exception as e:
-        conn.rollback()
         print("Erro ao alterar senha:", e)
 
 # LISTAGENS
-def listar_donos(conn: PgConnection) -> None:
-    print("\n=== Lista de tutores (donos) ===")
-    with conn.cursor() as c:
-        c.execute(
-            "SELECT id_dono, nome, cpf, email, telefone FROM dono ORDER BY id_dono;"
-        )
-        linhas = c.fetchall()
-        if not linhas:
-            print("Nenhum tutor cadastrado.")
+_COLUNAS_CONSULTAS = (
+    Coluna("ID", direita=True),
+    Coluna("Data", 10),
+    Coluna("Horário", 8),
+    Coluna("Status", 10),
+    Coluna("Animal", 25),
+    Coluna("Tutor", 30),
+)
+_COLUNAS_CONSULTAS_CLIENTE = (
+    Coluna("ID", direita=True),
+    Coluna("Data", 10),
+    Coluna("Horário", 8),
+    Coluna("Status", 10),
+    Coluna("Prioridade", 10),
+    Coluna("Animal", 25),
+)
+_COLUNAS_DONOS = (
+    Coluna("ID", direita=True),
+    Coluna("Nome", 30),
+    Coluna("CPF", 11),
+    Coluna("E-mail", 30),
+    Coluna("Telefone", 15),
+)
+_COLUNAS_ANIMAIS = (
+    Coluna("ID", direita=True),
+    Coluna("Nome", 25),
+    Coluna("Espécie", 15),
+    Coluna("Raça", 20),
+    Coluna("Idade", direita=True),
+    Coluna("Tutor", 30),
+)
+_COLUNAS_ANIMAIS_DO_TUTOR = _COLUNAS_ANIMAIS[:-1]
+
+
+def _listar(
+    listagem: Listagem,
+    colunas: Sequence[Coluna],
+    msg_vazio: str,
+) -> None:
+    """Exibe uma listagem página a página, com navegação próxima/anterior.
+
+    Com tamanho_pagina = 0 imprime tudo direto de um cursor no servidor
+    (pelo pager, se configurado). SAIDA_CONFIG["limite"] limita o total.
+    """
+    tamanho = LISTAGEM_CONFIG["tamanho_pagina"]
+    limite = SAIDA_CONFIG["limite"]
+    tabela = Tabela(colunas)
+
+    if tamanho <= 0:
+        with paginador() as saida:
+            escritas = tabela.escrever(
+                listagem.iterar(), saida, limite, formatar=sys.stdout.isatty()
+            )
+        if not escritas:
+            print(msg_vazio)
+        return
+
+    if limite:
+        tamanho = min(tamanho, limite)
+    # busca uma linha a mais para saber se existe página seguinte
+    linhas = listagem.pagina(tamanho + 1)
+    if not linhas:
+        print(msg_vazio)
+        return
+    tem_proxima = len(linhas) > tamanho
+    tem_anterior = False
+    linhas = linhas[:tamanho]
+    num_pagina = 1
+
+    while True:
+        tabela.escrever(linhas, limite=0)
+        if limite and num_pagina * tamanho >= limite:
+            tem_proxima = False
+
+        if not tem_proxima and not tem_anterior:
+            return
+
+        opcoes = []
+        if tem_proxima:
+            opcoes.append("[Enter] próxima")
+        if tem_anterior:
+            opcoes.append("a) anterior")
+        opcoes.append("s) sair")
+        op = input(f"-- página {num_pagina} | " + " | ".join(opcoes) + ": ").strip().lower()
+
+        if op == "s":
             return
-        for id_dono, nome, cpf, email, tel in linhas:
-            print(
-                f"[{id_dono}] {nome} | CPF: {cpf} | "
-                f"E-mail: {email or '-'} | Tel: {tel}"
+        if op == "a" and tem_anterior:
+            anteriores = listagem.pagina(
+                tamanho + 1, apos=listagem.chave_de(linhas[0]), voltar=True
             )
+            tem_anterior = len(anteriores) > tamanho
+            linhas = anteriores[-tamanho:]
+            tem_proxima = True
+            num_pagina -= 1
+        elif op == "" and tem_proxima:
+            seguintes = listagem.pagina(tamanho + 1, apos=listagem.chave_de(linhas[-1]))
+            tem_proxima = len(seguintes) > tamanho
+            linhas = seguintes[:tamanho]
+            tem_anterior = True
+            num_pagina += 1
+        else:
+            print("Opção inválida.")
+            continue
+        print()
+
+
+def listar_donos() -> None:
+    print("\n=== Lista de tutores (donos) ===")
+    _listar(repo.donos.listagem(), _COLUNAS_DONOS, "Nenhum tutor cadastrado.")
 
 
-def listar_animais(conn: PgConnection) -> None:
+def listar_animais() -> None:
     print("\n=== Lista de animais ===")
-    with conn.cursor() as c:
-        c.execute(
-            """
-            SELECT a.id_animal, a.nome, a.especie, a.raca, a.idade, d.nome
-            FROM animal a
-            JOIN dono d ON a.id_dono = d.id_dono
-            ORDER BY a.id_animal;
-            """
-        )
-        linhas = c.fetchall()
+    _listar(repo.animais.listagem(), _COLUNAS_ANIMAIS, "Nenhum animal cadastrado.")
+
+# SELETOR POR BUSCA (em vez de listar tudo para o operador achar o ID)
+def _escolher(
+    rotulo: str,
+    buscar: Callable[[str, int], List[Any]],
+    colunas: Sequence[Coluna],
+) -> Optional[Any]:
+    """Busca por trecho de texto e devolve a linha escolhida (None = cancelou)."""
+    limite = LISTAGEM_CONFIG["resultados_busca"]
+    tabela = Tabela((Coluna("#", direita=True), *colunas))
+    pergunta = f"Buscar {rotulo} (vazio cancela): "
+    termo = input(pergunta).strip()
+
+    while termo:
+        if len(termo) < 3:
+            print("Digite pelo menos 3 caracteres.")
+            termo = input(pergunta).strip()
+            continue
+
+        try:
+            linhas = buscar(termo, limite)
+        except Exception as e:
+            print("Erro na busca:", e)
+            return None
+
         if not linhas:
-            print("Nenhum animal cadastrado.")
-            return
-        for id_animal, nome, especie, raca, idade, nome_dono in linhas:
-            print(
-                f"[{id_animal}] {nome} ({especie} - {raca}), {idade} anos | Tutor: {nome_dono}"
-            )
+            print("Nada encontrado.")
+            termo = input(pergunta).strip()
+            continue
+
+        tabela.escrever(((i, *linha) for i, linha in enumerate(linhas, start=1)), limite=0)
+        op = input("Número da opção, outro termo para nova busca ou vazio para cancelar: ").strip()
+        if op.isdigit() and 1 <= int(op) <= len(linhas):
+            return linhas[int(op) - 1]
+        termo = op
+
+    return None
+
+
+def _escolher_animal() -> Optional[int]:
+    linha = _escolher(
+        "animal (nome do pet ou do tutor, CPF ou telefone)",
+        repo.animais.buscar,
+        _COLUNAS_ANIMAIS,
+    )
+    return linha.id_animal if linha else None
+
 
+def _escolher_dono() -> Optional[int]:
+    linha = _escolher("tutor (nome, CPF ou telefone)", repo.donos.buscar, _COLUNAS_DONOS)
+    return linha.id_dono if linha else None
 
-def relatorio_qtd_animais_por_tutor(conn: PgConnection) -> None:
+
+def _escolher_consulta() -> Optional[int]:
+    linha = _escolher(
+        "consulta (nome do pet ou do tutor, CPF ou telefone)",
+        repo.consultas.buscar,
+        _COLUNAS_CONSULTAS,
+    )
+    return linha.id_consulta if linha else None
+
+
+def relatorio_qtd_animais_por_tutor() -> None:
     print("\n=== Relatório: quantidade de animais por tutor ===")
-    with conn.cursor() as c:
-        c.execute(
-            """
-            SELECT d.id_dono,
-                   d.nome,
-                   COUNT(a.id_animal) AS total_animais
-            FROM dono d
-            LEFT JOIN animal a ON a.id_dono = d.id_dono
-            GROUP BY d.id_dono, d.nome
-            ORDER BY total_animais DESC, d.nome;
-            """
+    linhas = repo.donos.qtd_animais_por_tutor()
+    if not linhas:
+        print("Nenhum tutor cadastrado.")
+        return
+
+    tabela = Tabela(
+        (Coluna("ID", direita=True), Coluna("Tutor", 40), Coluna("Animais", direita=True))
+    )
+    with paginador() as saida:
+        tabela.escrever(linhas, saida, formatar=sys.stdout.isatty())
+
+
+_PAINEL_TABELAS = (
+    ("consultas_status", "Consultas por status", "Status", ("total", "urgentes")),
+    ("consultas_prioridade", "Consultas por prioridade", "Prioridade", ("total",)),
+    ("consultas_vet", "Carga por veterinário", "Veterinário", ("total", "urgentes", "agendadas")),
+    ("cirurgias_status", "Cirurgias por status", "Status", ("total",)),
+    ("animais_especie", "Animais por espécie", "Espécie", ("total", "novos_no_mes")),
+)
+
+_PAINEL_TITULOS = {
+    "total": "Total",
+    "urgentes": "Urgentes",
+    "agendadas": "Agendadas",
+    "novos_no_mes": "Novos no mês",
+}
+
+
+def mostrar_painel() -> None:
+    """Painel da clínica; guardado por PAINEL_CONFIG["ttl_s"] segundos (painel.py)."""
+    from painel import obter_painel
+
+    atualizar = False
+    while True:
+        try:
+            painel = obter_painel(atualizar)
+        except Exception as e:
+            print("Erro ao montar o painel:", e)
+            return
+
+        # o grupo () sempre devolve uma linha, mesmo sem dados no mês
+        t = {linha.secao: linha for linha in painel.linhas if linha.chave is None}
+        print(f"\n=== Painel da clínica — {painel.mes:%m/%Y} ===")
+        print(
+            f"Consultas do mês: {t['consultas'].total} (urgentes: {t['consultas'].urgentes}, "
+            f"agendadas: {t['consultas'].agendadas})"
         )
-        linhas = c.fetchall()
-        if not linhas:
-            print("Nenhum tutor cadastrado.")
+        print(f"Cirurgias do mês: {t['cirurgias'].total} (agendadas: {t['cirurgias'].agendadas})")
+        print(f"Animais: {t['animais'].total} (novos no mês: {t['animais'].novos_no_mes})")
+        print(f"Tutores: {t['tutores'].total} (novos no mês: {t['tutores'].novos_no_mes})")
+
+        for secao, titulo, rotulo, campos in _PAINEL_TABELAS:
+            linhas = painel.secao(secao)
+            if not linhas:
+                continue
+            print(f"\n--- {titulo} ---")
+            colunas = [Coluna(rotulo)] + [Coluna(_PAINEL_TITULOS[f], direita=True) for f in campos]
+            Tabela(colunas).escrever(
+                ([linha.chave] + [getattr(linha, f) for f in campos] for linha in linhas),
+                limite=0,
+            )
+
+        print(f"\nDados de {painel.gerado_em:%H:%M:%S}.")
+        if input("Enter para voltar, A para atualizar: ").strip().lower() != "a":
             return
+        atualizar = True
+
 
-        for id_dono, nome, total in linhas:
-            print(f"[{id_dono}] {nome} - {total} animal(is)")
+def verificar_contadores() -> None:
+    """Confere dono.total_animais contra a contagem real e corrige o que divergir."""
+    print("\n=== Verificação dos contadores de animais ===")
+    try:
+        corrigidos = repo.donos.corrigir_contadores()
+    except Exception as e:
+        print("Erro ao verificar contadores:", e)
+        return
 
+    if not corrigidos:
+        print("Todos os contadores conferem.")
+        return
 
-def join_consultas(
-    conn: PgConnection, somente_vet_id: Optional[int] = None
-) -> None:
+    Tabela(
+        (
+            Coluna("ID", direita=True),
+            Coluna("Tutor", 40),
+            Coluna("Gravado", direita=True),
+            Coluna("Real", direita=True),
+        )
+    ).escrever(corrigidos, limite=0)
+    print(f"{len(corrigidos)} contador(es) corrigido(s).")
+
+
+def join_consultas(somente_vet_id: Optional[int] = None) -> None:
     print("\n=== Consultas cadastradas ===")
-    with conn.cursor() as c:
-        if somente_vet_id:
-            c.execute(
-                """
-                SELECT c.id_consulta, c.data, c.horario, c.status,
-                       a.nome, d.nome
-                FROM consulta c
-                JOIN animal a ON a.id_animal = c.id_animal
-                JOIN dono d   ON d.id_dono   = a.id_dono
-                WHERE c.id_vet = %s
-                ORDER BY c.data DESC, c.horario DESC;
-                """,
-                (somente_vet_id,),
-            )
-        else:
-            c.execute(
-                """
-                SELECT c.id_consulta, c.data, c.horario, c.status,
-                       a.nome, d.nome
-                FROM consulta c
-                JOIN animal a ON a.id_animal = c.id_animal
-                JOIN dono d   ON d.id_dono   = a.id_dono
-                ORDER BY c.data DESC, c.horario DESC;
-                """
-            )
-        linhas = c.fetchall()
-        if not linhas:
-            print("Nenhuma consulta cadastrada.")
-            return
-        for id_consulta, data, horario, status, nome_animal, nome_dono in linhas:
-            print(
-                f"[{id_consulta}] {data} {horario} [{status}] "
-                f"| Animal: {nome_animal} | Tutor: {nome_dono}"
-            )
+    _listar(
+        repo.consultas.listagem(somente_vet_id),
+        _COLUNAS_CONSULTAS,
+        "Nenhuma consulta cadastrada.",
+    )
 
 
-def listar_consultas_por_periodo(
-    conn: PgConnection, somente_vet_id: Optional[int] = None
-) -> None:
+def listar_consultas_por_periodo(somente_vet_id: Optional[int] = None) -> None:
     print("\n=== Consultas por período ===")
     data_ini = input("Data inicial (AAAA-MM-DD): ").strip()
     data_fim = input("Data final  (AAAA-MM-DD): ").strip()
 
-    with conn.cursor() as c:
-        if somente_vet_id:
-            c.execute(
-                """
-                SELECT c.id_consulta, c.data, c.horario, c.status,
-                       a.nome, d.nome
-                FROM consulta c
-                JOIN animal a ON a.id_animal = c.id_animal
-                JOIN dono d   ON d.id_dono   = a.id_dono
-                WHERE c.data BETWEEN %s AND %s
-                  AND c.id_vet = %s
-                ORDER BY c.data DESC, c.horario DESC;
-                """,
-                (data_ini, data_fim, somente_vet_id),
-            )
-        else:
-            c.execute(
-                """
-                SELECT c.id_consulta, c.data, c.horario, c.status,
-                       a.nome, d.nome
-                FROM consulta c
-                JOIN animal a ON a.id_animal = c.id_animal
-                JOIN dono d   ON d.id_dono   = a.id_dono
-                WHERE c.data BETWEEN %s AND %s
-                ORDER BY c.data DESC, c.horario DESC;
-                """,
-                (data_ini, data_fim),
-            )
-
-        linhas = c.fetchall()
-        if not linhas:
-            print("Nenhuma consulta encontrado nesse período.")
-            return
-        for id_consulta, data, horario, status, nome_animal, nome_dono in linhas:
-            print(
-                f"[{id_consulta}] {data} {horario} [{status}] "
-                f"| Animal: {nome_animal} | Tutor: {nome_dono}"
-            )
+    _listar(
+        repo.consultas.listagem(somente_vet_id, data_ini, data_fim),
+        _COLUNAS_CONSULTAS,
+        "Nenhuma consulta encontrado nesse período.",
+    )
 
 # CADASTROS (CONSULTA / CIRURGIA)
-def cadastrar_consulta(
-    conn: PgConnection, usuario: Optional[Dict[str, Any]] = None
-) -> None:
+def cadastrar_consulta(usuario: Optional[Dict[str, Any]] = None) -> None:
     print("\n=== Cadastro de consulta ===")
-    listar_animais(conn)
+    id_animal = _escolher_animal()
+    if id_animal is None:
+        print("Operação cancelada.")
+        return
 
-    id_animal = int(ler_numero("ID do animal: "))
     data = input("Data da consulta (AAAA-MM-DD): ").strip()
     horario = input("Horário (HH:MM): ").strip()
     motivo = input("Motivo da consulta: ").strip()
     diagnostico = input(
         "Diagnóstico (pode deixar em branco por enquanto): "
     ).strip() or None
-    status = "agendada"
 
     id_vet: Optional[int] = None
     if usuario and usuario.get("tipo") == "veterinario":
@@ -674,109 +608,180 @@ def cadastrar_consulta(
             id_vet = int(vet_resp)
 
     try:
-        with conn.cursor() as c:
-            c.execute(
-                """
-                INSERT INTO consulta (data, horario, motivo, diagnostico,
-                                      status, prioridade, id_animal, id_vet)
-                VALUES (%s,%s,%s,%s,%s,'normal',%s,%s)
-                """,
-                (data, horario, motivo, diagnostico, status, id_animal, id_vet),
-            )
-        conn.commit()
+        repo.consultas.criar(id_animal, data, horario, motivo, diagnostico, id_vet)
         print("Consulta cadastrada com sucesso.")
+    except pg_errors.ExclusionViolation:
+        print("O veterinário já tem consulta nesse horário. Veja os horários livres.")
     except Exception as e:
-        conn.rollback()
         print("Erro ao cadastrar consulta:", e)
 
 
-def cadastrar_cirurgia(conn: PgConnection) -> None:
+def horarios_livres(usuario: Optional[Dict[str, Any]] = None) -> None:
+    """Horários livres por veterinário e dia, dentro do expediente (AGENDA_CONFIG)."""
+    print("\n=== Horários livres ===")
+    try:
+        de = datetime.date.fromisoformat(input("De (AAAA-MM-DD): ").strip())
+        ate = datetime.date.fromisoformat(input("Até (AAAA-MM-DD): ").strip())
+    except ValueError as e:
+        print("Data inválida:", e)
+        return
+
+    id_vet: Optional[int] = None
+    if usuario and usuario.get("tipo") == "veterinario":
+        id_vet = usuario["id"]
+    else:
+        vet_resp = input("ID do veterinário (vazio = todos): ").strip()
+        if vet_resp:
+            id_vet = int(vet_resp)
+
+    try:
+        livres = repo.consultas.horarios_livres(de, ate, id_vet)
+    except Exception as e:
+        print("Erro ao buscar horários livres:", e)
+        return
+    if not livres:
+        print("Nenhum horário livre no período.")
+        return
+
+    # linhas vêm ordenadas por data e veterinário: uma linha da tabela por par
+    por_dia = (
+        (data, vet, nome_vet, " ".join(h.horario.strftime("%H:%M") for h in grupo))
+        for (data, vet, nome_vet), grupo in groupby(
+            livres, lambda h: (h.data, h.id_vet, h.veterinario)
+        )
+    )
+    Tabela(
+        (
+            Coluna("Data", 10),
+            Coluna("ID", direita=True),
+            Coluna("Veterinário", 20),
+            Coluna("Livres", 120),
+        )
+    ).escrever(por_dia)
+
+
+def agendar_consultas_recorrentes(usuario: Optional[Dict[str, Any]] = None) -> None:
+    """Várias consultas de uma vez: vacinação, retornos, campanhas."""
+    print("\n=== Agendamento recorrente de consultas ===")
+    id_animais: List[int] = []
+    while True:
+        print(f"{len(id_animais)} animal(is) selecionado(s).")
+        id_animal = _escolher_animal()
+        if id_animal is None:
+            break
+        if id_animal not in id_animais:
+            id_animais.append(id_animal)
+    if not id_animais:
+        print("Operação cancelada.")
+        return
+
+    try:
+        recorrencia = Recorrencia(
+            inicio=datetime.date.fromisoformat(input("Primeira data (AAAA-MM-DD): ").strip()),
+            horario=datetime.time.fromisoformat(input("Horário (HH:MM): ").strip()),
+            intervalo_dias=int(ler_numero("Intervalo entre consultas (dias): ")),
+            quantidade=int(ler_numero("Quantidade de consultas por animal: ")),
+            minutos_entre_animais=(
+                int(ler_numero("Minutos entre um animal e o próximo: "))
+                if len(id_animais) > 1
+                else 0
+            ),
+        )
+        recorrencia.validar()
+    except ValueError as e:
+        print("Valor inválido:", e)
+        return
+    motivo = input("Motivo das consultas: ").strip()
+
+    id_vet: Optional[int] = None
+    if usuario and usuario.get("tipo") == "veterinario":
+        id_vet = usuario["id"]
+    else:
+        vet_resp = input("ID do veterinário responsável (ou deixe vazio): ").strip()
+        if vet_resp:
+            id_vet = int(vet_resp)
+
+    total = len(id_animais) * recorrencia.quantidade
+    if input(f"Agendar {total} consulta(s)? (s/n): ").strip().lower() != "s":
+        print("Operação cancelada.")
+        return
+
+    try:
+        ids = repo.consultas.criar_em_lote(id_animais, recorrencia, motivo, id_vet)
+    except pg_errors.ExclusionViolation as e:
+        print("Conflito de horário do veterinário; nenhuma consulta foi criada.")
+        print(e.diag.message_detail or e)
+        return
+    except Exception as e:
+        print("Erro ao agendar consultas (nenhuma foi criada):", e)
+        return
+    print(f"{len(ids)} consulta(s) agendada(s). IDs: {', '.join(map(str, ids))}")
+
+
+def cadastrar_cirurgia() -> None:
     print("\n=== Cadastro de cirurgia ===")
-    listar_animais(conn)
+    id_animal = _escolher_animal()
+    if id_animal is None:
+        print("Operação cancelada.")
+        return
 
-    id_animal = int(ler_numero("ID do animal: "))
     data = input("Data da cirurgia (AAAA-MM-DD): ").strip()
     tipo = input("Tipo de cirurgia: ").strip()
     observacoes = input("Observações (pode deixar em branco): ").strip() or None
-    status = "agendada"
 
     try:
-        with conn.cursor() as c:
-            c.execute(
-                """
-                INSERT INTO cirurgia (data, tipo_cirurgia, observacoes,
-                                      status, id_animal)
-                VALUES (%s,%s,%s,%s,%s)
-                """,
-                (data, tipo, observacoes, status, id_animal),
-            )
-        conn.commit()
+        repo.cirurgias.criar(id_animal, data, tipo, observacoes)
         print("Cirurgia cadastrada com sucesso.")
     except Exception as e:
-        conn.rollback()
         print("Erro ao cadastrar cirurgia:", e)
-        
-def editar_dono(conn: PgConnection) -> None:
-    listar_donos(conn)
-    id_dono = int(ler_numero("ID do tutor para editar: "))
 
-    print("Deixe em branco para manter o valor atual.")
 
-    with conn.cursor() as c:
-        c.execute(
-            "SELECT nome, email, endereco, telefone, observacao FROM dono WHERE id_dono = %s",
-            (id_dono,),
-        )
-        row = c.fetchone()
-        if not row:
-            print("Tutor não encontrado.")
-            return
-        nome_atual, email_atual, end_atual, tel_atual, obs_atual = row
+def editar_dono() -> None:
+    id_dono = _escolher_dono()
+    if id_dono is None:
+        print("Operação cancelada.")
+        return
+
+    atual = repo.donos.obter(id_dono)
+    if not atual:
+        print("Tutor não encontrado.")
+        return
 
-    novo_nome = input(f"Nome [{nome_atual}]: ").strip() or nome_atual
-    novo_email = input(f"E-mail [{email_atual or '-'}]: ").strip() or email_atual
-    novo_end = input(f"Endereço [{end_atual}]: ").strip() or end_atual
-    novo_tel = input(f"Telefone [{tel_atual}]: ").strip() or tel_atual
-    nova_obs = input(f"Observação [{obs_atual or '-'}]: ").strip() or obs_atual
+    print("Deixe em branco para manter o valor atual.")
+
+    novo = atual._replace(
+        nome=input(f"Nome [{atual.nome}]: ").strip() or atual.nome,
+        email=input(f"E-mail [{atual.email or '-'}]: ").strip() or atual.email,
+        endereco=input(f"Endereço [{atual.endereco}]: ").strip() or atual.endereco,
+        telefone=input(f"Telefone [{atual.telefone}]: ").strip() or atual.telefone,
+        observacao=input(f"Observação [{atual.observacao or '-'}]: ").strip()
+        or atual.observacao,
+    )
 
     try:
-        with conn.cursor() as c:
-            c.execute(
-                """
-                UPDATE dono
-                SET nome = %s, email = %s, endereco = %s, telefone = %s, observacao = %s
-                WHERE id_dono = %s
-                """,
-                (novo_nome, novo_email, novo_end, novo_tel, nova_obs, id_dono),
-            )
-        conn.commit()
+        repo.donos.atualizar(novo)
         print("Dados do tutor atualizados.")
     except Exception as e:
-        conn.rollback()
         print("Erro ao atualizar tutor:", e)
 
 
-def editar_animal(conn: PgConnection) -> None:
-    listar_animais(conn)
-    id_animal = int(ler_numero("ID do animal para editar: "))
+def editar_animal() -> None:
+    id_animal = _escolher_animal()
+    if id_animal is None:
+        print("Operação cancelada.")
+        return
 
-    with conn.cursor() as c:
-        c.execute(
-            "SELECT nome, especie, raca, idade FROM animal WHERE id_animal = %s",
-            (id_animal,),
-        )
-        row = c.fetchone()
-        if not row:
-            print("Animal não encontrado.")
-            return
-        nome_atual, esp_atual, raca_atual, idade_atual = row
+    atual = repo.animais.obter(id_animal)
+    if not atual:
+        print("Animal não encontrado.")
+        return
 
     print("Deixe em branco para manter o valor atual.")
-    novo_nome = input(f"Nome [{nome_atual}]: ").strip() or nome_atual
-    nova_esp = input(f"Espécie [{esp_atual}]: ").strip() or esp_atual
-    nova_raca = input(f"Raça [{raca_atual}]: ").strip() or raca_atual
-    idade_str = input(f"Idade [{idade_atual}]: ").strip()
-    nova_idade = idade_atual
+    novo_nome = input(f"Nome [{atual.nome}]: ").strip() or atual.nome
+    nova_esp = input(f"Espécie [{atual.especie}]: ").strip() or atual.especie
+    nova_raca = input(f"Raça [{atual.raca}]: ").strip() or atual.raca
+    idade_str = input(f"Idade [{atual.idade}]: ").strip()
+    nova_idade = atual.idade
     if idade_str:
         try:
             nova_idade = int(idade_str)
@@ -784,86 +789,73 @@ def editar_animal(conn: PgConnection) -> None:
             print("Idade inválida, mantendo valor anterior.")
 
     try:
-        with conn.cursor() as c:
-            c.execute(
-                """
-                UPDATE animal
-                SET nome = %s, especie = %s, raca = %s, idade = %s
-                WHERE id_animal = %s
-                """,
-                (novo_nome, nova_esp, nova_raca, nova_idade, id_animal),
-            )
-        conn.commit()
+        repo.animais.atualizar(
+            atual._replace(nome=novo_nome, especie=nova_esp, raca=nova_raca, idade=nova_idade)
+        )
         print("Dados do animal atualizados.")
     except Exception as e:
-        conn.rollback()
         print("Erro ao atualizar animal:", e)
 
 
-def editar_diagnostico_consulta(conn: PgConnection) -> None:
-    join_consultas(conn)
-    id_consulta = int(ler_numero("ID da consulta para editar: "))
+def editar_diagnostico_consulta() -> None:
+    id_consulta = _escolher_consulta()
+    if id_consulta is None:
+        print("Operação cancelada.")
+        return
 
-    with conn.cursor() as c:
-        c.execute(
-            "SELECT diagnostico, status, prioridade FROM consulta WHERE id_consulta = %s",
-            (id_consulta,),
-        )
-        row = c.fetchone()
-        if not row:
-            print("Consulta não encontrada.")
-            return
-        diag_atual, status_atual, prioridade_atual = row
+    atual = repo.consultas.avaliacao(id_consulta)
+    if not atual:
+        print("Consulta não encontrada.")
+        return
 
     print("Deixe em branco para manter o valor atual.")
-    novo_diag = input(f"Diagnóstico [{diag_atual or 'vazio'}]: ").strip() or diag_atual
+    novo_diag = (
+        input(f"Diagnóstico [{atual.diagnostico or 'vazio'}]: ").strip() or atual.diagnostico
+    )
     novo_status = (
-        input(f"Status [{status_atual} - (agendada/realizada/cancelada)]: ").strip()
-        or status_atual
+        input(f"Status [{atual.status} - (agendada/realizada/cancelada)]: ").strip()
+        or atual.status
     )
     nova_prioridade = (
-        input(f"Prioridade [{prioridade_atual} - (normal/urgente)]: ").strip()
-        or prioridade_atual
+        input(f"Prioridade [{atual.prioridade} - (normal/urgente)]: ").strip()
+        or atual.prioridade
     )
 
     try:
-        with conn.cursor() as c:
-            c.execute(
-                """
-                UPDATE consulta
-                SET diagnostico = %s, status = %s, prioridade = %s
-                WHERE id_consulta = %s
-                """,
-                (novo_diag, novo_status, nova_prioridade, id_consulta),
-            )
-        conn.commit()
+        repo.consultas.avaliar(
+            id_consulta, ConsultaAvaliacao(novo_diag, novo_status, nova_prioridade)
+        )
         print("Consulta atualizada.")
     except Exception as e:
-        conn.rollback()
         print("Erro ao atualizar consulta:", e)
 
 
-def excluir_dono(conn: PgConnection) -> None:
-    listar_donos(conn)
-    id_dono = int(ler_numero("ID do tutor para excluir: "))
-    conf = input("Tem certeza? Isso apagará animais e consultas. (s/n): ").lower()
+def excluir_dono() -> None:
+    id_dono = _escolher_dono()
+    if id_dono is None:
+        print("Operação cancelada.")
+        return
+    conf = input(
+        "Tem certeza? O tutor, os animais e as consultas saem do sistema. (s/n): "
+    ).lower()
     if conf != "s":
         print("Operação cancelada.")
         return
 
     try:
-        with conn.cursor() as c:
-            c.execute("DELETE FROM dono WHERE id_dono = %s", (id_dono,))
-        conn.commit()
-        print("Tutor excluído.")
+        if repo.donos.excluir(id_dono):
+            print("Tutor excluído. Dá para desfazer até a purga (Donos / Animais).")
+        else:
+            print("Tutor não excluído: já estava excluído ou tem login de cliente.")
     except Exception as e:
-        conn.rollback()
         print("Erro ao excluir tutor:", e)
 
 
-def excluir_animal(conn: PgConnection) -> None:
-    listar_animais(conn)
-    id_animal = int(ler_numero("ID do animal para excluir: "))
+def excluir_animal() -> None:
+    id_animal = _escolher_animal()
+    if id_animal is None:
+        print("Operação cancelada.")
+        return
     conf = input(
         "Tem certeza? Consultas e cirurgias do animal serão apagadas. (s/n): "
     ).lower()
@@ -872,295 +864,230 @@ def excluir_animal(conn: PgConnection) -> None:
         return
 
     try:
-        with conn.cursor() as c:
-            c.execute("DELETE FROM animal WHERE id_animal = %s", (id_animal,))
-        conn.commit()
-        print("Animal excluído.")
+        if repo.animais.excluir(id_animal):
+            print("Animal excluído. Dá para desfazer até a purga (Donos / Animais).")
+        else:
+            print("Animal não encontrado.")
     except Exception as e:
-        conn.rollback()
         print("Erro ao excluir animal:", e)
 
 
-def excluir_consulta(conn: PgConnection) -> None:
-    join_consultas(conn)
-    id_consulta = int(ler_numero("ID da consulta para excluir: "))
+def _desfazer_exclusao(
+    titulo: str,
+    excluidos: Callable[[], List[Excluido]],
+    restaurar: Callable[[int], bool],
+    coluna_detalhe: str,
+) -> None:
+    """Lista o que foi excluído e ainda não purgado e restaura o escolhido."""
+    print(f"\n=== {titulo} ===")
+    try:
+        linhas = excluidos()
+    except Exception as e:
+        print("Erro ao listar os excluídos:", e)
+        return
+    if not linhas:
+        print("Nenhuma exclusão para desfazer.")
+        return
+
+    tabela = Tabela(
+        (
+            Coluna("#", direita=True),
+            Coluna("ID", direita=True),
+            Coluna("Nome", 30),
+            Coluna(coluna_detalhe, 30),
+            Coluna("Excluído em", 16),
+        )
+    )
+    tabela.escrever(
+        (
+            (i, e.id, e.nome, e.detalhe, f"{e.excluido_em:%d/%m/%Y %H:%M}")
+            for i, e in enumerate(linhas, start=1)
+        ),
+        limite=0,
+    )
+    op = input("Número para desfazer a exclusão (vazio cancela): ").strip()
+    if not (op.isdigit() and 1 <= int(op) <= len(linhas)):
+        print("Operação cancelada.")
+        return
+
+    escolhido = linhas[int(op) - 1]
+    try:
+        if restaurar(escolhido.id):
+            print(f"Exclusão de {escolhido.nome} desfeita.")
+        else:
+            print("A purga já começou a apagar este cadastro; não dá mais para desfazer.")
+    except pg_errors.UniqueViolation:
+        print("O CPF deste tutor já foi cadastrado de novo; não dá para desfazer a exclusão.")
+    except Exception as e:
+        print("Erro ao desfazer a exclusão:", e)
+
+
+def desfazer_exclusao_dono() -> None:
+    _desfazer_exclusao(
+        "Tutores excluídos", repo.donos.excluidos, repo.donos.restaurar, "CPF"
+    )
+
+
+def desfazer_exclusao_animal() -> None:
+    _desfazer_exclusao(
+        "Animais excluídos", repo.animais.excluidos, repo.animais.restaurar, "Tutor"
+    )
+
+
+def excluir_consulta() -> None:
+    id_consulta = _escolher_consulta()
+    if id_consulta is None:
+        print("Operação cancelada.")
+        return
     conf = input("Confirmar exclusão da consulta? (s/n): ").lower()
     if conf != "s":
         print("Operação cancelada.")
         return
 
     try:
-        with conn.cursor() as c:
-            c.execute("DELETE FROM consulta WHERE id_consulta = %s", (id_consulta,))
-        conn.commit()
+        repo.consultas.excluir(id_consulta)
         print("Consulta excluída.")
     except Exception as e:
-        conn.rollback()
         print("Erro ao excluir consulta:", e)
 
-def buscar_dono_por_cpf(conn: PgConnection) -> None:
+def buscar_dono_por_cpf() -> None:
     cpf = ler_numero("CPF (11 dígitos, só números): ")
-    while len(cpf) != 11:
+    while not cpf_valido(cpf):
         print("CPF precisa ter 11 dígitos.")
         cpf = ler_numero("CPF (11 dígitos, só números): ")
 
-    with conn.cursor() as c:
-        c.execute(
-            """
-            SELECT id_dono, nome, email, endereco, telefone
-            FROM dono
-            WHERE cpf = %s;
-            """,
-            (cpf,),
-        )
-        row = c.fetchone()
-        if not row:
-            print("Nenhum tutor encontrado com esse CPF.")
-            return
+    dono = repo.donos.buscar_por_cpf(cpf)
+    if not dono:
+        print("Nenhum tutor encontrado com esse CPF.")
+        return
 
-        id_dono, nome, email, end, tel = row
-        print("\n=== Tutor encontrado ===")
-        print(f"ID: {id_dono}")
-        print(f"Nome: {nome}")
-        print(f"E-mail: {email or '-'}")
-        print(f"Endereço: {end}")
-        print(f"Telefone: {tel}")
-
-        c.execute(
-            """
-            SELECT id_animal, nome, especie, raca, idade
-            FROM animal
-            WHERE id_dono = %s
-            ORDER BY id_animal;
-            """,
-            (id_dono,),
-        )
-        animais = c.fetchall()
-        if not animais:
-            print("Nenhum animal cadastrado para este tutor.")
-            return
+    print("\n=== Tutor encontrado ===")
+    print(f"ID: {dono.id_dono}")
+    print(f"Nome: {dono.nome}")
+    print(f"E-mail: {dono.email or '-'}")
+    print(f"Endereço: {dono.endereco}")
+    print(f"Telefone: {dono.telefone}")
 
-        print("\n=== Animais do tutor ===")
-        for id_animal, nm, especie, raca, idade in animais:
-            print(f"[{id_animal}] {nm} ({especie} - {raca}), {idade} anos")
+    animais = repo.donos.animais(dono.id_dono)
+    if not animais:
+        print("Nenhum animal cadastrado para este tutor.")
+        return
+
+    print("\n=== Animais do tutor ===")
+    Tabela(_COLUNAS_ANIMAIS_DO_TUTOR).escrever(animais)
 
 # FUNÇÕES DO CLIENTE / TUTOR
-def obter_id_dono_do_usuario(conn: PgConnection, usuario: Dict[str, Any]) -> Optional[int]:
-    with conn.cursor() as c:
-        c.execute(
-            "SELECT id_dono FROM usuario WHERE id_usuario = %s",
-            (usuario["id"],),
-        )
-        r = c.fetchone()
-        return r[0] if r else None
-
-
-def mostrar_dados_cliente(conn: PgConnection, usuario: Dict[str, Any]) -> None:
-    with conn.cursor() as c:
-        c.execute(
-            """
-            SELECT d.id_dono, d.nome, d.cpf, d.email, d.endereco, d.telefone, d.observacao
-            FROM usuario u
-            JOIN dono d ON d.id_dono = u.id_dono
-            WHERE u.id_usuario = %s;
-            """,
-            (usuario["id"],),
-        )
-        dono = c.fetchone()
-        if not dono:
-            print("Nenhum tutor vinculado ao seu usuário. Fale com a recepção.")
-            return
+def obter_id_dono_do_usuario(usuario: Dict[str, Any]) -> Optional[int]:
+    return contexto(usuario).id_dono()
 
-        id_dono, nome, cpf, email, end, tel, obs = dono
-        print("\n=== Seus dados de tutor ===")
-        print(f"ID: {id_dono}")
-        print(f"Nome: {nome}")
-        print(f"CPF: {cpf}")
-        print(f"E-mail: {email or '-'}")
-        print(f"Endereço: {end}")
-        print(f"Telefone: {tel}")
-        print(f"Observação: {obs or '-'}")
-
-        c.execute(
-            """
-            SELECT id_animal, nome, especie, raca, idade
-            FROM animal
-            WHERE id_dono = %s
-            ORDER BY id_animal;
-            """,
-            (id_dono,),
-        )
-        animais = c.fetchall()
 
-        if not animais:
-            print("\nNenhum animal cadastrado para este tutor.")
-            return
+def mostrar_dados_cliente(usuario: Dict[str, Any]) -> None:
+    ctx = contexto(usuario)
+    dono = ctx.dono()
+    if not dono:
+        print("Nenhum tutor vinculado ao seu usuário. Fale com a recepção.")
+        return
+
+    print("\n=== Seus dados de tutor ===")
+    print(f"ID: {dono.id_dono}")
+    print(f"Nome: {dono.nome}")
+    print(f"CPF: {dono.cpf}")
+    print(f"E-mail: {dono.email or '-'}")
+    print(f"Endereço: {dono.endereco}")
+    print(f"Telefone: {dono.telefone}")
+    print(f"Observação: {dono.observacao or '-'}")
+
+    animais = ctx.animais()
+    if not animais:
+        print("\nNenhum animal cadastrado para este tutor.")
+        return
 
-        print("\n=== Seus animais ===")
-        for id_animal, nm, especie, raca, idade in animais:
-            print(f"[{id_animal}] {nm} ({especie} - {raca}), {idade} anos")
+    print("\n=== Seus animais ===")
+    Tabela(_COLUNAS_ANIMAIS_DO_TUTOR).escrever(animais)
 
 
-def mostrar_consultas_cliente(conn: PgConnection, usuario: Dict[str, Any]) -> None:
-    id_dono = obter_id_dono_do_usuario(conn, usuario)
+def mostrar_consultas_cliente(usuario: Dict[str, Any], incluir_arquivadas: bool = False) -> None:
+    id_dono = obter_id_dono_do_usuario(usuario)
     if not id_dono:
         print("Nenhum tutor vinculado ao seu usuário. Fale com a recepção.")
         return
 
-    with conn.cursor() as c:
-        c.execute(
-            """
-            SELECT c.id_consulta, c.data, c.horario, c.status, c.prioridade, a.nome
-            FROM consulta c
-            JOIN animal a ON a.id_animal = c.id_animal
-            WHERE a.id_dono = %s
-            ORDER BY c.data DESC, c.horario DESC;
-            """,
-            (id_dono,),
-        )
-        consultas = c.fetchall()
-
-        if not consultas:
-            print("Você ainda não possui consultas cadastradas.")
-            return
-
-        print("\n=== Suas consultas ===")
-        for id_consulta, data, horario, status, prioridade, nome_animal in consultas:
-            print(
-                f"[{id_consulta}] {data} {horario} [{status} - {prioridade}] | Animal: {nome_animal}"
-            )
+    titulo = "Histórico completo de consultas" if incluir_arquivadas else "Suas consultas"
+    print(f"\n=== {titulo} ===")
+    _listar(
+        repo.consultas.listagem_do_tutor(id_dono, incluir_arquivadas),
+        _COLUNAS_CONSULTAS_CLIENTE,
+        "Você ainda não possui consultas cadastradas.",
+    )
 
 
-def cadastrar_novo_animal_cliente(conn: PgConnection, usuario: Dict[str, Any]) -> None:
+def cadastrar_novo_animal_cliente(usuario: Dict[str, Any]) -> None:
     print("\n=== Cadastro de novo animal ===")
 
-    id_dono = obter_id_dono_do_usuario(conn, usuario)
+    id_dono = obter_id_dono_do_usuario(usuario)
     if not id_dono:
         print("Nenhum tutor vinculado ao seu usuário. Fale com a recepção.")
         return
 
-    nm = ler_letras("Nome do animal: ")
-    es = ler_letras("Espécie: ")
-    rc = ler_letras("Raça: ")
-
-    idade_str = ler_numero("Idade (em anos): ")
-    idade = int(idade_str)
-    while idade < 0 or idade > 40:
-        print("Idade estranha... informe uma idade entre 0 e 40 anos.")
-        idade = int(ler_numero("Idade (em anos): "))
+    animal = _ler_dados_animal()
 
     try:
-        with conn.cursor() as c:
-            c.execute(
-                """
-                INSERT INTO animal (nome, especie, raca, idade, id_dono)
-                VALUES (%s,%s,%s,%s,%s)
-                """,
-                (nm, es, rc, idade, id_dono),
-            )
-        conn.commit()
+        repo.animais.criar(animal, id_dono)
+        contexto(usuario).invalidar_animais()
         print("Novo animal cadastrado com sucesso.")
     except Exception as e:
-        conn.rollback()
         print("Erro ao cadastrar novo animal:", e)
 
 
-def atualizar_dados_cliente(conn: PgConnection, usuario: Dict[str, Any]) -> None:
+def atualizar_dados_cliente(usuario: Dict[str, Any]) -> None:
     print("\n=== Atualizar meus dados ===")
 
-    id_dono = obter_id_dono_do_usuario(conn, usuario)
-    if not id_dono:
+    ctx = contexto(usuario)
+    atual = ctx.dono()
+    if not atual:
         print("Nenhum tutor vinculado ao seu usuário. Fale com a recepção.")
         return
 
-    with conn.cursor() as c:
-        c.execute(
-            "SELECT email, endereco, telefone, observacao FROM dono WHERE id_dono = %s",
-            (id_dono,),
-        )
-        row = c.fetchone()
-        if not row:
-            print("Registro de tutor não encontrado.")
-            return
-        email_atual, end_atual, tel_atual, obs_atual = row
-
     print("Deixe em branco para manter o valor atual.")
-    novo_email = input(f"E-mail [{email_atual or '-'}]: ").strip() or email_atual
-    novo_end = input(f"Endereço [{end_atual}]: ").strip() or end_atual
-    novo_tel = input(f"Telefone [{tel_atual}]: ").strip() or tel_atual
-    nova_obs = input(f"Observação [{obs_atual or '-'}]: ").strip() or obs_atual
+    novo = atual._replace(
+        email=input(f"E-mail [{atual.email or '-'}]: ").strip() or atual.email,
+        endereco=input(f"Endereço [{atual.endereco}]: ").strip() or atual.endereco,
+        telefone=input(f"Telefone [{atual.telefone}]: ").strip() or atual.telefone,
+        observacao=input(f"Observação [{atual.observacao or '-'}]: ").strip()
+        or atual.observacao,
+    )
 
     try:
-        with conn.cursor() as c:
-            c.execute(
-                """
-                UPDATE dono
-                SET email = %s, endereco = %s, telefone = %s, observacao = %s
-                WHERE id_dono = %s
-                """,
-                (novo_email, novo_end, novo_tel, nova_obs, id_dono),
-            )
-        conn.commit()
+        repo.donos.atualizar(novo)
+        ctx.invalidar_dono()
         print("Dados atualizados com sucesso.")
     except Exception as e:
-        conn.rollback()
         print("Erro ao atualizar dados:", e)
 
 
-def cancelar_consulta_cliente(conn: PgConnection, usuario: Dict[str, Any]) -> None:
+def cancelar_consulta_cliente(usuario: Dict[str, Any]) -> None:
     print("\n=== Cancelar consulta agendada ===")
 
-    id_dono = obter_id_dono_do_usuario(conn, usuario)
+    id_dono = obter_id_dono_do_usuario(usuario)
     if not id_dono:
         print("Nenhum tutor vinculado ao seu usuário. Fale com a recepção.")
         return
 
-    with conn.cursor() as c:
-        c.execute(
-            """
-            SELECT c.id_consulta, c.data, c.horario, c.status, c.prioridade, a.nome
-            FROM consulta c
-            JOIN animal a ON a.id_animal = c.id_animal
-            WHERE a.id_dono = %s AND c.status = 'agendada'
-            ORDER BY c.data, c.horario;
-            """,
-            (id_dono,),
-        )
-        consultas = c.fetchall()
-
-        if not consultas:
-            print("Você não possui consultas agendadas para cancelar.")
-            return
+    consultas = repo.consultas.agendadas_do_tutor(id_dono)
+    if not consultas:
+        print("Você não possui consultas agendadas para cancelar.")
+        return
 
-        print("\nConsultas agendadas:")
-        for id_consulta, data, horario, status, prioridade, nome_animal in consultas:
-            print(
-                f"[{id_consulta}] {data} {horario} [{status} - {prioridade}] | Animal: {nome_animal}"
-            )
+    print("\nConsultas agendadas:")
+    Tabela(_COLUNAS_CONSULTAS_CLIENTE).escrever(consultas, limite=0)
 
     id_consulta_str = ler_numero("Informe o ID da consulta a cancelar: ")
     id_consulta = int(id_consulta_str)
 
     try:
-        with conn.cursor() as c:
-            c.execute(
-                """
-                UPDATE consulta
-                SET status = 'cancelada'
-                WHERE id_consulta = %s
-                  AND status = 'agendada'
-                  AND id_animal IN (
-                       SELECT id_animal FROM animal WHERE id_dono = %s
-                  );
-                """,
-                (id_consulta, id_dono),
-            )
-            if c.rowcount == 0:
-                print("Não foi possível cancelar. Verifique se o ID é seu e se está agendada.")
-                conn.rollback()
-                return
-        conn.commit()
+        if not repo.consultas.cancelar_do_tutor(id_consulta, id_dono):
+            print("Não foi possível cancelar. Verifique se o ID é seu e se está agendada.")
+            return
         print("Consulta cancelada com sucesso.")
     except Exception as e:
-        conn.rollback()
         print("Erro ao cancelar consulta:", e)
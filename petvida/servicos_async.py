@@ -0,0 +1,178 @@
+"""Versão assíncrona das operações de services.py, para várias sessões num só processo.
+
+Sem input() nem print(): quem chama (um front-end de recepção, um tablet
+do veterinário...) fornece os dados e decide como exibir o resultado.
+O SQL é o mesmo dos repositórios; só a execução muda (pool_async).
+
+Exemplo:
+
+    async def main():
+        usuario = await login("recepcao", senha)
+        consultas = await join_consultas(limite=20)
+
+Cancelar a tarefa (task.cancel(), asyncio.wait_for com timeout) interrompe
+a consulta no servidor e desfaz a transação em andamento.
+"""
+import asyncio
+import datetime
+from typing import Any, Dict, List, Optional, Set
+
+import repositorios as repo
+from config import AGENDA_CONFIG, LISTAGEM_CONFIG
+from pool_async import conexao, executar, transacao
+from repositorios import AnimaisPorTutor, Listagem
+from senhas import gerar_hash_async, precisa_rehash, verificar_async
+
+
+class LoginRecusado(Exception):
+    """Usuário inexistente, senha errada, bloqueado ou de outro tipo."""
+
+
+_em_segundo_plano: Set["asyncio.Task[None]"] = set()
+
+
+async def _pagina(
+    listagem: Listagem,
+    limite: Optional[int] = None,
+    apos: Optional[tuple] = None,
+    voltar: bool = False,
+) -> List[Any]:
+    sql, params = listagem.sql_pagina(limite or LISTAGEM_CONFIG["tamanho_pagina"], apos, voltar)
+    async with conexao() as conn:
+        c = await executar(conn, sql, params)
+        linhas = [listagem.tipo._make(r) for r in c.fetchall()]
+    return linhas[::-1] if voltar else linhas
+
+
+async def _um(sql: str, params: tuple) -> Optional[tuple]:
+    async with conexao() as conn:
+        c = await executar(conn, sql, params)
+        return c.fetchone()
+
+
+# LOGIN
+async def login(
+    username: str, senha: str, tipo_esperado: Optional[str] = None
+) -> Dict[str, Any]:
+    r = await _um(repo.usuarios.POR_USERNAME, (username,))
+    if not r:
+        raise LoginRecusado("Usuário ou senha incorretos.")
+    u = repo.Usuario._make(r)
+
+    if u.bloqueado:
+        raise LoginRecusado(
+            "Usuário bloqueado por muitas tentativas de login. Contate o administrador."
+        )
+
+    if not await verificar_async(senha, u.senha_cripto):
+        await _um(repo.usuarios.REGISTRAR_FALHA, (3, u.id_usuario))
+        raise LoginRecusado("Usuário ou senha incorretos.")
+
+    if tipo_esperado and u.tipo != tipo_esperado:
+        raise LoginRecusado(
+            f"Este usuário é do tipo '{u.tipo}', não '{tipo_esperado}'."
+        )
+
+    async with conexao() as conn:
+        await executar(conn, repo.usuarios.ZERAR_TENTATIVAS, (u.id_usuario,))
+    if precisa_rehash(u.senha_cripto):
+        tarefa = asyncio.ensure_future(_refazer_hash(u.id_usuario, senha))
+        _em_segundo_plano.add(tarefa)  # o loop só guarda referência fraca
+        tarefa.add_done_callback(_em_segundo_plano.discard)
+    return {"id": u.id_usuario, "username": u.username, "tipo": u.tipo}
+
+
+async def _refazer_hash(id_usuario: int, senha: str) -> None:
+    """Regrava o hash com o custo atual; se falhar, tenta no próximo login."""
+    try:
+        novo = await gerar_hash_async(senha)
+        async with conexao() as conn:
+            await executar(conn, repo.usuarios.ALTERAR_SENHA, (novo, id_usuario))
+    except Exception:
+        pass
+
+
+# LISTAGENS: uma página por chamada. `apos` é a chave da última linha recebida,
+# a mesma de Listagem.chave_de (ex.: repo.consultas.listagem().chave_de(linha)).
+async def listar_donos(
+    limite: Optional[int] = None, apos: Optional[tuple] = None, voltar: bool = False
+) -> List[repo.DonoResumo]:
+    return await _pagina(repo.donos.listagem(), limite, apos, voltar)
+
+
+async def listar_animais(
+    limite: Optional[int] = None, apos: Optional[tuple] = None, voltar: bool = False
+) -> List[repo.AnimalComTutor]:
+    return await _pagina(repo.animais.listagem(), limite, apos, voltar)
+
+
+async def relatorio_qtd_animais_por_tutor() -> List[AnimaisPorTutor]:
+    async with conexao() as conn:
+        c = await executar(conn, repo.donos.QTD_ANIMAIS_POR_TUTOR)
+        return [AnimaisPorTutor._make(r) for r in c.fetchall()]
+
+
+async def join_consultas(
+    somente_vet_id: Optional[int] = None,
+    limite: Optional[int] = None,
+    apos: Optional[tuple] = None,
+    voltar: bool = False,
+) -> List[repo.ConsultaResumo]:
+    return await _pagina(repo.consultas.listagem(somente_vet_id), limite, apos, voltar)
+
+
+async def listar_consultas_por_periodo(
+    data_ini: str,
+    data_fim: str,
+    somente_vet_id: Optional[int] = None,
+    limite: Optional[int] = None,
+    apos: Optional[tuple] = None,
+    voltar: bool = False,
+) -> List[repo.ConsultaResumo]:
+    listagem = repo.consultas.listagem(somente_vet_id, data_ini, data_fim)
+    return await _pagina(listagem, limite, apos, voltar)
+
+
+async def horarios_livres(
+    de: datetime.date, ate: datetime.date, id_vet: Optional[int] = None
+) -> List[repo.HorarioLivre]:
+    async with conexao() as conn:
+        c = await executar(
+            conn,
+            repo.consultas.HORARIOS_LIVRES,
+            repo.consultas.params_horarios_livres(de, ate, id_vet),
+        )
+        return [repo.HorarioLivre._make(r) for r in c.fetchall()]
+
+
+# CONSULTAS
+async def cadastrar_consulta(
+    id_animal: int,
+    data: str,
+    horario: str,
+    motivo: str,
+    diagnostico: Optional[str] = None,
+    id_vet: Optional[int] = None,
+) -> int:
+    """AnimalInativo se o animal ou o tutor foi excluído (ou não existe)."""
+    async with transacao() as conn:
+        c = await executar(conn, repo.TRAVAR_ATIVOS, ([id_animal],))
+        repo.conferir_ativos([id_animal], c.fetchall())
+        c = await executar(
+            conn,
+            repo.consultas.INSERIR,
+            (data, horario, motivo, diagnostico, "agendada", "normal", id_animal, id_vet,
+             AGENDA_CONFIG["duracao_minutos"]),
+        )
+        return c.fetchone()[0]
+
+
+async def cancelar_consulta_cliente(usuario: Dict[str, Any], id_consulta: int) -> bool:
+    """Cancela se a consulta está agendada e é de um animal do tutor logado."""
+    async with transacao() as conn:
+        c = await executar(conn, repo.usuarios.ID_DONO, (usuario["id"],))
+        r = c.fetchone()
+        if not r or not r[0]:
+            return False
+        c = await executar(conn, repo.consultas.CANCELAR_DO_TUTOR, (id_consulta, r[0]))
+        return c.rowcount > 0
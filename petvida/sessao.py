@@ -0,0 +1,56 @@
+"""Contexto da sessão do usuário logado.
+
+Criado no login e guardado em usuario["contexto"]. Guarda o que não muda
+sozinho durante a sessão: o tutor vinculado (perfil e id_dono) e a lista
+de animais. Cada item é buscado no banco na primeira vez que uma tela
+precisa dele; as escritas feitas pela própria sessão chamam invalidar_*
+para a próxima leitura buscar de novo.
+
+Mudanças feitas por outra sessão (ex.: a recepção editando o tutor) só
+aparecem depois de uma invalidação ou de um novo login.
+"""
+from typing import Any, Dict, List, Optional
+
+import repositorios as repo
+from repositorios import Animal, Dono
+
+_NAO_CARREGADO: Any = object()
+
+
+class ContextoSessao:
+    __slots__ = ("id_usuario", "_dono", "_animais")
+
+    def __init__(self, id_usuario: int) -> None:
+        self.id_usuario = id_usuario
+        self._dono: Optional[Dono] = _NAO_CARREGADO
+        self._animais: List[Animal] = _NAO_CARREGADO
+
+    def dono(self) -> Optional[Dono]:
+        """Tutor vinculado ao usuário (None se não houver)."""
+        if self._dono is _NAO_CARREGADO:
+            self._dono = repo.donos.do_usuario(self.id_usuario)
+        return self._dono
+
+    def id_dono(self) -> Optional[int]:
+        dono = self.dono()
+        return dono.id_dono if dono else None
+
+    def animais(self) -> List[Animal]:
+        if self._animais is _NAO_CARREGADO:
+            id_dono = self.id_dono()
+            self._animais = repo.donos.animais(id_dono) if id_dono else []
+        return self._animais
+
+    def invalidar_dono(self) -> None:
+        self._dono = _NAO_CARREGADO
+
+    def invalidar_animais(self) -> None:
+        self._animais = _NAO_CARREGADO
+
+
+def contexto(usuario: Dict[str, Any]) -> ContextoSessao:
+    """Contexto do usuário; cria um se o dicionário veio de fora do login()."""
+    ctx = usuario.get("contexto")
+    if ctx is None:
+        ctx = usuario["contexto"] = ContextoSessao(usuario["id"])
+    return ctx
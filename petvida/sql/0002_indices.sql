@@ -0,0 +1,14 @@
+-- petvida: sem-transacao
+-- Índices criados com CONCURRENTLY para não bloquear escritas em tabelas já populadas.
+-- Arquivos "sem-transacao" rodam comando a comando em autocommit: um comando por
+-- bloco terminado em ";" no fim da linha.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_dono_cpf ON dono (cpf);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_consulta_data ON consulta (data);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_animal_dono ON animal (id_dono);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_usuario_username ON usuario (username);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_cirurgia_data ON cirurgia (data);
@@ -0,0 +1,29 @@
+-- petvida: sem-transacao
+-- Índices no formato das consultas: colunas do filtro seguidas das colunas do
+-- ORDER BY da paginação por chave, para o plano ler já na ordem e parar no LIMIT.
+-- Sugeridos por `python main.py --indices`.
+
+-- join_consultas(somente_vet_id=...): WHERE id_vet = ? ORDER BY data, horario, id_consulta DESC
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_consulta_vet_data
+    ON consulta (id_vet, data DESC, horario DESC, id_consulta DESC);
+
+-- join_consultas / listar_consultas_por_periodo: a chave inteira (substitui idx_consulta_data)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_consulta_data_horario
+    ON consulta (data DESC, horario DESC, id_consulta DESC);
+
+DROP INDEX CONCURRENTLY IF EXISTS idx_consulta_data;
+
+-- consultas dos animais do tutor e o ON DELETE CASCADE de animal
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_consulta_animal
+    ON consulta (id_animal, data DESC, horario DESC);
+
+-- cirurgias por animal (e o ON DELETE CASCADE de animal)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_cirurgia_animal ON cirurgia (id_animal, data);
+
+-- JOINs por usuario.id_dono (dados do cliente) e a FK para dono
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_usuario_dono ON usuario (id_dono);
+
+-- duplicavam os índices criados pelas constraints UNIQUE de dono.cpf e usuario.username
+DROP INDEX CONCURRENTLY IF EXISTS idx_dono_cpf;
+
+DROP INDEX CONCURRENTLY IF EXISTS idx_usuario_username;
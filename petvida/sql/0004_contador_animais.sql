@@ -0,0 +1,83 @@
+-- Contador de animais por tutor, mantido por trigger: o relatório de animais
+-- por tutor vira uma leitura de dono, sem JOIN nem GROUP BY.
+
+ALTER TABLE dono ADD COLUMN IF NOT EXISTS total_animais INT NOT NULL DEFAULT 0;
+
+-- Triggers por comando (não por linha), com tabelas de transição: uma
+-- importação em massa atualiza cada tutor uma vez por comando.
+CREATE OR REPLACE FUNCTION atualizar_total_animais() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    ids  INT[];
+    qtds INT[];
+BEGIN
+    -- cada ramo só cita as tabelas de transição que o seu trigger declara
+    IF TG_OP = 'INSERT' THEN
+        SELECT array_agg(id_dono ORDER BY id_dono), array_agg(qtd ORDER BY id_dono)
+        INTO ids, qtds
+        FROM (SELECT id_dono, count(*)::int AS qtd FROM novos GROUP BY id_dono) m;
+    ELSIF TG_OP = 'DELETE' THEN
+        SELECT array_agg(id_dono ORDER BY id_dono), array_agg(qtd ORDER BY id_dono)
+        INTO ids, qtds
+        FROM (SELECT id_dono, -count(*)::int AS qtd FROM antigos GROUP BY id_dono) m;
+    ELSE
+        -- troca de tutor: -1 no antigo e +1 no novo; outras edições não mudam nada
+        SELECT array_agg(id_dono ORDER BY id_dono), array_agg(qtd ORDER BY id_dono)
+        INTO ids, qtds
+        FROM (
+            SELECT id_dono, sum(qtd)::int AS qtd
+            FROM (
+                SELECT n.id_dono, 1 AS qtd
+                FROM novos n JOIN antigos o USING (id_animal)
+                WHERE n.id_dono <> o.id_dono
+                UNION ALL
+                SELECT o.id_dono, -1
+                FROM novos n JOIN antigos o USING (id_animal)
+                WHERE n.id_dono <> o.id_dono
+            ) trocas
+            GROUP BY id_dono
+        ) m;
+    END IF;
+
+    IF ids IS NULL THEN
+        RETURN NULL;
+    END IF;
+
+    -- trava os tutores sempre na mesma ordem: importações paralelas não entram em deadlock
+    PERFORM 1 FROM dono WHERE id_dono = ANY (ids) ORDER BY id_dono FOR NO KEY UPDATE;
+
+    UPDATE dono d
+    SET total_animais = d.total_animais + m.qtd
+    FROM unnest(ids, qtds) AS m(id_dono, qtd)
+    WHERE d.id_dono = m.id_dono;
+
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS animal_total_ins ON animal;
+CREATE TRIGGER animal_total_ins
+    AFTER INSERT ON animal
+    REFERENCING NEW TABLE AS novos
+    FOR EACH STATEMENT EXECUTE FUNCTION atualizar_total_animais();
+
+DROP TRIGGER IF EXISTS animal_total_del ON animal;
+CREATE TRIGGER animal_total_del
+    AFTER DELETE ON animal
+    REFERENCING OLD TABLE AS antigos
+    FOR EACH STATEMENT EXECUTE FUNCTION atualizar_total_animais();
+
+DROP TRIGGER IF EXISTS animal_total_upd ON animal;
+CREATE TRIGGER animal_total_upd
+    AFTER UPDATE ON animal
+    REFERENCING OLD TABLE AS antigos NEW TABLE AS novos
+    FOR EACH STATEMENT EXECUTE FUNCTION atualizar_total_animais();
+
+-- carga inicial; os triggers já existem e o CREATE TRIGGER bloqueia escritas em
+-- animal até o fim da migração, então nenhuma inserção escapa da contagem
+UPDATE dono d
+SET total_animais = contagem.qtd
+FROM (
+    SELECT id_dono, count(*) AS qtd FROM animal GROUP BY id_dono
+) contagem
+WHERE d.id_dono = contagem.id_dono;
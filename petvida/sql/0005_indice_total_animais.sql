@@ -0,0 +1,5 @@
+-- petvida: sem-transacao
+-- Ordem do relatório de animais por tutor, lida direto do índice.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_dono_total_animais
+    ON dono (total_animais DESC, nome);
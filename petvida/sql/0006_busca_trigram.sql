@@ -0,0 +1,20 @@
+-- petvida: sem-transacao
+-- Busca por trecho de nome, CPF ou telefone (seletor das telas de edição e
+-- exclusão). Índices GIN de trigramas atendem ILIKE '%trecho%' sem varrer a tabela.
+-- A extensão fica em public, que está no search_path de todo schema do PetVida:
+-- apagar um schema (ex.: o do benchmark) não leva a extensão junto.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm WITH SCHEMA public;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_animal_nome_trgm
+    ON animal USING gin (nome gin_trgm_ops);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_dono_nome_trgm
+    ON dono USING gin (nome gin_trgm_ops);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_dono_telefone_trgm
+    ON dono USING gin (telefone gin_trgm_ops);
+
+-- trecho de CPF; o CPF completo usa o índice da constraint UNIQUE
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_dono_cpf_trgm
+    ON dono USING gin (cpf gin_trgm_ops);
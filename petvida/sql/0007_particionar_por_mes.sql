@@ -0,0 +1,119 @@
+-- consulta e cirurgia particionadas por mês (RANGE em data). Consultas por
+-- período só leem as partições do intervalo, e meses antigos podem ser
+-- desanexados, movidos de tablespace ou apagados sem DELETE.
+--
+-- A migração copia as linhas para as tabelas novas numa única transação e
+-- bloqueia consulta e cirurgia enquanto roda: aplique fora do expediente.
+
+-- Cria as partições mensais de `tabela` que faltam entre os meses de `de` e
+-- `ate` (inclusive). Linhas desses meses que tenham caído na partição padrão
+-- são movidas para a partição nova antes do ATTACH.
+CREATE OR REPLACE FUNCTION criar_particoes_mensais(tabela TEXT, de DATE, ate DATE)
+RETURNS INT
+LANGUAGE plpgsql AS $$
+DECLARE
+    mes     DATE := date_trunc('month', de)::date;
+    proximo DATE;
+    nome    TEXT;
+    criadas INT := 0;
+BEGIN
+    WHILE mes <= ate LOOP
+        proximo := (mes + INTERVAL '1 month')::date;
+        nome := format('%s_%s', tabela, to_char(mes, 'YYYY_MM'));
+        IF to_regclass(nome) IS NULL THEN
+            EXECUTE format(
+                'CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+                nome, tabela
+            );
+            EXECUTE format(
+                'WITH movidas AS (DELETE FROM %I WHERE data >= %L AND data < %L RETURNING *) '
+                'INSERT INTO %I SELECT * FROM movidas',
+                tabela || '_padrao', mes, proximo, nome
+            );
+            EXECUTE format(
+                'ALTER TABLE %I ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                tabela, nome, mes, proximo
+            );
+            criadas := criadas + 1;
+        END IF;
+        mes := proximo;
+    END LOOP;
+    RETURN criadas;
+END;
+$$;
+
+-- CONSULTA
+ALTER TABLE consulta RENAME TO consulta_antiga;
+ALTER TABLE consulta_antiga RENAME CONSTRAINT consulta_pkey TO consulta_antiga_pkey;
+
+-- a chave primária de uma tabela particionada precisa conter a coluna de partição
+CREATE TABLE consulta (
+    id_consulta  INT          NOT NULL DEFAULT nextval('consulta_id_consulta_seq'),
+    data         DATE         NOT NULL,
+    horario      TIME         NOT NULL,
+    motivo       VARCHAR(200) NOT NULL,
+    diagnostico  VARCHAR(400),
+    status       VARCHAR(20)  DEFAULT 'agendada',
+    prioridade   VARCHAR(20)  DEFAULT 'normal',
+    id_animal    INT          NOT NULL REFERENCES animal(id_animal) ON DELETE CASCADE,
+    id_vet       INT REFERENCES usuario(id_usuario),
+    criado_em    TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id_consulta, data)
+) PARTITION BY RANGE (data);
+
+-- recebe datas fora das partições mensais (ex.: agendamento muito adiante)
+CREATE TABLE consulta_padrao PARTITION OF consulta DEFAULT;
+
+SELECT criar_particoes_mensais(
+    'consulta',
+    coalesce((SELECT min(data) FROM consulta_antiga), current_date),
+    greatest((SELECT max(data) FROM consulta_antiga), current_date + 90)
+);
+
+INSERT INTO consulta (id_consulta, data, horario, motivo, diagnostico, status,
+                      prioridade, id_animal, id_vet, criado_em)
+SELECT id_consulta, data, horario, motivo, diagnostico, status,
+       prioridade, id_animal, id_vet, criado_em
+FROM consulta_antiga;
+
+ALTER SEQUENCE consulta_id_consulta_seq OWNED BY consulta.id_consulta;
+DROP TABLE consulta_antiga;
+
+-- mesmos índices da 0003, agora criados em todas as partições
+CREATE INDEX idx_consulta_vet_data ON consulta (id_vet, data DESC, horario DESC, id_consulta DESC);
+CREATE INDEX idx_consulta_data_horario ON consulta (data DESC, horario DESC, id_consulta DESC);
+CREATE INDEX idx_consulta_animal ON consulta (id_animal, data DESC, horario DESC);
+
+-- CIRURGIA
+ALTER TABLE cirurgia RENAME TO cirurgia_antiga;
+ALTER TABLE cirurgia_antiga RENAME CONSTRAINT cirurgia_pkey TO cirurgia_antiga_pkey;
+
+CREATE TABLE cirurgia (
+    id_cirurgia   INT          NOT NULL DEFAULT nextval('cirurgia_id_cirurgia_seq'),
+    data          DATE         NOT NULL,
+    tipo_cirurgia VARCHAR(120) NOT NULL,
+    observacoes   VARCHAR(500),
+    status        VARCHAR(20) DEFAULT 'agendada',
+    id_animal     INT NOT NULL REFERENCES animal(id_animal) ON DELETE CASCADE,
+    criado_em     TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id_cirurgia, data)
+) PARTITION BY RANGE (data);
+
+CREATE TABLE cirurgia_padrao PARTITION OF cirurgia DEFAULT;
+
+SELECT criar_particoes_mensais(
+    'cirurgia',
+    coalesce((SELECT min(data) FROM cirurgia_antiga), current_date),
+    greatest((SELECT max(data) FROM cirurgia_antiga), current_date + 90)
+);
+
+INSERT INTO cirurgia (id_cirurgia, data, tipo_cirurgia, observacoes, status,
+                      id_animal, criado_em)
+SELECT id_cirurgia, data, tipo_cirurgia, observacoes, status, id_animal, criado_em
+FROM cirurgia_antiga;
+
+ALTER SEQUENCE cirurgia_id_cirurgia_seq OWNED BY cirurgia.id_cirurgia;
+DROP TABLE cirurgia_antiga;
+
+CREATE INDEX idx_cirurgia_data ON cirurgia (data);
+CREATE INDEX idx_cirurgia_animal ON cirurgia (id_animal, data);
@@ -0,0 +1,34 @@
+-- Arquivo de consultas e cirurgias encerradas (realizada/cancelada) antigas.
+-- O job de arquivamento (`python main.py --arquivar`) move as linhas em lotes;
+-- as tabelas quentes ficam só com o movimento recente.
+
+CREATE TABLE IF NOT EXISTS consulta_arquivo (
+    id_consulta  INT PRIMARY KEY,
+    data         DATE         NOT NULL,
+    horario      TIME         NOT NULL,
+    motivo       VARCHAR(200) NOT NULL,
+    diagnostico  VARCHAR(400),
+    status       VARCHAR(20),
+    prioridade   VARCHAR(20),
+    id_animal    INT NOT NULL REFERENCES animal(id_animal) ON DELETE CASCADE,
+    id_vet       INT REFERENCES usuario(id_usuario),
+    criado_em    TIMESTAMP,
+    arquivada_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- histórico do tutor (mesma ordem de idx_consulta_animal) e ON DELETE de animal
+CREATE INDEX IF NOT EXISTS idx_consulta_arquivo_animal
+    ON consulta_arquivo (id_animal, data DESC, horario DESC);
+
+CREATE TABLE IF NOT EXISTS cirurgia_arquivo (
+    id_cirurgia   INT PRIMARY KEY,
+    data          DATE         NOT NULL,
+    tipo_cirurgia VARCHAR(120) NOT NULL,
+    observacoes   VARCHAR(500),
+    status        VARCHAR(20),
+    id_animal     INT NOT NULL REFERENCES animal(id_animal) ON DELETE CASCADE,
+    criado_em     TIMESTAMP,
+    arquivada_em  TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_cirurgia_arquivo_animal ON cirurgia_arquivo (id_animal, data);
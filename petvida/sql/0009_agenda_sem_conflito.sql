@@ -0,0 +1,98 @@
+-- Duração de cada consulta e restrição de exclusão: o mesmo veterinário não
+-- pode ter duas consultas (não canceladas) com horários sobrepostos. Quem
+-- garante é o índice GiST, inclusive entre agendamentos simultâneos.
+--
+-- Consultas do mesmo dia ficam sempre na mesma partição (0007), então a
+-- restrição é criada em cada partição; criar_particoes_mensais() copia as
+-- restrições de exclusão da partição padrão para as partições novas.
+CREATE EXTENSION IF NOT EXISTS btree_gist WITH SCHEMA public;
+
+ALTER TABLE consulta ADD COLUMN duracao_minutos SMALLINT NOT NULL DEFAULT 30
+    CHECK (duracao_minutos > 0);
+ALTER TABLE consulta_arquivo ADD COLUMN duracao_minutos SMALLINT NOT NULL DEFAULT 30;
+
+-- Com sobreposições já gravadas a restrição não pode ser criada: aborta com a
+-- lista para a recepção remarcar (nada desta migração fica aplicado).
+DO $$
+DECLARE
+    conflitos TEXT;
+BEGIN
+    SELECT string_agg(format('vet %s em %s: consultas %s e %s',
+                             a.id_vet, a.data, a.id_consulta, b.id_consulta), E'\n')
+    INTO conflitos
+    FROM consulta a
+    JOIN consulta b
+      ON b.id_vet = a.id_vet AND b.data = a.data AND b.id_consulta > a.id_consulta
+     AND b.status <> 'cancelada'
+     AND b.horario < a.horario + make_interval(mins => a.duracao_minutos)
+     AND a.horario < b.horario + make_interval(mins => b.duracao_minutos)
+    WHERE a.status <> 'cancelada';
+
+    IF conflitos IS NOT NULL THEN
+        RAISE EXCEPTION E'Consultas sobrepostas; remarque antes de migrar:\n%', conflitos;
+    END IF;
+END;
+$$;
+
+DO $$
+DECLARE
+    particao REGCLASS;
+BEGIN
+    FOR particao IN
+        SELECT inhrelid::regclass FROM pg_inherits WHERE inhparent = 'consulta'::regclass
+    LOOP
+        EXECUTE format(
+            'ALTER TABLE %s ADD CONSTRAINT %I EXCLUDE USING gist ('
+            '  id_vet WITH =, '
+            '  tsrange(data + horario, data + horario + make_interval(mins => duracao_minutos::int)) WITH &&'
+            ') WHERE (status <> ''cancelada'')',
+            particao, particao::text || '_sem_conflito'
+        );
+    END LOOP;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION criar_particoes_mensais(tabela TEXT, de DATE, ate DATE)
+RETURNS INT
+LANGUAGE plpgsql AS $$
+DECLARE
+    mes       DATE := date_trunc('month', de)::date;
+    proximo   DATE;
+    nome      TEXT;
+    restricao RECORD;
+    criadas   INT := 0;
+BEGIN
+    WHILE mes <= ate LOOP
+        proximo := (mes + INTERVAL '1 month')::date;
+        nome := format('%s_%s', tabela, to_char(mes, 'YYYY_MM'));
+        IF to_regclass(nome) IS NULL THEN
+            EXECUTE format(
+                'CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+                nome, tabela
+            );
+            -- restrições que só existem por partição (EXCLUDE), copiadas da padrão
+            FOR restricao IN
+                SELECT replace(conname, tabela || '_padrao', nome) AS nome,
+                       pg_get_constraintdef(oid) AS definicao
+                FROM pg_constraint
+                WHERE conrelid = to_regclass(tabela || '_padrao') AND contype = 'x'
+            LOOP
+                EXECUTE format('ALTER TABLE %I ADD CONSTRAINT %I %s',
+                               nome, restricao.nome, restricao.definicao);
+            END LOOP;
+            EXECUTE format(
+                'WITH movidas AS (DELETE FROM %I WHERE data >= %L AND data < %L RETURNING *) '
+                'INSERT INTO %I SELECT * FROM movidas',
+                tabela || '_padrao', mes, proximo, nome
+            );
+            EXECUTE format(
+                'ALTER TABLE %I ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                tabela, nome, mes, proximo
+            );
+            criadas := criadas + 1;
+        END IF;
+        mes := proximo;
+    END LOOP;
+    RETURN criadas;
+END;
+$$;
@@ -0,0 +1,81 @@
+-- Exclusão lógica de tutores e animais: o menu só preenche excluido_em (a
+-- exclusão pode ser desfeita) e `python main.py --purgar` apaga depois, em
+-- lotes pequenos, as consultas, cirurgias e o próprio cadastro (purga.py).
+-- em_purga marca o que a purga já começou a apagar: não pode mais voltar.
+--
+-- Colunas sem padrão ou com padrão constante: o ALTER não reescreve a tabela.
+ALTER TABLE dono
+    ADD COLUMN IF NOT EXISTS excluido_em TIMESTAMP,
+    ADD COLUMN IF NOT EXISTS em_purga BOOLEAN NOT NULL DEFAULT FALSE;
+
+ALTER TABLE animal
+    ADD COLUMN IF NOT EXISTS excluido_em TIMESTAMP,
+    ADD COLUMN IF NOT EXISTS em_purga BOOLEAN NOT NULL DEFAULT FALSE;
+
+-- a lixeira do menu e a purga só leem as linhas excluídas
+CREATE INDEX IF NOT EXISTS idx_dono_excluido ON dono (excluido_em)
+    WHERE excluido_em IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_animal_excluido ON animal (excluido_em)
+    WHERE excluido_em IS NOT NULL;
+
+-- total_animais (0004) passa a contar só animais não excluídos: excluir e
+-- desfazer mudam o contador, e a purga de um animal já excluído não.
+CREATE OR REPLACE FUNCTION atualizar_total_animais() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    ids  INT[];
+    qtds INT[];
+BEGIN
+    -- cada ramo só cita as tabelas de transição que o seu trigger declara
+    IF TG_OP = 'INSERT' THEN
+        SELECT array_agg(id_dono ORDER BY id_dono), array_agg(qtd ORDER BY id_dono)
+        INTO ids, qtds
+        FROM (
+            SELECT id_dono, count(*)::int AS qtd FROM novos
+            WHERE excluido_em IS NULL GROUP BY id_dono
+        ) m;
+    ELSIF TG_OP = 'DELETE' THEN
+        SELECT array_agg(id_dono ORDER BY id_dono), array_agg(qtd ORDER BY id_dono)
+        INTO ids, qtds
+        FROM (
+            SELECT id_dono, -count(*)::int AS qtd FROM antigos
+            WHERE excluido_em IS NULL GROUP BY id_dono
+        ) m;
+    ELSE
+        -- troca de tutor, exclusão ou desfazer: -1 onde o animal contava antes
+        -- e +1 onde conta agora; outras edições não mudam nada
+        SELECT array_agg(id_dono ORDER BY id_dono), array_agg(qtd ORDER BY id_dono)
+        INTO ids, qtds
+        FROM (
+            SELECT id_dono, sum(qtd)::int AS qtd
+            FROM (
+                SELECT n.id_dono, 1 AS qtd
+                FROM novos n JOIN antigos o USING (id_animal)
+                WHERE n.excluido_em IS NULL
+                  AND (o.excluido_em IS NOT NULL OR n.id_dono <> o.id_dono)
+                UNION ALL
+                SELECT o.id_dono, -1
+                FROM novos n JOIN antigos o USING (id_animal)
+                WHERE o.excluido_em IS NULL
+                  AND (n.excluido_em IS NOT NULL OR n.id_dono <> o.id_dono)
+            ) trocas
+            GROUP BY id_dono
+            HAVING sum(qtd) <> 0
+        ) m;
+    END IF;
+
+    IF ids IS NULL THEN
+        RETURN NULL;
+    END IF;
+
+    -- trava os tutores sempre na mesma ordem: importações paralelas não entram em deadlock
+    PERFORM 1 FROM dono WHERE id_dono = ANY (ids) ORDER BY id_dono FOR NO KEY UPDATE;
+
+    UPDATE dono d
+    SET total_animais = d.total_animais + m.qtd
+    FROM unnest(ids, qtds) AS m(id_dono, qtd)
+    WHERE d.id_dono = m.id_dono;
+
+    RETURN NULL;
+END;
+$$;
@@ -0,0 +1,19 @@
+-- Bancos migrados antes da correção de 0006 e 0009 têm pg_trgm e btree_gist
+-- no primeiro schema do search_path da época (petvida ou o do benchmark).
+-- Aqui as duas vão para public: os índices continuam valendo (apontam para
+-- as classes de operadores pelo OID) e um DROP SCHEMA ... CASCADE de outro
+-- schema não as apaga mais.
+DO $$
+DECLARE
+    ext TEXT;
+BEGIN
+    FOR ext IN
+        SELECT e.extname
+        FROM pg_extension e
+        JOIN pg_namespace n ON n.oid = e.extnamespace
+        WHERE e.extname IN ('pg_trgm', 'btree_gist') AND n.nspname <> 'public'
+    LOOP
+        EXECUTE format('ALTER EXTENSION %I SET SCHEMA public', ext);
+    END LOOP;
+END;
+$$;
@@ -0,0 +1,8 @@
+-- O CPF de um tutor excluído (0010) não impede um novo cadastro com o mesmo
+-- CPF: a unicidade passa a valer só entre os tutores não excluídos. Desfazer
+-- a exclusão de um tutor cujo CPF já foi recadastrado falha com o índice.
+-- As buscas por CPF já filtram excluido_em IS NULL e usam este índice.
+CREATE UNIQUE INDEX IF NOT EXISTS idx_dono_cpf_ativo ON dono (cpf)
+    WHERE excluido_em IS NULL;
+
+ALTER TABLE dono DROP CONSTRAINT IF EXISTS dono_cpf_key;
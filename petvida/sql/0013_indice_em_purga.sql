@@ -0,0 +1,10 @@
+-- petvida: sem-transacao
+-- A purga (purga.py) lê uma vez por rodada os tutores e animais marcados
+-- com em_purga. São poucas linhas, apagadas logo depois: índices parciais
+-- pequenos evitam varrer dono e animal inteiros.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_dono_em_purga ON dono (id_dono)
+    WHERE em_purga;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_animal_em_purga ON animal (id_animal)
+    WHERE em_purga;
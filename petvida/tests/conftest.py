@@ -0,0 +1,55 @@
+"""Configuração comum dos testes (`python -m pytest` a partir da raiz).
+
+Os módulos do PetVida usam imports planos (rodam de dentro de petvida/),
+então a pasta entra no sys.path. Os testes que precisam de um PostgreSQL
+de verdade usam a fixture `banco` (ou `banco_async`, para servicos_async):
+com PETVIDA_TESTE_DSN definida, as migrações são aplicadas num schema
+descartável; sem ela, esses testes são pulados.
+"""
+import os
+import sys
+import uuid
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture
+def banco():
+    """Pool global apontando para um schema novo, já migrado; apagado no fim."""
+    dsn = os.environ.get("PETVIDA_TESTE_DSN")
+    if not dsn:
+        pytest.skip("defina PETVIDA_TESTE_DSN para os testes com banco")
+
+    import pool
+    from migracoes import aplicar_migracoes
+    from psycopg2 import sql
+
+    esquema = f"petvida_teste_{uuid.uuid4().hex[:8]}"
+    pool.fechar_pool()
+    pool.obter_pool({"dsn": dsn, "options": f"-c search_path={esquema},public"})
+    try:
+        assert aplicar_migracoes(esquema)
+        yield esquema
+    finally:
+        with pool.conexao() as conn, conn.cursor() as c:
+            c.execute(sql.SQL("DROP SCHEMA IF EXISTS {} CASCADE").format(sql.Identifier(esquema)))
+            conn.commit()
+        pool.fechar_pool()
+
+
+@pytest.fixture
+def banco_async(banco):
+    """Pool assíncrono no mesmo schema da fixture `banco`."""
+    import pool_async
+
+    pool_async.fechar_pool()
+    pool_async.obter_pool(
+        {"dsn": os.environ["PETVIDA_TESTE_DSN"], "options": f"-c search_path={banco},public"}
+    )
+    try:
+        yield banco
+    finally:
+        pool_async.fechar_pool()
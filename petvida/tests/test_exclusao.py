@@ -0,0 +1,206 @@
+"""Exclusão lógica, desfazer e purga (migrações 0010 e 0012).
+
+`_exigir_ativos` roda contra um cursor falso; o resto usa a fixture
+`banco` e é pulado sem PETVIDA_TESTE_DSN.
+"""
+import asyncio
+import datetime
+
+import pytest
+from psycopg2.errors import UniqueViolation
+
+import purga
+import servicos_async
+from pool import conexao
+from repositorios import (
+    AnimalInativo,
+    NovoAnimal,
+    RepositorioAnimal,
+    RepositorioConsulta,
+    RepositorioDono,
+    _exigir_ativos,
+)
+
+
+class CursorFalso:
+    """Devolve como ativos só os IDs em `ativos`."""
+
+    def __init__(self, ativos):
+        self.ativos = set(ativos)
+        self.linhas = []
+        self.executados = []
+
+    def execute(self, sql, params):
+        self.executados.append((sql, params))
+        self.linhas = [(i,) for i in params[0] if i in self.ativos]
+
+    def __iter__(self):
+        return iter(self.linhas)
+
+
+def test_exigir_ativos_aceita_todos_ativos():
+    c = CursorFalso({1, 2})
+    _exigir_ativos(c, [1, 2])
+    sql, params = c.executados[0]
+    assert "FOR SHARE OF a, d" in sql
+    assert params == ([1, 2],)
+
+
+def test_exigir_ativos_lista_os_que_faltam():
+    c = CursorFalso({2})
+    with pytest.raises(AnimalInativo, match=r"ID 1, 3"):
+        _exigir_ativos(c, (3, 1, 2))
+
+
+# --- com banco ---------------------------------------------------------------
+
+def _novo_dono(cpf, nome="Ana"):
+    with conexao() as conn, conn.cursor() as c:
+        c.execute(
+            """
+            INSERT INTO dono (nome, cpf, email, endereco, telefone)
+            VALUES (%s,%s,NULL,'Rua 1','11999990000') RETURNING id_dono
+            """,
+            (nome, cpf),
+        )
+        id_dono = c.fetchone()[0]
+        conn.commit()
+    return id_dono
+
+
+def _total_animais(id_dono):
+    with conexao() as conn, conn.cursor() as c:
+        c.execute("SELECT total_animais FROM dono WHERE id_dono = %s", (id_dono,))
+        return c.fetchone()[0]
+
+
+def _recuar_exclusao(tabela, chave, id_, horas):
+    with conexao() as conn, conn.cursor() as c:
+        c.execute(
+            f"UPDATE {tabela} SET excluido_em = now() - make_interval(hours => %s) "
+            f"WHERE {chave} = %s",
+            (horas, id_),
+        )
+        conn.commit()
+
+
+@pytest.fixture
+def tutor(banco):
+    id_dono = _novo_dono("11122233344")
+    id_animal = RepositorioAnimal().criar(NovoAnimal("Rex", "cão", "vira-lata", 3), id_dono)
+    return id_dono, id_animal
+
+
+def test_excluir_e_restaurar_animal(tutor):
+    id_dono, id_animal = tutor
+    animais = RepositorioAnimal()
+    assert _total_animais(id_dono) == 1
+
+    assert animais.excluir(id_animal)
+    assert not animais.excluir(id_animal)
+    assert animais.obter(id_animal) is None
+    assert [e.id for e in animais.excluidos()] == [id_animal]
+    assert _total_animais(id_dono) == 0
+
+    assert animais.restaurar(id_animal)
+    assert not animais.restaurar(id_animal)
+    assert animais.obter(id_animal) is not None
+    assert animais.excluidos() == []
+    assert _total_animais(id_dono) == 1
+
+
+def test_excluir_tutor_esconde_os_animais(tutor):
+    id_dono, id_animal = tutor
+    donos = RepositorioDono()
+
+    assert donos.excluir(id_dono)
+    assert donos.obter(id_dono) is None
+    assert donos.buscar_por_cpf("11122233344") is None
+    assert RepositorioAnimal().obter(id_animal) is None
+    # o animal volta com o tutor, não sozinho
+    assert RepositorioAnimal().excluidos() == []
+    assert [e.id for e in donos.excluidos()] == [id_dono]
+
+    assert donos.restaurar(id_dono)
+    assert RepositorioAnimal().obter(id_animal) is not None
+
+
+def test_nao_agenda_para_animal_ou_tutor_excluido(tutor):
+    id_dono, id_animal = tutor
+    consultas = RepositorioConsulta()
+    data = (datetime.date.today() + datetime.timedelta(days=7)).isoformat()
+
+    RepositorioAnimal().excluir(id_animal)
+    with pytest.raises(AnimalInativo):
+        consultas.criar(id_animal, data, "10:00", "retorno")
+    RepositorioAnimal().restaurar(id_animal)
+
+    RepositorioDono().excluir(id_dono)
+    with pytest.raises(AnimalInativo):
+        consultas.criar(id_animal, data, "10:00", "retorno")
+    RepositorioDono().restaurar(id_dono)
+
+    assert consultas.criar(id_animal, data, "10:00", "retorno") > 0
+
+
+def test_agendamento_assincrono_recusa_animal_excluido(tutor, banco_async):
+    _, id_animal = tutor
+    data = (datetime.date.today() + datetime.timedelta(days=7)).isoformat()
+    RepositorioAnimal().excluir(id_animal)
+
+    with pytest.raises(AnimalInativo):
+        asyncio.run(servicos_async.cadastrar_consulta(id_animal, data, "10:00", "retorno"))
+    with conexao() as conn, conn.cursor() as c:
+        c.execute("SELECT count(*) FROM consulta WHERE id_animal = %s", (id_animal,))
+        assert c.fetchone()[0] == 0
+
+
+def test_cancelar_ignora_consulta_de_animal_excluido(tutor):
+    _, id_animal = tutor
+    consultas = RepositorioConsulta()
+    data = (datetime.date.today() + datetime.timedelta(days=7)).isoformat()
+    id_consulta = consultas.criar(id_animal, data, "10:00", "retorno")
+
+    RepositorioAnimal().excluir(id_animal)
+    assert not consultas.cancelar(id_consulta)
+
+    RepositorioAnimal().restaurar(id_animal)
+    assert consultas.cancelar(id_consulta)
+
+
+def test_cpf_de_tutor_excluido_pode_ser_recadastrado(tutor):
+    id_dono, _ = tutor
+    donos = RepositorioDono()
+    donos.excluir(id_dono)
+
+    id_novo = _novo_dono("11122233344", nome="Bia")
+    assert donos.buscar_por_cpf("11122233344").id_dono == id_novo
+
+    # com o CPF de volta em uso, o antigo não pode ser restaurado
+    with pytest.raises(UniqueViolation):
+        donos.restaurar(id_dono)
+    assert donos.obter(id_dono) is None
+
+
+def test_purga_fecha_o_desfazer_e_apaga(tutor):
+    id_dono, id_animal = tutor
+    donos = RepositorioDono()
+    data = (datetime.date.today() + datetime.timedelta(days=7)).isoformat()
+    RepositorioConsulta().criar(id_animal, data, "10:00", "retorno")
+    donos.excluir(id_dono)
+
+    # ainda dentro da carência: nada entra na purga
+    assert purga.marcar(24) == {"dono": 0, "animal": 0}
+
+    _recuar_exclusao("dono", "id_dono", id_dono, 48)
+    assert purga.marcar(24) == {"dono": 1, "animal": 0}
+    assert donos.excluidos() == []
+    assert not donos.restaurar(id_dono)
+
+    apagadas = purga.purgar(24)
+    assert apagadas["consulta"] == 1
+    assert apagadas["animal"] == 1
+    assert apagadas["dono"] == 1
+    with conexao() as conn, conn.cursor() as c:
+        c.execute("SELECT count(*) FROM dono WHERE id_dono = %s", (id_dono,))
+        assert c.fetchone()[0] == 0
@@ -0,0 +1,173 @@
+"""Importação por COPY: validação das linhas, blocos e o fluxo enviado ao COPY."""
+import csv
+import io
+from contextlib import contextmanager
+
+import pytest
+
+import importacao
+from importacao import FluxoCopy, _blocos, _importar_bloco
+
+CABECALHO_TUTORES = "nome,cpf,email,endereco,telefone\n"
+
+
+@pytest.mark.parametrize(
+    "linha, motivo",
+    [
+        ({"nome": "Ana Souza", "cpf": "12345678901", "endereco": "Rua A", "telefone": "11999990000"}, None),
+        ({"nome": "Ana 2", "cpf": "12345678901", "endereco": "Rua A", "telefone": "11999990000"}, "nome"),
+        ({"nome": "Ana", "cpf": "123.456.789-01", "endereco": "Rua A", "telefone": "11999990000"}, "CPF"),
+        ({"nome": "Ana", "cpf": "12345678901", "endereco": "", "telefone": "11999990000"}, "endereço"),
+        ({"nome": "Ana", "cpf": "12345678901", "endereco": "Rua A", "telefone": "1234"}, "telefone"),
+        ({"nome": "Ana " * 31, "cpf": "12345678901", "endereco": "Rua A", "telefone": "11999990000"}, "120"),
+        ({"nome": "Ana", "cpf": "12345678901", "endereco": "R" * 201, "telefone": "11999990000"}, "200"),
+        ({"nome": "Ana", "cpf": "12345678901", "endereco": "Rua A", "telefone": "1" * 31}, "30"),
+    ],
+)
+def test_validar_tutor(linha, motivo):
+    resultado = importacao._validar_tutor(linha)
+    assert resultado is None if motivo is None else motivo in resultado
+
+
+@pytest.mark.parametrize(
+    "campo, valor, motivo",
+    [("raca", "", "raca"), ("idade", "41", "idade"), ("idade", "-1", "idade"), ("idade", "²", "idade"),
+     ("cpf_dono", "1", "CPF"), ("especie", "Gato" * 16, "60"), ("raca", "Persa" * 17, "80")],
+)
+def test_validar_animal(campo, valor, motivo):
+    linha = {"nome": "Rex", "especie": "Cachorro", "raca": "Vira lata", "idade": "3",
+             "cpf_dono": "12345678901"}
+    assert importacao._validar_animal(linha) is None
+    linha[campo] = valor
+    assert motivo in importacao._validar_animal(linha)
+
+
+def test_fluxo_copy_respeita_o_tamanho_pedido():
+    linhas = [(i, f"nome {i}", "a,b") for i in range(50)]
+    fluxo = FluxoCopy(iter(linhas))
+    partes = []
+    while True:
+        parte = fluxo.read(37)
+        if not parte:
+            break
+        assert len(parte) <= 37
+        partes.append(parte)
+    assert list(csv.reader(io.StringIO("".join(partes)))) == [
+        [str(i), f"nome {i}", "a,b"] for i in range(50)
+    ]
+
+
+def test_blocos_cobrem_o_arquivo_e_numeram_as_linhas(tmp_path):
+    caminho = tmp_path / "t.csv"
+    caminho.write_bytes(("﻿Nome, CPF\n" + "".join(f"n{i},{i}\n" for i in range(7))).encode())
+
+    cabecalho, blocos = _blocos(caminho, 3)
+    assert cabecalho == ["nome", "cpf"]
+    assert [b[2] for b in blocos] == [2, 5, 8]
+    dados = caminho.read_bytes()
+    assert b"".join(dados[i:f] for i, f, _ in blocos) == dados[dados.index(b"\n") + 1:]
+
+
+class CursorCopy:
+    """Guarda o que o COPY leu; o merge "insere" todas as linhas copiadas,
+    menos as de `orfaos` (animais cujo tutor não existe)."""
+
+    def __init__(self, orfaos=()):
+        self.copiado = ""
+        self.rowcount = 0
+        self.orfaos = list(orfaos)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        if sql.strip().startswith("INSERT"):
+            self.rowcount = len(self.copiado.splitlines()) - len(self.orfaos)
+
+    def copy_expert(self, sql, arquivo):
+        while True:
+            parte = arquivo.read(8192)
+            if not parte:
+                break
+            self.copiado += parte
+
+    def fetchall(self):
+        return self.orfaos
+
+
+@pytest.fixture
+def banco_copy(monkeypatch):
+    estado = {"cursor": CursorCopy(), "commits": 0}
+
+    class Conexao:
+        def cursor(self):
+            return estado["cursor"]
+
+        def commit(self):
+            estado["commits"] += 1
+
+        def rollback(self):
+            pass
+
+    @contextmanager
+    def conexao():
+        yield Conexao()
+
+    monkeypatch.setattr(importacao, "conexao", conexao)
+    return estado
+
+
+def _arquivo(tmp_path, corpo, cabecalho=CABECALHO_TUTORES):
+    caminho = tmp_path / "tutores.csv"
+    caminho.write_text(cabecalho + corpo, encoding="utf-8")
+    return caminho
+
+
+def test_bloco_so_copia_linhas_validas_e_relata_as_rejeitadas(tmp_path, banco_copy):
+    caminho = _arquivo(
+        tmp_path,
+        "Ana,12345678901,,Rua A,11999990000\n"
+        "\n"
+        "Bia,123,,Rua B,11999990000\n"
+        " Caio ,98765432100,caio@x.com,Rua C,11888880000\n",
+    )
+    cabecalho, [(ini, fim, primeira)] = _blocos(caminho, 100)
+
+    lidas, inseridas, ignoradas, rejeitadas = _importar_bloco(
+        "tutores", str(caminho), cabecalho, ini, fim, primeira
+    )
+
+    assert (lidas, inseridas, ignoradas) == (3, 2, 0)
+    assert [(num, motivo) for num, motivo, _ in rejeitadas] == [(4, "CPF precisa ter 11 dígitos")]
+    copiado = list(csv.reader(io.StringIO(banco_copy["cursor"].copiado)))
+    # número da linha do arquivo na frente; campos aparados; vazio vira NULL
+    assert copiado == [
+        ["2", "Ana", "12345678901", "", "Rua A", "11999990000", ""],
+        ["5", "Caio", "98765432100", "caio@x.com", "Rua C", "11888880000", ""],
+    ]
+    assert banco_copy["commits"] == 1
+
+
+def test_animais_sem_tutor_entram_como_rejeitados(tmp_path, banco_copy):
+    banco_copy["cursor"] = CursorCopy(orfaos=[(2, "11111111111")])
+    caminho = _arquivo(
+        tmp_path,
+        "Rex,Cachorro,Vira lata,3,11111111111\n",
+        cabecalho="nome,especie,raca,idade,cpf_dono\n",
+    )
+    cabecalho, [(ini, fim, primeira)] = _blocos(caminho, 100)
+
+    lidas, inseridas, ignoradas, rejeitadas = _importar_bloco(
+        "animais", str(caminho), cabecalho, ini, fim, primeira
+    )
+    assert (lidas, inseridas, ignoradas) == (1, 0, 0)
+    assert rejeitadas == [(2, "tutor com CPF 11111111111 não encontrado", [])]
+
+
+def test_coluna_obrigatoria_ausente_e_recusada(tmp_path):
+    caminho = _arquivo(tmp_path, "", cabecalho="nome,email\n")
+    with pytest.raises(ValueError, match="cpf, endereco, telefone"):
+        importacao.importar_tutores(caminho)
@@ -0,0 +1,174 @@
+"""Listagem: SQL das páginas por chave (keyset) e limites entre páginas."""
+from contextlib import contextmanager
+from typing import NamedTuple
+
+import pytest
+
+import repositorios
+from repositorios import Listagem
+
+
+class Linha(NamedTuple):
+    data: str
+    id: int
+
+
+def _listagem(**kw):
+    return Listagem(
+        "SELECT data, id FROM t",
+        [("t.data", "data"), ("t.id", "id")],
+        kw.pop("desc", False),
+        Linha,
+        **kw,
+    )
+
+
+def test_primeira_pagina_so_ordena_e_limita():
+    sql, params = _listagem().sql_pagina(10)
+    assert sql == "SELECT data, id FROM t ORDER BY t.data ASC, t.id ASC LIMIT %s"
+    assert params == [10]
+
+
+def test_pagina_seguinte_compara_a_chave_inteira():
+    sql, params = _listagem().sql_pagina(10, apos=("2025-01-31", 7))
+    assert "WHERE (t.data, t.id) > (%s, %s)" in sql
+    assert params == ["2025-01-31", 7, 10]
+
+
+def test_ordem_decrescente_usa_menor_que():
+    sql, _ = _listagem(desc=True).sql_pagina(10, apos=("2025-01-31", 7))
+    assert "(t.data, t.id) < (%s, %s)" in sql
+    assert sql.endswith("ORDER BY t.data DESC, t.id DESC LIMIT %s")
+
+
+@pytest.mark.parametrize("desc, comparacao, ordem", [(False, "<", "DESC"), (True, ">", "ASC")])
+def test_voltar_inverte_comparacao_e_ordem(desc, comparacao, ordem):
+    sql, _ = _listagem(desc=desc).sql_pagina(5, apos=("2025-01-01", 1), voltar=True)
+    assert f"(t.data, t.id) {comparacao} (%s, %s)" in sql
+    assert f"t.id {ordem} LIMIT %s" in sql
+
+
+def test_filtros_vem_antes_da_chave_nos_parametros():
+    listagem = _listagem(filtros=["t.vet = %s"], params=[3])
+    sql, params = listagem.sql_pagina(10, apos=("2025-01-31", 7))
+    assert "WHERE t.vet = %s AND (t.data, t.id) > (%s, %s)" in sql
+    assert params == [3, "2025-01-31", 7, 10]
+    # a listagem em si não é alterada pela página
+    assert listagem.filtros == ["t.vet = %s"] and listagem.params == [3]
+
+
+def test_chave_de_segue_a_ordem_da_chave():
+    assert _listagem().chave_de(Linha("2025-02-01", 9)) == ("2025-02-01", 9)
+
+
+class CursorFalso:
+    def __init__(self, linhas):
+        self.linhas = linhas
+        self.executados = []
+        self.connection = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.executados.append((sql, params))
+
+    def __iter__(self):
+        return iter(self.linhas)
+
+
+@pytest.fixture
+def banco_falso(monkeypatch):
+    """Faz conexao_leitura() devolver um cursor com as linhas definidas no teste."""
+    estado = {"linhas": []}
+
+    class Conexao:
+        def cursor(self):
+            estado["cursor"] = CursorFalso(estado["linhas"])
+            return estado["cursor"]
+
+    @contextmanager
+    def conexao_leitura():
+        yield Conexao()
+
+    monkeypatch.setattr(repositorios, "conexao_leitura", conexao_leitura)
+    return estado
+
+
+def test_pagina_devolve_linhas_tipadas(banco_falso):
+    banco_falso["linhas"] = [("2025-01-01", 1), ("2025-01-02", 2)]
+    assert _listagem().pagina(2) == [Linha("2025-01-01", 1), Linha("2025-01-02", 2)]
+
+
+def test_pagina_anterior_volta_na_ordem_de_exibicao(banco_falso):
+    # o banco devolve do mais próximo para o mais distante da chave
+    banco_falso["linhas"] = [("2025-01-02", 2), ("2025-01-01", 1)]
+    linhas = _listagem().pagina(2, apos=("2025-01-03", 3), voltar=True)
+    assert linhas == [Linha("2025-01-01", 1), Linha("2025-01-02", 2)]
+    sql, params = banco_falso["cursor"].executados[-1]
+    assert params[-3:] == ["2025-01-03", 3, 2]
+
+
+class ListagemEmMemoria:
+    """Listagem sobre uma lista ordenada, com a mesma semântica de pagina()."""
+
+    def __init__(self, linhas):
+        self.linhas = sorted(linhas)
+        self.pedidos = []
+
+    def chave_de(self, linha):
+        return tuple(linha)
+
+    def pagina(self, limite, apos=None, voltar=False):
+        self.pedidos.append((limite, apos, voltar))
+        if apos is None:
+            return self.linhas[:limite]
+        if voltar:
+            antes = [l for l in self.linhas if tuple(l) < apos]
+            return antes[-limite:]
+        return [l for l in self.linhas if tuple(l) > apos][:limite]
+
+
+@pytest.fixture
+def terminal(monkeypatch):
+    import services
+
+    respostas = []
+    perguntas = []
+
+    def entrada(pergunta=""):
+        perguntas.append(pergunta)
+        return respostas.pop(0)
+
+    monkeypatch.setattr("builtins.input", entrada)
+    monkeypatch.setitem(services.LISTAGEM_CONFIG, "tamanho_pagina", 3)
+    monkeypatch.setitem(services.SAIDA_CONFIG, "limite", 0)
+    return services, respostas, perguntas
+
+
+def test_pagina_cheia_sem_proxima_nao_pergunta(terminal):
+    services, _, perguntas = terminal
+    listagem = ListagemEmMemoria([Linha("d", i) for i in range(3)])
+    services._listar(listagem, [services.Coluna("Data"), services.Coluna("ID")], "vazio")
+    # pede uma linha a mais para saber se há próxima página; não há
+    assert listagem.pedidos == [(4, None, False)]
+    assert perguntas == []
+
+
+def test_avanca_e_volta_pela_ultima_e_pela_primeira_chave(terminal, capsys):
+    services, respostas, perguntas = terminal
+    listagem = ListagemEmMemoria([Linha("d", i) for i in range(7)])
+    respostas += ["", "", "a", "s"]
+    services._listar(listagem, [services.Coluna("Data"), services.Coluna("ID")], "vazio")
+
+    assert listagem.pedidos == [
+        (4, None, False),
+        (4, ("d", 2), False),    # página 2 começa depois da última linha exibida
+        (4, ("d", 5), False),    # página 3: só a linha 6, sem próxima
+        (4, ("d", 6), True),     # volta a partir da primeira linha da página 3
+    ]
+    assert "próxima" not in perguntas[2]
+    assert "anterior" in perguntas[2]
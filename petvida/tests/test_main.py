@@ -0,0 +1,33 @@
+"""Linha de comando do main.py: o menu não carrega o cli nem o psycopg2."""
+import subprocess
+import sys
+from pathlib import Path
+
+import main
+
+PETVIDA = Path(__file__).resolve().parent.parent
+
+
+def test_relatorios_do_argparse_sao_os_da_exportacao():
+    from exportacao import RELATORIOS
+
+    assert set(main.RELATORIOS) == set(RELATORIOS)
+
+
+def test_menu_nao_importa_cli_nem_psycopg2():
+    codigo = (
+        "import sys; sys.argv = ['main.py', '--limit', '5']\n"
+        "import main\n"
+        "args = main._argumentos()\n"
+        "print(args.comando, args.limit, 'cli' in sys.modules, 'psycopg2' in sys.modules)\n"
+    )
+    saida = subprocess.run(
+        [sys.executable, "-c", codigo], cwd=PETVIDA, capture_output=True, text=True, check=True
+    ).stdout
+    assert saida.split() == ["None", "5", "False", "False"]
+
+
+def test_subcomando_usa_o_parser_completo(monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["main.py", "--limit", "5", "tutor", "--cpf", "123"])
+    args = main._argumentos()
+    assert (args.comando, args.limit, args.cpf) == ("tutor", 5, "123")
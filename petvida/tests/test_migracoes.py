@@ -0,0 +1,137 @@
+"""Migrações: divisão dos scripts sem transação e o aplicador."""
+from contextlib import contextmanager
+
+import pytest
+
+import migracoes
+from migracoes import MARCA_SEM_TRANSACAO, Migracao, _comandos
+
+
+def test_comandos_divide_no_ponto_e_virgula_do_fim_da_linha():
+    script = (
+        f"{MARCA_SEM_TRANSACAO}\n"
+        "-- comentário; com ponto e vírgula;\n"
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm WITH SCHEMA public;\n"
+        "\n"
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS i\n"
+        "    ON t USING gin (nome gin_trgm_ops);   \n"
+    )
+    assert _comandos(script) == [
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm WITH SCHEMA public",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS i\n    ON t USING gin (nome gin_trgm_ops)",
+    ]
+
+
+def test_comandos_nao_divide_ponto_e_virgula_no_meio_da_linha():
+    assert _comandos("SELECT ';' AS x; SELECT 2;\n") == ["SELECT ';' AS x; SELECT 2"]
+
+
+def test_migracoes_disponiveis_em_ordem_e_sem_lacunas():
+    versoes = [m.versao for m in migracoes.migracoes_disponiveis()]
+    assert versoes == list(range(1, len(versoes) + 1))
+
+
+class Cursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        texto = sql if isinstance(sql, str) else "<composed>"
+        self.conn.executados.append((texto, self.conn.autocommit))
+        if texto in self.conn.falhar:
+            raise RuntimeError("falhou")
+
+    def fetchone(self):
+        return (self.conn.versao,)
+
+
+class Conexao:
+    def __init__(self, versao):
+        self.versao = versao
+        self.autocommit = False
+        self.executados = []
+        self.falhar = set()
+        self.commits = self.rollbacks = 0
+
+    def cursor(self):
+        return Cursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def sqls(self):
+        return [s for s, _ in self.executados]
+
+
+@pytest.fixture
+def aplicador(monkeypatch, tmp_path):
+    conn = Conexao(versao=1)
+
+    @contextmanager
+    def conexao():
+        yield conn
+
+    def escrever(versao, nome, texto):
+        caminho = tmp_path / f"{versao:04d}_{nome}.sql"
+        caminho.write_text(texto, encoding="utf-8")
+        return Migracao(versao, nome, caminho)
+
+    lista = []
+    monkeypatch.setattr(migracoes, "conexao", conexao)
+    monkeypatch.setattr(migracoes, "migracoes_disponiveis", lambda: lista)
+    return conn, lista, escrever
+
+
+def test_aplica_so_as_pendentes_e_registra_a_versao(aplicador):
+    conn, lista, escrever = aplicador
+    lista += [escrever(1, "a", "SELECT 1;"), escrever(2, "b", "SELECT 2;")]
+
+    assert migracoes.aplicar_migracoes() is True
+    assert "SELECT 1;" not in conn.sqls()
+    assert "SELECT 2;" in conn.sqls()
+    registro = [p for s, p in conn.executados if s.startswith("INSERT INTO schema_version")]
+    assert registro == [False]
+    assert conn.sqls()[-1] == "SELECT pg_advisory_unlock(%s);"
+
+
+def test_script_sem_transacao_roda_comando_a_comando_em_autocommit(aplicador):
+    conn, lista, escrever = aplicador
+    lista.append(escrever(2, "b", f"{MARCA_SEM_TRANSACAO}\nSELECT 1;\nSELECT 2;\n"))
+
+    assert migracoes.aplicar_migracoes() is True
+    assert ("SELECT 1", True) in conn.executados
+    assert ("SELECT 2", True) in conn.executados
+    assert conn.autocommit is False
+
+
+def test_falha_desfaz_para_nas_seguintes_e_solta_a_trava(aplicador, capsys):
+    conn, lista, escrever = aplicador
+    lista += [escrever(2, "b", "RUIM;"), escrever(3, "c", "SELECT 3;")]
+    conn.falhar.add("RUIM;")
+
+    assert migracoes.aplicar_migracoes() is False
+    assert conn.rollbacks == 1
+    assert "SELECT 3;" not in conn.sqls()
+    assert not any(s.startswith("INSERT INTO schema_version") for s in conn.sqls())
+    assert conn.sqls()[-1] == "SELECT pg_advisory_unlock(%s);"
+    assert "Erro na migração 0002" in capsys.readouterr().out
+
+
+def test_nada_a_fazer_devolve_true(aplicador):
+    conn, lista, escrever = aplicador
+    lista.append(escrever(1, "a", "SELECT 1;"))
+    assert migracoes.aplicar_migracoes() is True
+
+
+def test_migracoes_reais_aplicam_e_repetir_nao_faz_nada(banco):
+    assert migracoes.versao_atual() == migracoes.migracoes_disponiveis()[-1].versao
+    assert migracoes.aplicar_migracoes(banco) is True
@@ -0,0 +1,239 @@
+"""Pools de conexão: checkout com verificação de vida, espera e backoff."""
+import asyncio
+import time
+
+import psycopg2
+import pytest
+from psycopg2.extensions import POLL_OK, TRANSACTION_STATUS_IDLE, TRANSACTION_STATUS_INTRANS
+
+import pool
+import pool_async
+from pool import PoolConexoes, PoolIndisponivel
+from pool_async import PoolAssincrono
+
+CONFIG = {
+    "min_conexoes": 1,
+    "max_conexoes": 2,
+    "espera_checkout": 0.05,
+    "verificar_apos": 30.0,
+    "tentativas_reconexao": 3,
+    "backoff_inicial": 0.5,
+    "backoff_maximo": 0.8,
+}
+
+
+class Cursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        if self.conn.caiu:
+            raise psycopg2.OperationalError("server closed the connection unexpectedly")
+
+
+class Conexao:
+    def __init__(self, caiu=False):
+        self.caiu = caiu
+        self.closed = 0
+        self.autocommit = True
+        self.status = TRANSACTION_STATUS_IDLE
+        self.rollbacks = 0
+
+    def cursor(self):
+        return Cursor(self)
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.status = TRANSACTION_STATUS_IDLE
+
+    def get_transaction_status(self):
+        return self.status
+
+
+class PoolFalso:
+    """Entrega as conexões de `conexoes` em ordem; registra o que volta."""
+
+    def __init__(self, conexoes):
+        self.conexoes = list(conexoes)
+        self.devolvidas = []
+        self.fechadas = []
+
+    def getconn(self):
+        return self.conexoes.pop(0)
+
+    def putconn(self, conn, close=False):
+        (self.fechadas if close else self.devolvidas).append(conn)
+
+    def closeall(self):
+        pass
+
+
+@pytest.fixture
+def esperas(monkeypatch):
+    dormidas = []
+    monkeypatch.setattr(pool.time, "sleep", dormidas.append)
+    return dormidas
+
+
+def _pool(monkeypatch, conexoes):
+    falso = PoolFalso(conexoes)
+    monkeypatch.setattr(pool.pg_pool, "ThreadedConnectionPool", lambda *a, **k: falso)
+    return PoolConexoes({}, CONFIG), falso
+
+
+def test_checkout_descarta_conexao_morta_e_entrega_a_seguinte(monkeypatch, esperas):
+    morta, viva = Conexao(caiu=True), Conexao()
+    p, falso = _pool(monkeypatch, [morta, viva])
+
+    assert p.obter() is viva
+    assert viva.autocommit is False
+    assert falso.fechadas == [morta]
+
+
+def test_conexao_devolvida_ha_pouco_nao_e_verificada(monkeypatch, esperas):
+    conn = Conexao()
+    p, falso = _pool(monkeypatch, [conn])
+    p.devolver(p.obter())
+    falso.conexoes.append(conn)
+
+    conn.caiu = True  # o SELECT 1 falharia, mas a conexão está dentro de verificar_apos
+    assert p.obter() is conn
+
+
+def test_devolver_desfaz_transacao_aberta(monkeypatch, esperas):
+    conn = Conexao()
+    p, falso = _pool(monkeypatch, [conn])
+    p.obter()
+    conn.rollbacks = 0
+    conn.status = TRANSACTION_STATUS_INTRANS
+
+    p.devolver(conn)
+    assert conn.rollbacks == 1
+    assert falso.devolvidas == [conn]
+
+
+def test_pool_cheio_espera_e_desiste(monkeypatch, esperas):
+    p, _ = _pool(monkeypatch, [Conexao(), Conexao(), Conexao()])
+    p.obter()
+    p.obter()
+    with pytest.raises(PoolIndisponivel, match="Nenhuma conexão livre"):
+        p.obter()
+
+
+def test_vaga_e_liberada_quando_o_checkout_falha(monkeypatch, esperas):
+    p, falso = _pool(monkeypatch, [])
+
+    def fora_do_ar():
+        raise psycopg2.OperationalError("connection refused")
+
+    falso.getconn = fora_do_ar
+    for _ in range(CONFIG["max_conexoes"] + 1):
+        with pytest.raises(PoolIndisponivel, match="Banco indisponível"):
+            p.obter()
+
+
+def test_backoff_dobra_ate_o_maximo_e_desiste(monkeypatch, esperas):
+    tentativas = []
+
+    def conectar(*a, **k):
+        tentativas.append(1)
+        raise psycopg2.OperationalError("connection refused")
+
+    monkeypatch.setattr(pool.pg_pool, "ThreadedConnectionPool", conectar)
+    with pytest.raises(PoolIndisponivel):
+        PoolConexoes({}, dict(CONFIG, tentativas_reconexao=4))
+    assert len(tentativas) == 4
+    assert esperas == [0.5, 0.8, 0.8]
+
+
+def test_backoff_reconecta_na_segunda_tentativa(monkeypatch, esperas):
+    falso = PoolFalso([])
+    respostas = [psycopg2.OperationalError("connection refused"), falso]
+
+    def conectar(*a, **k):
+        r = respostas.pop(0)
+        if isinstance(r, Exception):
+            raise r
+        return r
+
+    monkeypatch.setattr(pool.pg_pool, "ThreadedConnectionPool", conectar)
+    PoolConexoes({}, CONFIG)
+    assert esperas == [0.5]
+
+
+# pool assíncrono: mesma verificação no checkout, sem event loop de verdade
+# (poll() responde POLL_OK na hora)
+class ConexaoAsync(Conexao):
+    def __init__(self, caiu=False, poll_falha=False):
+        super().__init__(caiu)
+        self.poll_falha = poll_falha
+
+    def poll(self):
+        if self.poll_falha:
+            raise psycopg2.OperationalError("could not connect to server")
+        return POLL_OK
+
+    def close(self):
+        self.closed = 1
+
+
+def _pool_async():
+    return PoolAssincrono({}, {"max_conexoes": 2, "espera_checkout": 0.05})
+
+
+def test_async_checkout_troca_conexao_ociosa_que_caiu(monkeypatch):
+    morta, nova = ConexaoAsync(caiu=True), ConexaoAsync()
+    monkeypatch.setattr(pool_async.psycopg2, "connect", lambda **k: nova)
+    p = _pool_async()
+
+    async def cenario():
+        p._livres.append(morta)
+        p._devolvida_em[id(morta)] = time.monotonic() - CONFIG["verificar_apos"] - 1
+        return await p.obter()
+
+    assert asyncio.run(cenario()) is nova
+    assert morta.closed
+
+
+def test_async_conexao_devolvida_ha_pouco_nao_e_verificada():
+    conn = ConexaoAsync()
+    p = _pool_async()
+
+    async def cenario():
+        await p.devolver(await _obtida(p, conn))
+        conn.caiu = True
+        return await p.obter()
+
+    assert asyncio.run(cenario()) is conn
+
+
+async def _obtida(p, conn):
+    p._livres.append(conn)
+    return await p.obter()
+
+
+def test_async_conectar_fecha_a_conexao_quando_o_poll_falha(monkeypatch):
+    abertas = []
+
+    def conectar(**k):
+        abertas.append(ConexaoAsync(poll_falha=True))
+        return abertas[-1]
+
+    monkeypatch.setattr(pool_async.psycopg2, "connect", conectar)
+    monkeypatch.setattr(pool_async.asyncio, "sleep", _sem_espera)
+    p = _pool_async()
+    p.tentativas = 3
+
+    with pytest.raises(PoolIndisponivel, match="Banco indisponível"):
+        asyncio.run(p.obter())
+    assert len(abertas) == 3 and all(c.closed for c in abertas)
+
+
+async def _sem_espera(segundos):
+    pass
@@ -0,0 +1,105 @@
+"""Comandos preparados: tradução de %s para $n e o registro por conexão."""
+from collections import OrderedDict
+
+import pytest
+from psycopg2 import errors as pg_errors
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, TRANSACTION_STATUS_INTRANS
+
+import preparadas
+from preparadas import _traduzir
+
+
+def test_traduzir_numera_os_parametros_em_ordem():
+    nome, texto, n = _traduzir("SELECT * FROM t WHERE a = %s AND b > %s LIMIT %s;  ")
+    assert texto == "SELECT * FROM t WHERE a = $1 AND b > $2 LIMIT $3"
+    assert n == 3
+    assert nome.startswith("petvida_") and len(nome) == len("petvida_") + 12
+
+
+def test_traduzir_desfaz_o_escape_de_porcentagem():
+    _, texto, n = _traduzir("SELECT 1 FROM t WHERE nome ILIKE '%%' || %s || '%%'")
+    assert texto == "SELECT 1 FROM t WHERE nome ILIKE '%' || $1 || '%'"
+    assert n == 1
+
+
+def test_traduzir_sem_parametros():
+    assert _traduzir("SELECT now()")[1:] == ("SELECT now()", 0)
+
+
+def test_nome_estavel_e_diferente_por_texto():
+    assert _traduzir("SELECT %s")[0] == _traduzir("  SELECT %s;")[0]
+    assert _traduzir("SELECT %s")[0] != _traduzir("SELECT %s + 1")[0]
+
+
+class Conexao:
+    def __init__(self):
+        self.preparadas = OrderedDict()
+        self.status = TRANSACTION_STATUS_IDLE
+        self.no_servidor = set()
+        self.rollbacks = 0
+
+    def get_transaction_status(self):
+        return self.status
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.status = TRANSACTION_STATUS_IDLE
+
+
+class Cursor:
+    def __init__(self, conn):
+        self.connection = conn
+        self.executados = []
+
+    def execute(self, sql, params=None):
+        self.executados.append(sql)
+        conn = self.connection
+        conn.status = TRANSACTION_STATUS_INTRANS
+        comando, nome = sql.split()[:2]
+        if comando == "PREPARE":
+            conn.no_servidor.add(nome)
+        elif comando == "DEALLOCATE":
+            conn.no_servidor.remove(nome)
+        elif comando == "EXECUTE" and nome not in conn.no_servidor:
+            raise pg_errors.InvalidSqlStatementName(f"prepared statement \"{nome}\" does not exist")
+
+
+@pytest.fixture
+def cursor():
+    return Cursor(Conexao())
+
+
+def test_prepara_uma_vez_por_conexao(cursor):
+    preparadas.executar(cursor, "SELECT %s", (1,))
+    preparadas.executar(cursor, "SELECT %s", (2,))
+    assert [s.split()[0] for s in cursor.executados] == ["PREPARE", "EXECUTE", "EXECUTE"]
+
+
+def test_registro_limitado_libera_o_usado_ha_mais_tempo(cursor, monkeypatch):
+    monkeypatch.setitem(preparadas.POOL_CONFIG, "max_preparadas", 2)
+    a, b, c = (_traduzir(s)[0] for s in ("SELECT 1", "SELECT 2", "SELECT 3"))
+    for sql in ("SELECT 1", "SELECT 2", "SELECT 1", "SELECT 3"):
+        preparadas.executar(cursor, sql)
+
+    assert f"DEALLOCATE {b}" in cursor.executados
+    assert list(cursor.connection.preparadas) == [a, c]
+    assert cursor.connection.no_servidor == {a, c}
+
+
+def test_sessao_trocada_prepara_de_novo_e_repete(cursor):
+    preparadas.executar(cursor, "SELECT %s", (1,))
+    cursor.connection.rollback()
+    cursor.connection.no_servidor.clear()  # DISCARD ALL no servidor
+
+    preparadas.executar(cursor, "SELECT %s", (2,))
+    assert [s.split()[0] for s in cursor.executados[-3:]] == ["EXECUTE", "PREPARE", "EXECUTE"]
+    assert cursor.connection.rollbacks == 2
+
+
+def test_sessao_trocada_no_meio_da_transacao_propaga(cursor):
+    preparadas.executar(cursor, "SELECT %s", (1,))
+    cursor.connection.no_servidor.clear()
+
+    with pytest.raises(pg_errors.InvalidSqlStatementName):
+        preparadas.executar(cursor, "SELECT %s", (2,))
+    assert not cursor.connection.preparadas
@@ -0,0 +1,209 @@
+"""Roteamento de leituras: réplica escolhida, atraso, falhas e próprias escritas."""
+from contextlib import contextmanager
+
+import pytest
+from psycopg2.extensions import cursor as PgCursor
+
+import replicas
+from pool import PoolIndisponivel
+from replicas import Replica
+
+
+class PoolReplica:
+    def __init__(self, conn="conn-replica", fora=False):
+        self.conn = conn
+        self.fora = fora
+        self.devolvidas = []
+
+    def obter(self):
+        if self.fora:
+            raise PoolIndisponivel("Banco indisponível: connection refused")
+        return self.conn
+
+    def devolver(self, conn):
+        self.devolvidas.append(conn)
+
+
+def _replica(dsn, atraso=0.0, fora=False, latencia_ms=1.0):
+    r = Replica(dsn)
+    r.pool = PoolReplica(f"conn-{dsn}", fora)
+    r.atraso = atraso
+    r.latencia_ms = latencia_ms
+    r.medido_em = float("inf")  # medição "recente": não mede de novo no teste
+    return r
+
+
+@pytest.fixture
+def roteador(monkeypatch):
+    """Réplicas falsas no lugar das de REPLICAS_CONFIG; o primário é "conn-primario"."""
+    lista = []
+    monkeypatch.setitem(replicas.REPLICAS_CONFIG, "dsns", ["x"])
+    monkeypatch.setitem(replicas.REPLICAS_CONFIG, "politica", "round-robin")
+    monkeypatch.setattr(replicas, "_replicas", lista)
+    monkeypatch.setattr(replicas, "_ultima_escrita", float("-inf"))
+
+    @contextmanager
+    def primario():
+        yield "conn-primario"
+
+    monkeypatch.setattr(replicas, "conexao", primario)
+    return lista
+
+
+def _leitura():
+    with replicas.conexao_leitura() as conn:
+        return conn
+
+
+def test_sem_replicas_le_do_primario(roteador, monkeypatch):
+    monkeypatch.setitem(replicas.REPLICAS_CONFIG, "dsns", [])
+    assert _leitura() == "conn-primario"
+
+
+def test_round_robin_alterna_e_devolve_a_conexao(roteador):
+    a, b = _replica("a"), _replica("b")
+    roteador += [a, b]
+    lidas = {_leitura() for _ in range(4)}
+    assert lidas == {"conn-a", "conn-b"}
+    assert a.pool.devolvidas and b.pool.devolvidas
+
+
+def test_menor_latencia_prefere_a_mais_rapida(roteador, monkeypatch):
+    monkeypatch.setitem(replicas.REPLICAS_CONFIG, "politica", "menor-latencia")
+    roteador += [_replica("lenta", latencia_ms=30.0), _replica("rapida", latencia_ms=2.0)]
+    assert {_leitura() for _ in range(3)} == {"conn-rapida"}
+
+
+def test_replica_atrasada_fica_de_fora(roteador):
+    atrasada = _replica("a", atraso=replicas.REPLICAS_CONFIG["atraso_max_s"] + 1)
+    roteador += [atrasada, _replica("b")]
+    assert {_leitura() for _ in range(4)} == {"conn-b"}
+
+
+def test_todas_fora_do_ar_caem_para_o_primario_e_ficam_em_pausa(roteador):
+    fora = _replica("a", fora=True)
+    roteador.append(fora)
+    assert _leitura() == "conn-primario"
+    fora.pool.fora = False
+    # ainda dentro de pausa_apos_falha: nem tenta a réplica
+    assert _leitura() == "conn-primario"
+
+
+def test_depois_de_uma_escrita_le_do_primario(roteador):
+    roteador.append(_replica("a"))
+    replicas.registrar_escrita()
+    assert _leitura() == "conn-primario"
+
+
+def test_somente_primario_desvia_durante_o_bloco(roteador):
+    roteador.append(_replica("a"))
+    with replicas.somente_primario():
+        assert _leitura() == "conn-primario"
+    assert _leitura() == "conn-a"
+
+
+class CursorFeito:
+    """O que _escreveu lê de um cursor depois do execute."""
+
+    def __init__(self, statusmessage, rowcount=-1, query=b""):
+        self.statusmessage = statusmessage
+        self.rowcount = rowcount
+        self.query = query
+
+
+@pytest.mark.parametrize(
+    "cursor, escreveu",
+    [
+        (CursorFeito("SELECT 3", 3, b"SELECT * FROM dono"), False),
+        (CursorFeito("INSERT 0 1", 1), True),
+        (CursorFeito("UPDATE 0", 0), False),                 # nada casou: não gravou
+        (CursorFeito("DELETE 2", 2), True),
+        (CursorFeito("SELECT 1", 1, b"WITH u AS (UPDATE dono SET x = 1 RETURNING 1) SELECT 1"), True),
+        (CursorFeito("CREATE TABLE"), True),
+        (CursorFeito("SET"), False),
+        (CursorFeito(None), False),
+    ],
+)
+def test_escrita_reconhecida_pela_tag_do_comando(cursor, escreveu):
+    assert replicas._escreveu(cursor) is escreveu
+
+
+class ConexaoBase:
+    """Faz o papel da classe de conexão do psycopg2 para com_registro_de_escritas."""
+
+    cursor_factory = None
+
+    def __init__(self):
+        self.commits = 0
+
+    def cursor(self, *args, **kwargs):
+        return kwargs["cursor_factory"]
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+
+@pytest.fixture
+def primaria(monkeypatch):
+    monkeypatch.setattr(replicas, "_ultima_escrita", float("-inf"))
+    return replicas.com_registro_de_escritas(ConexaoBase)()
+
+
+def _marcou():
+    return replicas._ultima_escrita != float("-inf")
+
+
+def test_commit_so_marca_transacoes_que_escreveram(primaria):
+    primaria.commit()
+    assert primaria.commits == 1 and not _marcou()
+
+    primaria.escreveu = True
+    primaria.commit()
+    assert _marcou() and not primaria.escreveu
+
+
+def test_rollback_descarta_a_marca(primaria):
+    primaria.escreveu = True
+    primaria.rollback()
+    primaria.commit()
+    assert not _marcou()
+
+
+def test_cursores_do_primario_anotam_as_escritas(primaria):
+    fabrica = primaria.cursor()
+    assert issubclass(fabrica, PgCursor) and fabrica is not PgCursor
+    assert primaria.cursor() is fabrica  # uma classe por fábrica, não por cursor
+
+
+def test_medicao_compara_com_o_lsn_do_primario(monkeypatch):
+    enviados = []
+
+    class Conn:
+        def cursor(self):
+            class Cursor:
+                def __enter__(self):
+                    return self
+
+                def __exit__(self, *exc):
+                    return False
+
+                def execute(self, sql, params):
+                    enviados.append(params)
+
+                def fetchone(self):
+                    return (12.5,)
+
+            return Cursor()
+
+        def rollback(self):
+            pass
+
+    monkeypatch.setattr(replicas, "_lsn_primario", lambda: "0/3000060")
+    r = Replica("a")
+    r.medir(Conn())
+    assert enviados == [{"lsn_primario": "0/3000060"}]
+    assert r.atraso == 12.5
+    assert not r.disponivel(r.medido_em)
@@ -0,0 +1,73 @@
+"""servicos_async contra um banco de verdade (fixture `banco_async`)."""
+import asyncio
+import datetime
+
+import pytest
+
+import repositorios as repo
+import servicos_async as sa
+from config import SENHA_CONFIG
+from repositorios import AnimalInativo, NovoAnimal, NovoDono
+from senhas import gerar_hash_senha
+
+SENHA = "senha1234"
+DATA = (datetime.date.today() + datetime.timedelta(days=7)).isoformat()
+
+
+def _cliente(username, cpf):
+    id_usuario = repo.usuarios.criar(
+        username,
+        gerar_hash_senha(SENHA),
+        "cliente",
+        NovoDono(username.title(), cpf, None, "Rua 1", "11999990000"),
+        NovoAnimal("Rex", "cão", "vira-lata", 3),
+    )
+    id_dono = repo.usuarios.id_dono(id_usuario)
+    id_animal = repo.donos.animais(id_dono)[0].id_animal
+    return {"id": id_usuario, "id_dono": id_dono, "id_animal": id_animal}
+
+
+@pytest.fixture
+def clinica(banco_async, monkeypatch):
+    # custo mínimo, e o mesmo do config: o login não agenda rehash
+    monkeypatch.setitem(SENHA_CONFIG, "custo_bcrypt", 4)
+    return _cliente("ana", "11122233344"), _cliente("bia", "55566677788")
+
+
+def test_login(clinica):
+    ana, _ = clinica
+    u = asyncio.run(sa.login("ana", SENHA, "cliente"))
+    assert u == {"id": ana["id"], "username": "ana", "tipo": "cliente"}
+
+
+def test_login_recusado_conta_a_falha(clinica):
+    with pytest.raises(sa.LoginRecusado, match="incorretos"):
+        asyncio.run(sa.login("ana", "errada123"))
+    with pytest.raises(sa.LoginRecusado, match="tipo"):
+        asyncio.run(sa.login("ana", SENHA, "admin"))
+    with pytest.raises(sa.LoginRecusado, match="incorretos"):
+        asyncio.run(sa.login("ninguem", SENHA))
+    assert repo.usuarios.buscar_por_username("ana").bloqueado is False
+
+
+def test_agendamento_e_recusa_de_animal_excluido(clinica):
+    ana, _ = clinica
+    id_consulta = asyncio.run(sa.cadastrar_consulta(ana["id_animal"], DATA, "10:00", "retorno"))
+    assert [c.id_consulta for c in repo.consultas.agendadas_do_tutor(ana["id_dono"])] == [id_consulta]
+
+    repo.animais.excluir(ana["id_animal"])
+    with pytest.raises(AnimalInativo):
+        asyncio.run(sa.cadastrar_consulta(ana["id_animal"], DATA, "11:00", "retorno"))
+    with pytest.raises(AnimalInativo):
+        asyncio.run(sa.cadastrar_consulta(999_999, DATA, "11:00", "retorno"))
+
+
+def test_cliente_so_cancela_consulta_do_proprio_animal(clinica):
+    ana, bia = clinica
+    id_consulta = asyncio.run(sa.cadastrar_consulta(ana["id_animal"], DATA, "10:00", "retorno"))
+
+    assert not asyncio.run(sa.cancelar_consulta_cliente({"id": bia["id"]}, id_consulta))
+    assert asyncio.run(sa.cancelar_consulta_cliente({"id": ana["id"]}, id_consulta))
+    # já cancelada
+    assert not asyncio.run(sa.cancelar_consulta_cliente({"id": ana["id"]}, id_consulta))
+    assert repo.consultas.agendadas_do_tutor(ana["id_dono"]) == []
@@ -1,15 +1,30 @@
 import sys
 import time
 
+from config import INICIO_CONFIG
+
 
 def so_numeros(t: str) -> bool:
-    return t.isdigit()
+    # isdecimal: isdigit aceita sobrescritos ("²"), que int() recusa
+    return t.isdecimal()
 
 
 def so_letras(t: str) -> bool:
     return all(c.isalpha() or c.isspace() for c in t)
 
 
+def cpf_valido(t: str) -> bool:
+    return so_numeros(t) and len(t) == 11
+
+
+def telefone_valido(t: str) -> bool:
+    return so_numeros(t) and len(t) >= 8
+
+
+def idade_valida(t: str) -> bool:
+    return so_numeros(t) and 0 <= int(t) <= 40
+
+
 def ler_numero(msg: str) -> str:
     v = input(msg).strip()
     while not so_numeros(v):
@@ -59,6 +74,8 @@ def senha_forte(s: str) -> bool:
 
 
 def mostrar_loading(msg: str = "Carregando") -> None:
+    if not INICIO_CONFIG["animacoes"]:
+        return
     print()
     print(msg, end="", flush=True)
     for _ in range(3):